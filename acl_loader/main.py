@@ -1,17 +1,25 @@
 #!/usr/bin/env python3
 
+import bisect
 import click
+import hashlib
 import ipaddress
 import json
 import syslog
 import operator
+import time
+from collections import OrderedDict, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from types import SimpleNamespace
 
 import openconfig_acl
 import tabulate
 import pyangbind.lib.pybindJSON as pybindJSON
 from natsort import natsorted
 from sonic_py_common import multi_asic
-from swsscommon.swsscommon import SonicV2Connector, ConfigDBConnector
+from swsscommon.swsscommon import SonicV2Connector, ConfigDBPipeConnector
+from utilities_common import bulk_write
 from utilities_common.general import load_db_config
 
 def info(msg):
@@ -29,14 +37,130 @@ def error(msg):
     syslog.syslog(syslog.LOG_ERR, msg)
 
 
-def deep_update(dst, src):
-    for key, value in src.items():
-        if isinstance(value, dict):
-            node = dst.setdefault(key, {})
-            deep_update(node, value)
+def get_rule_hash(rule):
+    """
+    Content hash of a rule in Config DB schema, its priority aside
+    """
+    content = sorted((key, value) for key, value in rule.items() if key != "PRIORITY")
+    return hashlib.sha1(json.dumps(content).encode()).hexdigest()
+
+
+def longest_decreasing_chain(values):
+    """
+    Return the indexes of the longest strictly decreasing subsequence of values
+    """
+    tails = []
+    tail_indexes = []
+    predecessors = [None] * len(values)
+    for idx, value in enumerate(values):
+        pos = bisect.bisect_left(tails, -value)
+        if pos == len(tails):
+            tails.append(-value)
+            tail_indexes.append(idx)
         else:
-            dst[key] = value
-    return dst
+            tails[pos] = -value
+            tail_indexes[pos] = idx
+        predecessors[idx] = tail_indexes[pos - 1] if pos else None
+
+    chain = []
+    idx = tail_indexes[-1] if tail_indexes else None
+    while idx is not None:
+        chain.append(idx)
+        idx = predecessors[idx]
+    return chain[::-1]
+
+
+def parse_uint(value, low, high):
+    """
+    Parse an integer leaf, raise ValueError if it is not in [low, high]
+    """
+    number = int(str(value))
+    if number < low or number > high:
+        raise ValueError("%d is out of bounds [%d, %d]" % (number, low, high))
+    return number
+
+
+def parse_string(value):
+    if not isinstance(value, str):
+        raise ValueError("%r is not a string" % (value,))
+    return value
+
+
+def parse_identity(value, identities):
+    """
+    Parse an identityref leaf, optionally prefixed by its module name
+    """
+    if not isinstance(value, str) or value.split(":")[-1] not in identities:
+        raise ValueError("%r is not one of %s" % (value, ", ".join(identities)))
+    return value
+
+
+def parse_identity_list(value, identities):
+    if not isinstance(value, list):
+        raise ValueError("%r is not a list" % (value,))
+    return [parse_identity(item, identities) for item in value]
+
+
+def parse_identity_or_uint(value, identities, low, high):
+    """
+    Parse a union of an identityref and of an integer in [low, high]
+    """
+    if isinstance(value, str) and value.split(":")[-1] in identities:
+        return value
+    return parse_uint(value, low, high)
+
+
+def parse_ip_prefix(value):
+    # The address itself is parsed, and validated, on conversion
+    if "/" not in parse_string(value):
+        raise ValueError("%s is not an IP prefix" % value)
+    return value
+
+
+def parse_port_range(value):
+    """
+    Parse a port-num-range leaf: a port, a "low..high" range of ports or ANY
+    """
+    if value == "ANY":
+        return value
+    if isinstance(value, str) and ".." in value:
+        for port in value.split("..", 1):
+            parse_uint(port, 0, 65535)
+        return value
+    return parse_uint(value, 0, 65535)
+
+
+def load_acl_container(data, schema, path, ignored=None):
+    """
+    Validate a container of an ACL entry in openconfig format against its schema
+    :param data: dict of the container, as loaded from JSON
+    :param schema: dict of the child containers schemas and of the (parser, default) of the leaves
+    :param path: Path of the container, for the error messages
+    :param ignored: dict of the known children not converted, None for the ones ignored as a whole
+    :return: Tree of the container attributes, named and defaulted as the pybind ones
+    """
+    if not isinstance(data, dict):
+        raise ValueError("%s is not a container" % path)
+
+    ignored = ignored or {}
+    for key in data:
+        if key not in schema and key not in ignored:
+            raise ValueError("Unknown leaf %s/%s" % (path, key))
+
+    attrs = {}
+    for key, child in schema.items():
+        if isinstance(child, dict):
+            value = load_acl_container(data.get(key, {}), child, "%s/%s" % (path, key), ignored.get(key))
+        elif key in data:
+            parser, _ = child
+            try:
+                value = parser(data[key])
+            except ValueError as e:
+                raise ValueError("Invalid value %r for %s/%s: %s" % (data[key], path, key, e))
+        else:
+            _, value = child
+        attrs[key.replace("-", "_")] = value
+    return SimpleNamespace(**attrs)
 
 
 class AclAction:
@@ -68,6 +192,55 @@ class AclLoaderException(Exception):
     pass
 
 
+class AclRuleWriter(object):
+    """
+    Write ACL_RULE change sets to the global CONFIG_DB and to the CONFIG_DB
+    of every front ASIC namespace.
+
+    A change set is written with one pipelined MULTI/EXEC transaction per
+    namespace, all the namespaces being written concurrently, each one on
+    its own connector. The same transaction removes the fields the
+    replaced rules lose.
+    """
+
+    ACL_RULE = "ACL_RULE"
+
+    def __init__(self, configdbs):
+        """
+        :param configdbs: OrderedDict of the ConfigDBPipeConnector by namespace,
+                          the global one being the default namespace ''
+        """
+        self.configdbs = configdbs
+
+    def write_namespace(self, configdb, rules, dropped_fields):
+        start = time.time()
+        bulk_write.mod_config(configdb, {self.ACL_RULE: rules}, {self.ACL_RULE: dropped_fields})
+        return time.time() - start
+
+    def write(self, rules, dropped_fields=None):
+        """
+        Write a change set to all the namespaces and report the time taken by each.
+        :param rules: Rules by key to write, None to delete a rule
+        :param dropped_fields: Fields by key of the replaced rules, the fields
+                               of the existing rule missing from the new one
+        :return:
+        """
+        dropped_fields = dropped_fields or {}
+        if not rules:
+            return
+
+        deleted = sum(1 for rule in rules.values() if rule is None)
+        replaced = len(dropped_fields)
+        written = len(rules) - deleted - replaced
+        with ThreadPoolExecutor(max_workers=len(self.configdbs)) as executor:
+            futures = OrderedDict((namespace, executor.submit(self.write_namespace, configdb, rules, dropped_fields))
+                                  for namespace, configdb in self.configdbs.items())
+            for namespace, future in futures.items():
+                elapsed = future.result()
+                info("%s: %d rules written, %d rules replaced, %d rules deleted in %.3fs" % (
+                    namespace or "global", written, replaced, deleted, elapsed))
+
+
 class AclLoader(object):
 
     ACL_TABLE = "ACL_TABLE"
@@ -85,6 +258,7 @@ class AclLoader(object):
 
     min_priority = 1
     max_priority = 10000
+    dataplane_incremental = False
 
     ethertype_map = {
         "ETHERTYPE_LLDP": 0x88CC,
@@ -109,6 +283,107 @@ class AclLoader(object):
         "IP_L2TP": 115
     }
 
+    forwarding_actions = ("ACCEPT", "DROP", "REJECT")
+
+    tcp_flags = ("TCP_FIN", "TCP_SYN", "TCP_RST", "TCP_PSH", "TCP_ACK", "TCP_URG", "TCP_ECE", "TCP_CWR")
+
+    # Fields of an openconfig ACL entry converted to Config DB schema, with
+    # the constraints of their openconfig types
+    acl_entry_schema = {
+        "config": {
+            "sequence-id": (partial(parse_uint, low=0, high=0xFFFFFFFF), 0)
+        },
+        "actions": {
+            "config": {
+                "forwarding-action": (partial(parse_identity, identities=forwarding_actions), "")
+            }
+        },
+        "l2": {
+            "config": {
+                "ethertype": (partial(parse_identity_or_uint, identities=tuple(ethertype_map),
+                                      low=0x0600, high=0xFFFF), ""),
+                "vlan-id": (partial(parse_uint, low=1, high=4094), "")
+            }
+        },
+        "ip": {
+            "config": {
+                "protocol": (partial(parse_identity_or_uint, identities=tuple(ip_protocol_map),
+                                     low=0, high=254), ""),
+                "source-ip-address": (parse_ip_prefix, ""),
+                "destination-ip-address": (parse_ip_prefix, ""),
+                "dscp": (partial(parse_uint, low=0, high=63), 0)
+            }
+        },
+        "icmp": {
+            "config": {
+                "type": (partial(parse_uint, low=0, high=255), ""),
+                "code": (partial(parse_uint, low=0, high=255), "")
+            }
+        },
+        "transport": {
+            "config": {
+                "source-port": (parse_port_range, ""),
+                "destination-port": (parse_port_range, ""),
+                "tcp-flags": (partial(parse_identity_list, identities=tcp_flags), ())
+            }
+        },
+        "input-interface": {
+            "interface-ref": {
+                "config": {
+                    "interface": (parse_string, "")
+                }
+            }
+        }
+    }
+
+    # Children of an openconfig ACL entry which are valid but not converted,
+    # any other child not in acl_entry_schema is rejected
+    acl_entry_ignored = {
+        "sequence-id": None,
+        "state": None,
+        "config": {
+            "description": None
+        },
+        "actions": {
+            "config": {
+                "log-action": None
+            },
+            "state": None
+        },
+        "l2": {
+            "config": {
+                "source-mac": None,
+                "source-mac-mask": None,
+                "destination-mac": None,
+                "destination-mac-mask": None
+            },
+            "state": None
+        },
+        "ip": {
+            "config": {
+                "ip-version": None,
+                "source-ip-flow-label": None,
+                "destination-ip-flow-label": None,
+                "hop-limit": None
+            },
+            "state": None
+        },
+        "icmp": {
+            "state": None
+        },
+        "transport": {
+            "state": None
+        },
+        "input-interface": {
+            "interface-ref": {
+                "config": {
+                    "subinterface": None
+                },
+                "state": None
+            }
+        }
+    }
+
     def __init__(self):
         self.yang_acl = None
         self.requested_session = None
@@ -117,12 +392,13 @@ class AclLoader(object):
         self.tables_db_info = {}
         self.rules_db_info = {}
         self.rules_info = {}
+        self.capabilities = {}
 
         # Load database config files
         load_db_config()
 
         self.sessions_db_info = {}
-        self.configdb = ConfigDBConnector()
+        self.configdb = ConfigDBPipeConnector()
         self.configdb.connect()
         self.statedb = SonicV2Connector(host="127.0.0.1")
         self.statedb.connect(self.statedb.STATE_DB)
@@ -147,7 +423,7 @@ class AclLoader(object):
 
         namespaces = multi_asic.get_all_namespaces()
         for front_asic_namespaces in namespaces['front_ns']:
-            self.per_npu_configdb[front_asic_namespaces] = ConfigDBConnector(use_unix_socket_path=True, namespace=front_asic_namespaces)
+            self.per_npu_configdb[front_asic_namespaces] = ConfigDBPipeConnector(use_unix_socket_path=True, namespace=front_asic_namespaces)
             self.per_npu_configdb[front_asic_namespaces].connect()
             self.per_npu_statedb[front_asic_namespaces] = SonicV2Connector(use_unix_socket_path=True, namespace=front_asic_namespaces)
             self.per_npu_statedb[front_asic_namespaces].connect(self.per_npu_statedb[front_asic_namespaces].STATE_DB)
@@ -279,6 +555,14 @@ class AclLoader(object):
         """
         self.max_priority = int(priority)
 
+    def set_dataplane_incremental(self, enabled):
+        """
+        Diff dataplane rules rule by rule on incremental update
+        :param enabled: Whether dataplane rules are diffed or replaced
+        :return:
+        """
+        self.dataplane_incremental = enabled
+
     def is_table_valid(self, tname):
         return self.tables_db_info.get(tname)
 
@@ -332,24 +616,55 @@ class AclLoader(object):
 
     @staticmethod
     def parse_acl_json(filename):
-        yang_acl = pybindJSON.load(filename, openconfig_acl, "openconfig_acl")
+        with open(filename, 'r') as f:
+            plain_json = json.load(f, object_pairs_hook=OrderedDict)
+        yang_acl = pybindJSON.loads(plain_json, openconfig_acl, "openconfig_acl")
         # Check pybindJSON parsing
-        # pybindJSON.load will silently return an empty json object if input invalid
+        # pybindJSON.loads will silently return an empty json object if input invalid
+        if len(plain_json['acl']['acl-sets']['acl-set']) != len(yang_acl.acl.acl_sets.acl_set):
+            raise AclLoaderException("Invalid input file %s" % filename)
+        return yang_acl
+
+    @staticmethod
+    def load_acl_json(filename):
+        """
+        Load file in openconfig ACL format without building its pybind tree.
+        The fields converted to Config DB schema are validated against their
+        openconfig types, raising ValueError as pybind does.
+        :param filename: File in openconfig ACL format
+        :return: Generator of the ACL set names with their list of (ACL entry name, ACL entry)
+        """
         with open(filename, 'r') as f:
             plain_json = json.load(f)
-            if len(plain_json['acl']['acl-sets']['acl-set']) != len(yang_acl.acl.acl_sets.acl_set):
-                raise AclLoaderException("Invalid input file %s" % filename)
-        return yang_acl
 
-    def load_rules_from_file(self, filename):
+        try:
+            acl_sets = plain_json['acl']['acl-sets']['acl-set']
+        except (KeyError, TypeError):
+            raise AclLoaderException("Invalid input file %s" % filename)
+        if not isinstance(acl_sets, dict) or not all(isinstance(acl_set, dict) for acl_set in acl_sets.values()):
+            raise AclLoaderException("Invalid input file %s" % filename)
+
+        for acl_set_name, acl_set in acl_sets.items():
+            acl_entries = acl_set.get('acl-entries', {}).get('acl-entry', {})
+            yield acl_set_name, [
+                (acl_entry_name, load_acl_container(acl_entry, AclLoader.acl_entry_schema,
+                                                    "%s/%s" % (acl_set_name, acl_entry_name),
+                                                    AclLoader.acl_entry_ignored))
+                for acl_entry_name, acl_entry in acl_entries.items()]
+
+    def load_rules_from_file(self, filename, use_pybind=False):
         """
         Load file with ACL rules configuration in openconfig ACL format. Convert rules
         to Config DB schema.
         :param filename: File in openconfig ACL format
+        :param use_pybind: Load the file through its pybind tree instead of directly
         :return:
         """
-        self.yang_acl = AclLoader.parse_acl_json(filename)
-        self.convert_rules()
+        if use_pybind:
+            self.yang_acl = AclLoader.parse_acl_json(filename)
+            self.convert_rules()
+        else:
+            self.convert_rules(AclLoader.load_acl_json(filename))
 
     def convert_action(self, table_name, rule_idx, rule):
         rule_props = {}
@@ -386,6 +701,30 @@ class AclLoader(object):
 
         return rule_props
 
+    def get_capabilities(self, stage):
+        """
+        Read the ACL stage and switch capabilities, once per stage as they
+        are static information about the switch
+        :param stage: ACL stage
+        :return: Tuple of the ACL stage capability and of the switch capability
+        """
+        if stage in self.capabilities:
+            return self.capabilities[stage]
+
+        # check if per npu state db is there then read using first state db
+        # else read from global statedb
+        if self.per_npu_statedb:
+            # For multi-npu we will read using anyone statedb connector for front asic namespace.
+            # Same information should be there in all state DB's
+            # as it is static information about switch capability
+            statedb = list(self.per_npu_statedb.values())[0]
+        else:
+            statedb = self.statedb
+        aclcapability = statedb.get_all(self.statedb.STATE_DB, "{}|{}".format(self.ACL_STAGE_CAPABILITY_TABLE, stage.upper()))
+        switchcapability = statedb.get_all(self.statedb.STATE_DB, "{}|switch".format(self.SWITCH_CAPABILITY_TABLE))
+        self.capabilities[stage] = (aclcapability, switchcapability)
+        return self.capabilities[stage]
+
     def validate_actions(self, table_name, action_props):
         if self.is_table_control_plane(table_name):
             return True
@@ -396,19 +735,8 @@ class AclLoader(object):
             raise AclLoaderException("Table {} does not exist".format(table_name))
 
         stage = self.tables_db_info[table_name].get("stage", Stage.INGRESS)
+        aclcapability, switchcapability = self.get_capabilities(stage)
 
-        # check if per npu state db is there then read using first state db
-        # else read from global statedb
-        if self.per_npu_statedb:
-            # For multi-npu we will read using anyone statedb connector for front asic namespace.
-            # Same information should be there in all state DB's
-            # as it is static information about switch capability
-            namespace_statedb = list(self.per_npu_statedb.values())[0]
-            aclcapability = namespace_statedb.get_all(self.statedb.STATE_DB, "{}|{}".format(self.ACL_STAGE_CAPABILITY_TABLE, stage.upper()))
-            switchcapability = namespace_statedb.get_all(self.statedb.STATE_DB, "{}|switch".format(self.SWITCH_CAPABILITY_TABLE))
-        else:
-            aclcapability = self.statedb.get_all(self.statedb.STATE_DB, "{}|{}".format(self.ACL_STAGE_CAPABILITY_TABLE, stage.upper()))
-            switchcapability = self.statedb.get_all(self.statedb.STATE_DB, "{}|switch".format(self.SWITCH_CAPABILITY_TABLE))
         for action_key in dict(action_props):
             action_list_key = self.ACL_ACTIONS_CAPABILITY_FIELD
             if action_list_key not in aclcapability:
@@ -616,12 +944,12 @@ class AclLoader(object):
         elif self.is_table_l3(table_name):
             rule_props["ETHER_TYPE"] = str(self.ethertype_map["ETHERTYPE_IPV4"])
 
-        deep_update(rule_props, self.convert_action(table_name, rule_idx, rule))
-        deep_update(rule_props, self.convert_l2(table_name, rule_idx, rule))
-        deep_update(rule_props, self.convert_ip(table_name, rule_idx, rule))
-        deep_update(rule_props, self.convert_icmp(table_name, rule_idx, rule))
-        deep_update(rule_props, self.convert_transport(table_name, rule_idx, rule))
-        deep_update(rule_props, self.convert_input_interface(table_name, rule_idx, rule))
+        rule_props.update(self.convert_action(table_name, rule_idx, rule))
+        rule_props.update(self.convert_l2(table_name, rule_idx, rule))
+        rule_props.update(self.convert_ip(table_name, rule_idx, rule))
+        rule_props.update(self.convert_icmp(table_name, rule_idx, rule))
+        rule_props.update(self.convert_transport(table_name, rule_idx, rule))
+        rule_props.update(self.convert_input_interface(table_name, rule_idx, rule))
 
         self.validate_rule_fields(rule_props)
 
@@ -643,14 +971,35 @@ class AclLoader(object):
             rule_props["ETHER_TYPE"] = str(self.ethertype_map["ETHERTYPE_IPV4"])
         return rule_data
 
-    def convert_rules(self):
+    def get_yang_acl_sets(self):
+        """
+        Generate the ACL sets of the pybind tree of the loaded file
+        :return: Generator of the ACL set names with their list of (ACL entry name, ACL entry)
+        """
+        for acl_set_name in self.yang_acl.acl.acl_sets.acl_set:
+            acl_entries = self.yang_acl.acl.acl_sets.acl_set[acl_set_name].acl_entries.acl_entry
+            yield acl_set_name, [(acl_entry_name, acl_entries[acl_entry_name]) for acl_entry_name in acl_entries]
+
+    def add_rules(self, rules):
+        """
+        Merge rules in Config DB schema into the rules loaded from file
+        :param rules: dict of the rules by key
+        :return:
+        """
+        for key, rule_props in rules.items():
+            self.rules_info.setdefault(key, {}).update(rule_props)
+
+    def convert_rules(self, acl_sets=None):
         """
         Convert rules in openconfig ACL format to Config DB schema
+        :param acl_sets: ACL sets as generated by load_acl_json, those of the pybind tree by default
         :return:
         """
-        for acl_set_name in self.yang_acl.acl.acl_sets.acl_set:
+        if acl_sets is None:
+            acl_sets = self.get_yang_acl_sets()
+
+        for acl_set_name, acl_entries in acl_sets:
             table_name = acl_set_name.replace(" ", "_").replace("-", "_").upper()
-            acl_set = self.yang_acl.acl.acl_sets.acl_set[acl_set_name]
 
             if not self.is_table_valid(table_name):
                 warning("%s table does not exist" % (table_name))
@@ -659,16 +1008,37 @@ class AclLoader(object):
             if self.current_table is not None and self.current_table != table_name:
                 continue
 
-            for acl_entry_name in acl_set.acl_entries.acl_entry:
-                acl_entry = acl_set.acl_entries.acl_entry[acl_entry_name]
+            for acl_entry_name, acl_entry in acl_entries:
                 try:
-                    rule = self.convert_rule_to_db_schema(table_name, acl_entry)
-                    deep_update(self.rules_info, rule)
+                    self.add_rules(self.convert_rule_to_db_schema(table_name, acl_entry))
                 except AclLoaderException as ex:
                     error("Error processing rule %s: %s. Skipped." % (acl_entry_name, ex))
 
             if not self.is_table_mirror(table_name) and not self.is_table_egress(table_name):
-                deep_update(self.rules_info, self.deny_rule(table_name))
+                self.add_rules(self.deny_rule(table_name))
+
+    def get_rule_writer(self):
+        configdbs = OrderedDict([("", self.configdb)])
+        # Program for per front asic namespace also if present
+        configdbs.update(self.per_npu_configdb or {})
+        return AclRuleWriter(configdbs)
+
+    def write_rules(self, removed_rules, updated_rules):
+        """
+        Write one change set of ACL rules to Config DB.
+        :param removed_rules: Keys of the rules to remove
+        :param updated_rules: Rules by key to install, replacing the existing ones
+        :return:
+        """
+        rules = dict.fromkeys(removed_rules)
+        dropped_fields = {}
+        for key, rule in updated_rules.items():
+            current_rule = self.rules_db_info.get(key)
+            if current_rule and set(current_rule) - set(rule):
+                dropped_fields[key] = set(current_rule) - set(rule)
+            rules[key] = rule
+
+        self.get_rule_writer().write(rules, dropped_fields)
 
     def full_update(self):
         """
@@ -678,18 +1048,94 @@ class AclLoader(object):
         be removed and new rules in that table will be installed.
         :return:
         """
-        for key in self.rules_db_info:
-            if self.current_table is None or self.current_table == key[0]:
-                self.configdb.mod_entry(self.ACL_RULE, key, None)
-                # Program for per front asic namespace also if present
-                for namespace_configdb in self.per_npu_configdb.values():
-                    namespace_configdb.mod_entry(self.ACL_RULE, key, None)
+        removed_rules = [key for key in self.rules_db_info
+                         if self.current_table is None or self.current_table == key[0]]
+        self.write_rules(removed_rules, self.rules_info)
 
+    def resequence_rules(self, new_rules, current_rules):
+        """
+        Assign the priorities of the rules of one table. The longest chain of
+        rules whose content is unchanged, but for their priority, and which are
+        still in the same order keep their current priority, unless it is out of
+        min_priority..max_priority. The other rules get their own priority if it
+        fits between the ones of the chain around them, else priorities spread
+        in between.
+        :param new_rules: Rules of the table by key in Config DB schema
+        :param current_rules: Rules of the table in Config DB by key
+        :return: Priority by rule key, None if the chain leaves no room for the other rules
+                 between min_priority and max_priority
+        """
+        order = sorted(new_rules, key=lambda key: (-int(new_rules[key]["PRIORITY"]), key))
+        candidates = [idx for idx, key in enumerate(order)
+                      if key in current_rules and get_rule_hash(new_rules[key]) == get_rule_hash(current_rules[key])
+                      and self.min_priority <= int(current_rules[key]["PRIORITY"]) <= self.max_priority]
+        current_priorities = [int(current_rules[order[idx]]["PRIORITY"]) for idx in candidates]
+        chain = [(candidates[idx], current_priorities[idx]) for idx in longest_decreasing_chain(current_priorities)]
+
+        priorities = {}
+        start, high = 0, None
+        for end, low in chain + [(len(order), self.min_priority - 1)]:
+            segment = order[start:end]
+            wanted = [int(new_rules[key]["PRIORITY"]) for key in segment]
+            ceiling = self.max_priority + 1 if high is None else high
+            if all(low < priority < ceiling for priority in wanted):
+                priorities.update(zip(segment, wanted))
+            elif ceiling - low <= len(segment):
+                return None
+            elif high is None:
+                priorities.update((key, low + len(segment) - idx) for idx, key in enumerate(segment))
+            else:
+                step = (high - low) // (len(segment) + 1)
+                priorities.update((key, high - (idx + 1) * step) for idx, key in enumerate(segment))
 
-        self.configdb.mod_config({self.ACL_RULE: self.rules_info})
-        # Program for per front asic namespace also if present
-        for namespace_configdb in self.per_npu_configdb.values():
-            namespace_configdb.mod_config({self.ACL_RULE: self.rules_info})
+            if end < len(order):
+                priorities[order[end]] = low
+            start, high = end + 1, low
+
+        return priorities
+
+    def diff_dataplane_rules(self, new_rules, current_rules):
+        """
+        Diff the dataplane rules rule by rule, re-sequencing their priorities
+        so that only the rules whose content or order changed are touched.
+        :param new_rules: Keys of the dataplane rules loaded from file
+        :param current_rules: Keys of the dataplane rules in Config DB
+        :return: Keys of the removed rules, updated rules by key
+        """
+        new_tables = defaultdict(dict)
+        current_tables = defaultdict(dict)
+        for key in new_rules:
+            new_tables[key[0]][key] = self.rules_info[key]
+        for key in current_rules:
+            current_tables[key[0]][key] = self.rules_db_info[key]
+
+        removed_rules = set(current_rules).difference(new_rules)
+        updated_rules = {}
+        counts = dict.fromkeys(["added", "modified", "re-prioritized", "unchanged"], 0)
+        for table_name, table_rules in new_tables.items():
+            table_current_rules = current_tables[table_name]
+            priorities = self.resequence_rules(table_rules, table_current_rules)
+            if priorities is None:
+                priorities = {key: int(rule["PRIORITY"]) for key, rule in table_rules.items()}
+
+            for key, rule in table_rules.items():
+                rule["PRIORITY"] = str(priorities[key])
+                current_rule = table_current_rules.get(key)
+                if current_rule is None:
+                    counts["added"] += 1
+                elif operator.eq(rule, current_rule):
+                    counts["unchanged"] += 1
+                    continue
+                elif get_rule_hash(rule) == get_rule_hash(current_rule):
+                    counts["re-prioritized"] += 1
+                else:
+                    counts["modified"] += 1
+                updated_rules[key] = rule
+
+        info("Dataplane rules: %d touched (%d added, %d removed, %d modified, %d re-prioritized), %d unchanged" % (
+            len(updated_rules) + len(removed_rules), counts["added"], len(removed_rules), counts["modified"],
+            counts["re-prioritized"], counts["unchanged"]))
+        return removed_rules, updated_rules
 
     def incremental_update(self):
         """
@@ -702,7 +1148,7 @@ class AclLoader(object):
         # TODO: Until we test ASIC behavior, we cannot assume that we can insert
         # dataplane ACLs and shift existing ACLs. Therefore, we perform a full
         # update on dataplane ACLs, and only perform an incremental update on
-        # control plane ACLs.
+        # control plane ACLs, unless dataplane_incremental is set.
 
         new_rules = set(self.rules_info.keys())
         new_dataplane_rules = set()
@@ -725,46 +1171,29 @@ class AclLoader(object):
             else:
                 current_dataplane_rules.add(key)
 
-        # Remove all existing dataplane rules
-        for key in current_dataplane_rules:
-            self.configdb.mod_entry(self.ACL_RULE, key, None)
-            # Program for per-asic namespace also if present
-            for namespace_configdb in self.per_npu_configdb.values():
-                namespace_configdb.mod_entry(self.ACL_RULE, key, None)
-
-
-        # Add all new dataplane rules
-        for key in new_dataplane_rules:
-            self.configdb.mod_entry(self.ACL_RULE, key, self.rules_info[key])
-            # Program for per-asic namespace corresponding to front asic also if present.
-            for namespace_configdb in self.per_npu_configdb.values():
-                namespace_configdb.mod_entry(self.ACL_RULE, key, self.rules_info[key])
+        if self.dataplane_incremental:
+            removed_rules, updated_rules = self.diff_dataplane_rules(new_dataplane_rules, current_dataplane_rules)
+        else:
+            # Remove all existing dataplane rules and add all new dataplane rules
+            removed_rules = set(current_dataplane_rules)
+            updated_rules = {key: self.rules_info[key] for key in new_dataplane_rules}
 
         added_controlplane_rules = new_controlplane_rules.difference(current_controlplane_rules)
         removed_controlplane_rules = current_controlplane_rules.difference(new_controlplane_rules)
         existing_controlplane_rules = new_rules.intersection(current_controlplane_rules)
 
+        # For control plane ACL per-asic namespaces are not needed but to keep
+        # all db in sync program everywhere
         for key in added_controlplane_rules:
-            self.configdb.mod_entry(self.ACL_RULE, key, self.rules_info[key])
-            # Program for per-asic namespace corresponding to front asic also if present.
-            # For control plane ACL it's not needed but to keep all db in sync program everywhere
-            for namespace_configdb in self.per_npu_configdb.values():
-                namespace_configdb.mod_entry(self.ACL_RULE, key, self.rules_info[key])
-
-        for key in removed_controlplane_rules:
-            self.configdb.mod_entry(self.ACL_RULE, key, None)
-            # Program for per-asic namespace corresponding to front asic also if present.
-            # For control plane ACL it's not needed but to keep all db in sync program everywhere
-            for namespace_configdb in self.per_npu_configdb.values():
-                namespace_configdb.mod_entry(self.ACL_RULE, key, None)
+            updated_rules[key] = self.rules_info[key]
+
+        removed_rules.update(removed_controlplane_rules)
 
         for key in existing_controlplane_rules:
             if not operator.eq(self.rules_info[key], self.rules_db_info[key]):
-                self.configdb.set_entry(self.ACL_RULE, key, self.rules_info[key])
-                # Program for per-asic namespace corresponding to front asic also if present.
-                # For control plane ACL it's not needed but to keep all db in sync program everywhere
-                for namespace_configdb in self.per_npu_configdb.values():
-                    namespace_configdb.set_entry(self.ACL_RULE, key, self.rules_info[key])
+                updated_rules[key] = self.rules_info[key]
+
+        self.write_rules(removed_rules, updated_rules)
 
     def delete(self, table=None, rule=None):
         """
@@ -772,13 +1201,12 @@ class AclLoader(object):
         :param rule:
         :return:
         """
+        removed_rules = []
         for key in self.rules_db_info:
             if not table or table == key[0]:
                 if not rule or rule == key[1]:
-                    self.configdb.set_entry(self.ACL_RULE, key, None)
-                    # Program for per-asic namespace corresponding to front asic also if present.
-                    for namespace_configdb in self.per_npu_configdb.values():
-                        namespace_configdb.set_entry(self.ACL_RULE, key, None)
+                    removed_rules.append(key)
+        self.write_rules(removed_rules, {})
 
     def show_table(self, table_name):
         """
@@ -1050,13 +1478,17 @@ def full(ctx, filename, table_name, session_name, mirror_stage, max_priority):
 @click.option('--session_name', type=click.STRING, required=False)
 @click.option('--mirror_stage', type=click.Choice(["ingress", "egress"]), default="ingress")
 @click.option('--max_priority', type=click.INT, required=False)
+@click.option('--dataplane_incremental', is_flag=True, default=False,
+              help="Only update the dataplane rules which changed instead of replacing them all")
 @click.pass_context
-def incremental(ctx, filename, session_name, mirror_stage, max_priority):
+def incremental(ctx, filename, session_name, mirror_stage, max_priority, dataplane_incremental):
     """
     Incremental update of ACL rule configuration.
     """
     acl_loader = ctx.obj["acl_loader"]
 
+    acl_loader.set_dataplane_incremental(dataplane_incremental)
+
     if session_name:
         acl_loader.set_session_name(session_name)
 
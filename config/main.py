@@ -50,6 +50,7 @@ from . import vlan
 from . import vxlan
 from . import plugins
 from .config_mgmt import ConfigMgmtDPB, ConfigMgmt
+from .reload import ConfigReloader, ConfigFileError, read_config_file
 from . import mclag
 from . import syslog
 
@@ -1201,6 +1202,130 @@ def validate_config_file(file):
                     fg='magenta')
         sys.exit(1)
 
+def _read_config_file(file):
+    """
+    Read and validate a config file in config_db format, exit if invalid
+    """
+    try:
+        return read_config_file(file)
+    except ConfigFileError as e:
+        click.secho("Bad format: json file '{}' broken.\n{}".format(file, str(e)),
+                    fg='magenta')
+        sys.exit(1)
+
+def _get_config_reloader():
+    """
+    Return the ConfigReloader of the namespaces, exit if INIT_CFG_FILE is invalid
+    """
+    try:
+        return ConfigReloader(INIT_CFG_FILE)
+    except ConfigFileError as e:
+        click.secho("Bad format: json file '{}' broken.\n{}".format(INIT_CFG_FILE, str(e)),
+                    fg='magenta')
+        sys.exit(1)
+
+def _load_config_files(cfg_file_dict, file_format, load_sysinfo):
+    """
+    Load the config files of the namespaces one by one with sonic-cfggen
+    """
+    for file, namespace, file_exists in cfg_file_dict.values():
+        if not file_exists:
+            click.echo("The config file {} doesn't exist".format(file))
+            continue
+
+        if load_sysinfo:
+            try:
+                command = "{} -j {} -v DEVICE_METADATA.localhost.hwsku".format(SONIC_CFGGEN_PATH, file)
+                proc = subprocess.Popen(command, shell=True, text=True, stdout=subprocess.PIPE)
+                output, err = proc.communicate()
+
+            except FileNotFoundError as e:
+                click.echo("{}".format(str(e)), err=True)
+                raise click.Abort()
+            except Exception as e:
+                click.echo("{}\n{}".format(type(e), str(e)), err=True)
+                raise click.Abort()
+
+            if not output:
+                click.secho("Could not get the HWSKU from config file,  Exiting!!!", fg='magenta')
+                sys.exit(1)
+
+            cfg_hwsku = output.strip()
+
+        if namespace is None:
+            config_db = ConfigDBConnector()
+        else:
+            config_db = ConfigDBConnector(use_unix_socket_path=True, namespace=namespace)
+
+        config_db.connect()
+        client = config_db.get_redis_client(config_db.CONFIG_DB)
+        client.flushdb()
+
+        if load_sysinfo:
+            if namespace is None:
+                command = "{} -H -k {} --write-to-db".format(SONIC_CFGGEN_PATH, cfg_hwsku)
+            else:
+                command = "{} -H -k {} -n {} --write-to-db".format(SONIC_CFGGEN_PATH, cfg_hwsku, namespace)
+            clicommon.run_command(command, display_cmd=True)
+
+        # For the database service running in linux host we use the file user gives as input
+        # or by default DEFAULT_CONFIG_DB_FILE. In the case of database service running in namespace,
+        # the default config_db<namespaceID>.json format is used.
+
+
+        config_gen_opts = ""
+
+        if os.path.isfile(INIT_CFG_FILE):
+            config_gen_opts += " -j {} ".format(INIT_CFG_FILE)
+
+        if file_format == 'config_db':
+            config_gen_opts += ' -j {} '.format(file)
+        else:
+            config_gen_opts += ' -Y {} '.format(file)
+
+        if namespace is not None:
+            config_gen_opts += " -n {} ".format(namespace)
+
+
+        command = "{sonic_cfggen} {options} --write-to-db".format(
+            sonic_cfggen=SONIC_CFGGEN_PATH,
+            options=config_gen_opts)
+
+        clicommon.run_command(command, display_cmd=True)
+        client.set(config_db.INIT_INDICATOR, 1)
+
+        # Migrate DB contents to latest version
+        db_migrator='/usr/local/bin/db_migrator.py'
+        if os.path.isfile(db_migrator) and os.access(db_migrator, os.X_OK):
+            if namespace is None:
+                command = "{} -o migrate".format(db_migrator)
+            else:
+                command = "{} -o migrate -n {}".format(db_migrator, namespace)
+            clicommon.run_command(command, display_cmd=True)
+
+def _load_minigraph_namespaces(namespace_list):
+    """
+    Load the minigraph config of the namespaces one by one with sonic-cfggen
+    """
+    for namespace in namespace_list:
+        if namespace is DEFAULT_NAMESPACE:
+            config_db = ConfigDBConnector()
+            cfggen_namespace_option = " "
+            ns_cmd_prefix = ""
+        else:
+            config_db = ConfigDBConnector(use_unix_socket_path=True, namespace=namespace)
+            cfggen_namespace_option = " -n {}".format(namespace)
+            ns_cmd_prefix = "sudo ip netns exec {} ".format(namespace)
+        config_db.connect()
+        client = config_db.get_redis_client(config_db.CONFIG_DB)
+        client.flushdb()
+        if os.path.isfile('/etc/sonic/init_cfg.json'):
+            command = "{} -H -m -j /etc/sonic/init_cfg.json {} --write-to-db".format(SONIC_CFGGEN_PATH, cfggen_namespace_option)
+        else:
+            command = "{} -H -m --write-to-db {}".format(SONIC_CFGGEN_PATH, cfggen_namespace_option)
+        clicommon.run_command(command, display_cmd=True)
+        client.set(config_db.INIT_INDICATOR, 1)
+
 # This is our main entrypoint - the main 'config' command
 @click.group(cls=clicommon.AbbreviationGroup, context_settings=CONTEXT_SETTINGS)
 @click.pass_context
@@ -1532,12 +1657,18 @@ def list_checkpoints(ctx, verbose):
 @click.option('-n', '--no_service_restart', default=False, is_flag=True, help='Do not restart docker services')
 @click.option('-f', '--force', default=False, is_flag=True, help='Force config reload without system checks')
 @click.option('-t', '--file_format', default='config_db',type=click.Choice(['config_yang', 'config_db']),show_default=True,help='specify the file format')
+@click.option('--parallel', default=False, is_flag=True,
+              help='Load the config_db files of all namespaces concurrently, in process')
 @click.argument('filename', required=False)
 @clicommon.pass_db
-def reload(db, filename, yes, load_sysinfo, no_service_restart, force, file_format):
+def reload(db, filename, yes, load_sysinfo, no_service_restart, force, file_format, parallel):
     """Clear current configuration and import a previous saved config DB dump file.
        <filename> : Names of configuration file(s) to load, separated by comma with no spaces in between
     """
+    if parallel and file_format != 'config_db':
+        click.secho("--parallel is only supported for config files in config_db format", fg='magenta')
+        sys.exit(1)
+
     CONFIG_RELOAD_NOT_READY = 1
     if not force and not no_service_restart:
         if _is_system_starting():
@@ -1581,6 +1712,10 @@ def reload(db, filename, yes, load_sysinfo, no_service_restart, force, file_form
     # Create a dictionary to store each cfg_file, namespace, and a bool representing if a the file exists
     cfg_file_dict = {}
 
+    # The config files are read up front when loaded in process
+    cfg_data = {}
+    cfg_hwskus = {}
+
     # In Single ASIC platforms we have single DB service. In multi-ASIC platforms we have a global DB
     # service running in the host + DB services running in each ASIC namespace created per ASIC.
     # In the below logic, we get all namespaces in this platform and add an empty namespace ''
@@ -1611,11 +1746,22 @@ def reload(db, filename, yes, load_sysinfo, no_service_restart, force, file_form
             continue
         cfg_file_dict[inst] = [file, namespace, True]
 
+        if parallel:
+            cfg_data[namespace] = _read_config_file(file)
+            if load_sysinfo:
+                cfg_hwskus[namespace] = cfg_data[namespace].get('DEVICE_METADATA', {}).get('localhost', {}).get('hwsku')
+                if not cfg_hwskus[namespace]:
+                    click.secho("Could not get the HWSKU from config file,  Exiting!!!", fg='magenta')
+                    sys.exit(1)
+            continue
+
         # Check the file is properly formatted before proceeding.
         validate_config_file(file) 
             
     #Validate INIT_CFG_FILE if it exits
-    if os.path.isfile(INIT_CFG_FILE):
+    if parallel:
+        reloader = _get_config_reloader()
+    elif os.path.isfile(INIT_CFG_FILE):
         validate_config_file(INIT_CFG_FILE)
 
     #Stop services before config push
@@ -1623,80 +1769,14 @@ def reload(db, filename, yes, load_sysinfo, no_service_restart, force, file_form
         log.log_info("'reload' stopping services...")
         _stop_services()
 
-    for file, namespace, file_exists in cfg_file_dict.values():
-        if not file_exists:
-            click.echo("The config file {} doesn't exist".format(file))
-            continue
-
-        if load_sysinfo:
-            try:
-                command = "{} -j {} -v DEVICE_METADATA.localhost.hwsku".format(SONIC_CFGGEN_PATH, file)
-                proc = subprocess.Popen(command, shell=True, text=True, stdout=subprocess.PIPE)
-                output, err = proc.communicate()
-
-            except FileNotFoundError as e:
-                click.echo("{}".format(str(e)), err=True)
-                raise click.Abort()
-            except Exception as e:
-                click.echo("{}\n{}".format(type(e), str(e)), err=True)
-                raise click.Abort()
-
-            if not output:
-                click.secho("Could not get the HWSKU from config file,  Exiting!!!", fg='magenta')
-                sys.exit(1)
-
-            cfg_hwsku = output.strip()
-
-        if namespace is None:
-            config_db = ConfigDBConnector()
-        else:
-            config_db = ConfigDBConnector(use_unix_socket_path=True, namespace=namespace)
-
-        config_db.connect()
-        client = config_db.get_redis_client(config_db.CONFIG_DB)
-        client.flushdb()
-
-        if load_sysinfo:
-            if namespace is None:
-                command = "{} -H -k {} --write-to-db".format(SONIC_CFGGEN_PATH, cfg_hwsku)
-            else:
-                command = "{} -H -k {} -n {} --write-to-db".format(SONIC_CFGGEN_PATH, cfg_hwsku, namespace)
-            clicommon.run_command(command, display_cmd=True)
-
-        # For the database service running in linux host we use the file user gives as input
-        # or by default DEFAULT_CONFIG_DB_FILE. In the case of database service running in namespace,
-        # the default config_db<namespaceID>.json format is used.
-
-
-        config_gen_opts = ""
-
-        if os.path.isfile(INIT_CFG_FILE):
-            config_gen_opts += " -j {} ".format(INIT_CFG_FILE)
-
-        if file_format == 'config_db':
-            config_gen_opts += ' -j {} '.format(file)
-        else:
-            config_gen_opts += ' -Y {} '.format(file)
-
-        if namespace is not None:
-            config_gen_opts += " -n {} ".format(namespace)
-
-
-        command = "{sonic_cfggen} {options} --write-to-db".format(
-            sonic_cfggen=SONIC_CFGGEN_PATH,
-            options=config_gen_opts)
-
-        clicommon.run_command(command, display_cmd=True)
-        client.set(config_db.INIT_INDICATOR, 1)
-
-        # Migrate DB contents to latest version
-        db_migrator='/usr/local/bin/db_migrator.py'
-        if os.path.isfile(db_migrator) and os.access(db_migrator, os.X_OK):
-            if namespace is None:
-                command = "{} -o migrate".format(db_migrator)
-            else:
-                command = "{} -o migrate -n {}".format(db_migrator, namespace)
-            clicommon.run_command(command, display_cmd=True)
+    if parallel:
+        for file, namespace, file_exists in cfg_file_dict.values():
+            if not file_exists:
+                click.echo("The config file {} doesn't exist".format(file))
+        if not reloader.reload(cfg_data, cfg_hwskus):
+            sys.exit(1)
+    else:
+        _load_config_files(cfg_file_dict, file_format, load_sysinfo)
 
     # Re-generate the environment variable in case config_db.json was edited
     update_sonic_environment()
@@ -1749,11 +1829,15 @@ def load_mgmt_config(filename):
 @click.option('-t', '--traffic_shift_away', default=False, is_flag=True, help='Keep device in maintenance with TSA')
 @click.option('-o', '--override_config', default=False, is_flag=True, help='Enable config override. Proceed with default path.')
 @click.option('-p', '--golden_config_path', help='Provide golden config path to override. Use with --override_config')
+@click.option('--parallel', default=False, is_flag=True, help='Load the config of all namespaces concurrently')
 @clicommon.pass_db
-def load_minigraph(db, no_service_restart, traffic_shift_away, override_config, golden_config_path):
+def load_minigraph(db, no_service_restart, traffic_shift_away, override_config, golden_config_path, parallel):
     """Reconfigure based on minigraph."""
     log.log_info("'load_minigraph' executing...")
 
+    if parallel:
+        reloader = _get_config_reloader()
+
     #Stop services before config push
     if not no_service_restart:
         log.log_info("'load_minigraph' stopping services...")
@@ -1767,24 +1851,11 @@ def load_minigraph(db, no_service_restart, traffic_shift_away, override_config,
     if num_npus > 1:
         namespace_list += multi_asic.get_namespaces_from_linux()
 
-    for namespace in namespace_list:
-        if namespace is DEFAULT_NAMESPACE:
-            config_db = ConfigDBConnector()
-            cfggen_namespace_option = " "
-            ns_cmd_prefix = ""
-        else:
-            config_db = ConfigDBConnector(use_unix_socket_path=True, namespace=namespace)
-            cfggen_namespace_option = " -n {}".format(namespace)
-            ns_cmd_prefix = "sudo ip netns exec {} ".format(namespace)
-        config_db.connect()
-        client = config_db.get_redis_client(config_db.CONFIG_DB)
-        client.flushdb()
-        if os.path.isfile('/etc/sonic/init_cfg.json'):
-            command = "{} -H -m -j /etc/sonic/init_cfg.json {} --write-to-db".format(SONIC_CFGGEN_PATH, cfggen_namespace_option)
-        else:
-            command = "{} -H -m --write-to-db {}".format(SONIC_CFGGEN_PATH, cfggen_namespace_option)
-        clicommon.run_command(command, display_cmd=True)
-        client.set(config_db.INIT_INDICATOR, 1)
+    if parallel:
+        if not reloader.load_minigraph(namespace_list):
+            sys.exit(1)
+    else:
+        _load_minigraph_namespaces(namespace_list)
 
     # Update SONiC environmnet file
     update_sonic_environment()
@@ -1800,7 +1871,7 @@ def load_minigraph(db, no_service_restart, traffic_shift_away, override_config,
 
     # Load port_config.json
     try:
-        load_port_config(db.cfgdb, '/etc/sonic/port_config.json')
+        load_port_config(db.cfgdb_pipe, '/etc/sonic/port_config.json')
     except Exception as e:
         click.secho("Failed to load port_config.json, Error: {}".format(str(e)), fg='magenta')
 
@@ -1812,7 +1883,10 @@ def load_minigraph(db, no_service_restart, traffic_shift_away, override_config,
 
     # Write latest db version string into db
     db_migrator='/usr/local/bin/db_migrator.py'
-    if os.path.isfile(db_migrator) and os.access(db_migrator, os.X_OK):
+    if parallel:
+        if not reloader.set_version(namespace_list):
+            sys.exit(1)
+    elif os.path.isfile(db_migrator) and os.access(db_migrator, os.X_OK):
         for namespace in namespace_list:
             if namespace is DEFAULT_NAMESPACE:
                 cfggen_namespace_option = " "
@@ -1865,24 +1939,29 @@ def load_port_config(config_db, port_config_path):
 
     port_config = port_config_input[0]['PORT']
 
-    # Ensure all ports are exist
-    port_table = {}
-    for port_name in port_config.keys():
-        port_entry = config_db.get_entry('PORT', port_name)
-        if not port_entry:
+    # Validate all the ports before changing any of them: they must exist,
+    # as 'config interface startup|shutdown' requires, and be set up or down
+    port_table = config_db.get_table('PORT')
+    port_delta = {}
+    for port_name, port_entry in port_config.items():
+        if port_name not in port_table:
             raise Exception("Port {} is not defined in current device".format(port_name))
-        port_table[port_name] = port_entry
-
-    # Update port state
-    for port_name in port_config.keys():
-        if 'admin_status' not in port_config[port_name]:
+        if 'admin_status' not in port_entry:
             continue
-        if 'admin_status' in port_table[port_name]:
-            if port_table[port_name]['admin_status'] == port_config[port_name]['admin_status']:
-                continue
-            clicommon.run_command('config interface {} {}'.format(
-                'startup' if port_config[port_name]['admin_status'] == 'up' else 'shutdown',
-                port_name), display_cmd=True)
+        admin_status = port_entry['admin_status']
+        if admin_status not in ('up', 'down'):
+            raise Exception("Invalid admin_status {} of port {}".format(admin_status, port_name))
+        if port_table[port_name].get('admin_status', admin_status) == admin_status:
+            continue
+        port_delta[port_name] = {'admin_status': admin_status}
+
+    # Update port state in one transaction
+    for port_name, port_entry in port_delta.items():
+        click.echo("Setting admin_status of {} to {}".format(port_name, port_entry['admin_status']))
+        log.log_info("'interface {} {}' executing...".format(
+            'startup' if port_entry['admin_status'] == 'up' else 'shutdown', port_name))
+    if port_delta:
+        config_db.mod_config({'PORT': port_delta})
     return
 
 
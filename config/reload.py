@@ -0,0 +1,207 @@
+"""
+In process, concurrent load of the config of all the namespaces.
+
+'config reload' and 'config load_minigraph' load each namespace in turn, by
+running sonic-cfggen and db_migrator.py as separate processes. ConfigReloader
+loads each namespace in its own thread instead: its CONFIG_DB is flushed, the
+config files, read and validated up front, are written with one pipelined
+transaction and the migrations are run in process.
+"""
+
+import copy
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import click
+from swsscommon.swsscommon import ConfigDBPipeConnector
+import utilities_common.cli as clicommon
+from utilities_common.general import load_module_from_source
+
+from .utils import log
+
+SONIC_CFGGEN_PATH = '/usr/local/bin/sonic-cfggen'
+DB_MIGRATOR_PATH = '/usr/local/bin/db_migrator.py'
+
+# Load sonic-cfggen from source since /usr/local/bin/sonic-cfggen does not have .py extension.
+sonic_cfggen = load_module_from_source('sonic_cfggen', SONIC_CFGGEN_PATH)
+
+
+class ConfigFileError(Exception):
+    pass
+
+
+def load_db_migrator(path=DB_MIGRATOR_PATH):
+    """
+    Return the db_migrator module, None if it is not installed
+    """
+    if not os.path.isfile(path) or not os.access(path, os.X_OK):
+        return None
+    # db_migrator.py imports the modules installed alongside it
+    script_dir = os.path.dirname(path)
+    if script_dir not in sys.path:
+        sys.path.append(script_dir)
+    return load_module_from_source('db_migrator', path)
+
+
+def read_config_file(filename):
+    """
+    Read a config file in config_db format, as sonic-cfggen -j does
+    :param filename: Path of the config file
+    :return: The config, deserialized
+    :raise ConfigFileError: If the file is not a valid config
+    """
+    try:
+        with open(filename) as f:
+            config = json.load(f)
+    except Exception as e:
+        raise ConfigFileError(str(e))
+
+    if not isinstance(config, dict):
+        raise ConfigFileError("config is not a dict")
+    for table, entries in config.items():
+        if not isinstance(entries, dict):
+            raise ConfigFileError("table {} is not a dict".format(table))
+        for key, entry in entries.items():
+            if not isinstance(entry, dict):
+                raise ConfigFileError("entry {}|{} is not a dict".format(table, key))
+
+    return sonic_cfggen.FormatConverter.to_deserialized(config)
+
+
+class ConfigReloader(object):
+    """
+    Load the config of several namespaces concurrently, echoing how long
+    each step took. The host namespace is either None or ''.
+    """
+
+    def __init__(self, init_cfg_file=None, db_migrator_path=DB_MIGRATOR_PATH):
+        self.init_cfg_file = None
+        self.init_config = {}
+        if init_cfg_file is not None and os.path.isfile(init_cfg_file):
+            self.init_cfg_file = init_cfg_file
+            self.init_config = read_config_file(init_cfg_file)
+        # Imported up front, not by the threads
+        self.db_migrator = load_db_migrator(db_migrator_path)
+        self.echo_lock = threading.Lock()
+
+    def echo(self, namespace, message):
+        with self.echo_lock:
+            click.echo("{}: {}".format(namespace or "host", message))
+
+    def run_step(self, namespace, step, func, *args):
+        start = time.time()
+        result = func(*args)
+        self.echo(namespace, "{} in {:.3f}s".format(step, time.time() - start))
+        return result
+
+    def connect(self, namespace):
+        if not namespace:
+            config_db = ConfigDBPipeConnector()
+        else:
+            config_db = ConfigDBPipeConnector(use_unix_socket_path=True, namespace=namespace)
+        config_db.connect()
+        return config_db
+
+    def flush(self, config_db):
+        config_db.get_redis_client(config_db.CONFIG_DB).flushdb()
+
+    def set_init_indicator(self, config_db):
+        config_db.get_redis_client(config_db.CONFIG_DB).set(config_db.INIT_INDICATOR, 1)
+
+    def write_config(self, config_db, config):
+        """
+        Write the init config and the config in one transaction
+        """
+        data = sonic_cfggen.deep_update(copy.deepcopy(self.init_config), config)
+        config_db.mod_config(sonic_cfggen.FormatConverter.output_to_db(data))
+        self.set_init_indicator(config_db)
+
+    def run_cfggen(self, namespace, options):
+        command = "{} {}".format(SONIC_CFGGEN_PATH, options)
+        if namespace:
+            command += " -n {}".format(namespace)
+        clicommon.run_command(command + " --write-to-db", display_cmd=True)
+
+    def migrate(self, namespace, operation):
+        getattr(self.db_migrator.DBMigrator(namespace or None), operation)()
+
+    def run(self, namespaces, load):
+        """
+        Call load(namespace) for all namespaces concurrently
+        :param namespaces: List of the namespaces
+        :param load: Function loading one namespace
+        :return: True if all namespaces were loaded
+        """
+        def run_namespace(namespace):
+            try:
+                load(namespace)
+                return True
+            except (Exception, SystemExit) as e:
+                # run_command exits on failure
+                self.echo(namespace, click.style("Failed to load config: {}".format(e), fg='red'))
+                log.log_error("Failed to load config of namespace {}: {}".format(namespace or "host", e))
+                return False
+
+        if not namespaces:
+            return True
+
+        start = time.time()
+        with ThreadPoolExecutor(max_workers=len(namespaces)) as executor:
+            results = list(executor.map(run_namespace, namespaces))
+        click.echo("Finished loading {} namespace(s) in {:.3f}s".format(len(namespaces), time.time() - start))
+        return all(results)
+
+    def reload(self, configs, hwskus=None):
+        """
+        Replace the config of each namespace, as 'config reload' does
+        :param configs: dict of the config by namespace, as returned by read_config_file
+        :param hwskus: dict of the HWSKU by namespace, to load the system default information first
+        :return: True if all namespaces were loaded
+        """
+        def load(namespace):
+            config_db = self.run_step(namespace, "Connected", self.connect, namespace)
+            self.run_step(namespace, "Flushed CONFIG_DB", self.flush, config_db)
+            if hwskus:
+                self.run_step(namespace, "Loaded system information", self.run_cfggen,
+                              namespace, "-H -k {}".format(hwskus[namespace]))
+            self.run_step(namespace, "Loaded config", self.write_config, config_db, configs[namespace])
+            if self.db_migrator is not None:
+                self.run_step(namespace, "Migrated config", self.migrate, namespace, "migrate")
+
+        return self.run(list(configs), load)
+
+    def load_minigraph(self, namespaces):
+        """
+        Replace the config of each namespace by the one generated from minigraph
+        :param namespaces: List of the namespaces
+        :return: True if all namespaces were loaded
+        """
+        options = "-H -m"
+        if self.init_cfg_file is not None:
+            options += " -j {}".format(self.init_cfg_file)
+
+        def load(namespace):
+            config_db = self.run_step(namespace, "Connected", self.connect, namespace)
+            self.run_step(namespace, "Flushed CONFIG_DB", self.flush, config_db)
+            self.run_step(namespace, "Loaded minigraph", self.run_cfggen, namespace, options)
+            self.set_init_indicator(config_db)
+
+        return self.run(namespaces, load)
+
+    def set_version(self, namespaces):
+        """
+        Write the latest DB version of each namespace
+        :param namespaces: List of the namespaces
+        :return: True if the version of all namespaces was written
+        """
+        if self.db_migrator is None:
+            return True
+
+        def load(namespace):
+            self.run_step(namespace, "Set DB version", self.migrate, namespace, "set_version")
+
+        return self.run(namespaces, load)
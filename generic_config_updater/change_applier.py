@@ -3,10 +3,12 @@ import json
 import jsondiff
 import importlib
 import os
-import tempfile
+import time
 from collections import defaultdict
-from swsscommon.swsscommon import ConfigDBConnector
-from .gu_common import genericUpdaterLogging
+from jsonpointer import JsonPointer
+from swsscommon.swsscommon import ConfigDBConnector, ConfigDBPipeConnector
+from utilities_common import bulk_write
+from .gu_common import ConfigDbSnapshotReader, genericUpdaterLogging
 
 SCRIPT_DIR = os.path.dirname(os.path.realpath(__file__))
 UPDATER_CONF_FILE = f"{SCRIPT_DIR}/generic_config_updater.conf.json"
@@ -28,6 +30,10 @@ def log_debug(m):
     logger.log(logger.LOG_PRIORITY_DEBUG, m, print_to_console)
 
 
+def log_notice(m):
+    logger.log(logger.LOG_PRIORITY_NOTICE, m, print_to_console)
+
+
 def log_error(m):
     logger.log(logger.LOG_PRIORITY_ERROR, m, print_to_console)
 
@@ -38,10 +44,42 @@ def get_config_db():
     return config_db
 
 
+def get_config_db_pipe():
+    config_db = ConfigDBPipeConnector()
+    config_db.connect()
+    return config_db
+
+
 def set_config(config_db, tbl, key, data):
     config_db.set_entry(tbl, key, data)
 
 
+def mod_config(config_db, data, dropped_fields=None):
+    # All the entries are written in one MULTI/EXEC transaction, which
+    # also removes the dropped fields of the entries
+    bulk_write.mod_config(config_db, data, dropped_fields)
+
+
+def get_affected_tables(change):
+    # Tables touched by the operations of the JsonChange patch,
+    # None if unknown or if the whole config is touched
+    #
+    patch = getattr(change, "patch", None)
+    if patch is None:
+        return None
+
+    tables = set()
+    for operation in patch:
+        for path in (operation.get("path"), operation.get("from")):
+            if path is None:
+                continue
+            tokens = JsonPointer(path).parts
+            if not tokens:
+                return None
+            tables.add(tokens[0])
+    return tables
+
+
 def prune_empty_table(data):
     # For JSON Patch empty entries are valid
     # With redis, when last key is removed, the table gets removed too.
@@ -69,12 +107,22 @@ class DryRunChangeApplier:
         return data
 
 
+    def close(self):
+        pass
+
+
 class ChangeApplier:
 
     updater_conf = None
 
-    def __init__(self):
+    def __init__(self, batch_writes=False):
         self.config_db = get_config_db()
+        # Write all the keys of a change in one transaction
+        self.batch_writes = batch_writes
+        self.config_db_pipe = get_config_db_pipe() if batch_writes else None
+        self.config_db_reader = ConfigDbSnapshotReader()
+        # Local mirror of CONFIG_DB, maintained with the changes applied
+        self.running_config = None
         self.backend_tables = [
             "BUFFER_PG",
             "BUFFER_PROFILE",
@@ -134,44 +182,123 @@ class ChangeApplier:
                 log_debug("Patch affected tbl={} key={}".format(tbl, key))
 
 
+    def _upd_data_batch(self, tbls, run_data, upd_data, upd_keys):
+        batch = defaultdict(dict)
+        dropped_fields = defaultdict(dict)
+        for tbl in tbls:
+            run_tbl = run_data.get(tbl, {})
+            upd_tbl = upd_data.get(tbl, {})
+            for key in set(run_tbl.keys()).union(set(upd_tbl.keys())):
+                run_entry = run_tbl.get(key, None)
+                upd_entry = upd_tbl.get(key, None)
+                if run_entry == upd_entry:
+                    continue
+
+                # The transaction sets the given fields only, the
+                # fields the entry loses are removed explicitly
+                #
+                if run_entry and upd_entry is not None and set(run_entry) - set(upd_entry):
+                    dropped_fields[tbl][key] = set(run_entry) - set(upd_entry)
+                batch[tbl][key] = upd_entry
+                upd_keys[tbl][key] = {}
+                log_debug("Patch affected tbl={} key={}".format(tbl, key))
+
+        if batch:
+            mod_config(self.config_db_pipe, batch, dropped_fields)
+
+
     def _report_mismatch(self, run_data, upd_data):
         log_error("run_data vs expected_data: {}".format(
             str(jsondiff.diff(run_data, upd_data))[0:40]))
 
 
     def apply(self, change):
+        start_time = time.time()
         run_data = self._get_running_config()
         upd_data = prune_empty_table(change.apply(copy.deepcopy(run_data)))
         upd_keys = defaultdict(dict)
-
-        for tbl in sorted(set(run_data.keys()).union(set(upd_data.keys()))):
-            self._upd_data(tbl, run_data.get(tbl, {}),
-                    upd_data.get(tbl, {}), upd_keys)
+        read_time = time.time()
+
+        tbls = get_affected_tables(change)
+        if tbls is None:
+            tbls = set(run_data.keys()).union(set(upd_data.keys()))
+        tbls = sorted(tbls)
+        if self.batch_writes:
+            self._upd_data_batch(tbls, run_data, upd_data, upd_keys)
+        else:
+            for tbl in tbls:
+                self._upd_data(tbl, run_data.get(tbl, {}),
+                        upd_data.get(tbl, {}), upd_keys)
+        write_time = time.time()
+        upd_count = sum(len(keys) for keys in upd_keys.values())
 
         ret = self._services_validate(run_data, upd_data, upd_keys)
+        validate_time = time.time()
         if not ret:
-            run_data = self._get_running_config()
-            self.remove_backend_tables_from_config(upd_data)
-            self.remove_backend_tables_from_config(run_data)
-            if upd_data != run_data:
-                self._report_mismatch(run_data, upd_data)
-                ret = -1
+            ret = self._verify_tables(upd_data, upd_keys)
+        end_time = time.time()
+
+        log_notice("Change of {} key{} applied in {:.3f}s: read {:.3f}s, "
+                "write {:.3f}s, validate {:.3f}s, verify {:.3f}s".format(
+                    upd_count, "s" if upd_count != 1 else "", end_time - start_time,
+                    read_time - start_time, write_time - read_time,
+                    validate_time - write_time, end_time - validate_time))
         if ret:
             log_error("Failed to apply Json change")
         return ret
 
 
+    def _verify_tables(self, upd_data, upd_keys):
+        tables = [tbl for tbl in upd_keys if tbl]
+        # Only the tables written by this change are read back, along
+        # with the ones changed by others meanwhile, to refresh the mirror.
+        # The notifications of the keys written are drained and left out.
+        #
+        upd_tables = {tbl: upd_data[tbl] for tbl in tables if tbl in upd_data}
+        self.running_config = copy.deepcopy(upd_data)
+        written_keys = {"{}|{}".format(tbl, key) for tbl in tables for key in upd_keys[tbl]}
+        changed_tables = self.config_db_reader.get_changed_tables(written_keys)
+        if changed_tables:
+            log_debug("Running config tables changed: {}".format(sorted(changed_tables)))
+        run_data = self._refresh_tables(set(tables).union(changed_tables))
+
+        run_tables = {tbl: run_data[tbl] for tbl in tables if tbl in run_data}
+        self.remove_backend_tables_from_config(upd_tables)
+        self.remove_backend_tables_from_config(run_tables)
+        if upd_tables != run_tables:
+            self._report_mismatch(run_tables, upd_tables)
+            return -1
+        return 0
+
+
+    def _refresh_tables(self, tables):
+        run_data = self.config_db_reader.get_tables(tables)
+        for tbl in tables:
+            if tbl in run_data:
+                self.running_config[tbl] = copy.deepcopy(run_data[tbl])
+            else:
+                self.running_config.pop(tbl, None)
+        return run_data
+
+
     def remove_backend_tables_from_config(self, data):
         for key in self.backend_tables:
             data.pop(key, None)
 
 
+    def close(self):
+        # Stop listening to CONFIG_DB, the mirror can no longer be trusted
+        self.config_db_reader.close()
+        self.running_config = None
+
+
     def _get_running_config(self):
-        (_, fname) = tempfile.mkstemp(suffix="_changeApplier")
-        os.system("sonic-cfggen -d --print-data > {}".format(fname))
-        run_data = {}
-        with open(fname, "r") as s:
-            run_data = json.load(s)
-        if os.path.isfile(fname):
-            os.remove(fname)
-        return run_data
+        if self.running_config is None or not self.config_db_reader.is_guarded():
+            self.running_config = self.config_db_reader.get_config()
+        else:
+            # Refresh the tables changed by others since the last change
+            changed_tables = self.config_db_reader.get_changed_tables()
+            if changed_tables:
+                log_debug("Running config tables changed: {}".format(sorted(changed_tables)))
+                self._refresh_tables(changed_tables)
+        return copy.deepcopy(self.running_config)
@@ -70,9 +70,12 @@ class PatchApplier:
         # Apply changes in order
         self.logger.log_notice(f"Applying {changes_len} change{'s' if changes_len != 1 else ''} " \
                                f"in order{':' if changes_len > 0 else '.'}")
-        for change in changes:
-            self.logger.log_notice(f"  * {change}")
-            self.changeapplier.apply(change)
+        try:
+            for change in changes:
+                self.logger.log_notice(f"  * {change}")
+                self.changeapplier.apply(change)
+        finally:
+            self.changeapplier.close()
 
         # Validate config updated successfully
         self.logger.log_notice("Verifying patch updates are reflected on ConfigDB.")
@@ -381,7 +384,7 @@ class GenericUpdateFactory:
         if dry_run:
             return DryRunChangeApplier(config_wrapper)
         else:
-            return ChangeApplier()
+            return ChangeApplier(batch_writes=True)
 
     def get_patch_sorter(self, ignore_non_yang_tables, ignore_paths, config_wrapper, patch_wrapper):
         if not ignore_non_yang_tables and not ignore_paths:
@@ -3,11 +3,13 @@ import jsonpatch
 from jsonpointer import JsonPointer
 import sonic_yang
 import sonic_yang_ext
-import subprocess
 import yang as ly
 import copy
 import re
+from collections import OrderedDict
 from sonic_py_common import logger
+from swsscommon.swsscommon import ConfigDBPipeConnector
+from utilities_common.bulk_fetch import BulkFetcher
 from enum import Enum
 
 YANG_DIR = "/usr/local/yang-models"
@@ -44,24 +46,155 @@ class JsonChange:
             return self.patch == other.patch
         return False
 
+class ConfigDbSnapshotReader:
+    """
+    Reads CONFIG_DB in process, in the same format as 'sonic-cfggen -d --print-data'.
+
+    The whole config is read with one pipelined ConfigDBPipeConnector.get_config(), given tables
+    with one KEYS per table and one bulk read of their entries. Such a read is not atomic,
+    so the keyspace notifications of CONFIG_DB are listened to, and the read is retried if any
+    key was changed while reading.
+    The same notifications tell the callers keeping a copy of the config which tables
+    were changed since they last asked, see get_changed_tables().
+    The subscription is kept until close() is called.
+    """
+    MAX_READ_ATTEMPTS = 3
+
+    def __init__(self, config_db=None):
+        self.config_db = config_db
+        self.pubsub = None
+        self.pattern = None
+        # Tables notified as changed but not reported yet
+        self.changed_tables = set()
+
+    def _connect(self):
+        if self.config_db is None:
+            self.config_db = ConfigDBPipeConnector()
+            self.config_db.connect()
+            self.pubsub = None
+        if self.pubsub is None:
+            self.pubsub = self._subscribe()
+        return self.config_db
+
+    def _subscribe(self):
+        try:
+            db_name = self.config_db.db_name
+            self.pattern = "__keyspace@{}__:*".format(self.config_db.get_dbid(db_name))
+            pubsub = self.config_db.get_redis_client(db_name).pubsub()
+            pubsub.psubscribe(self.pattern)
+            return pubsub
+        except Exception:
+            # Without notifications there is no way to tell a config changed, see is_guarded()
+            return False
+
+    def close(self):
+        """
+        Stops listening to the notifications of CONFIG_DB, the pending ones are dropped.
+        The next read subscribes again.
+        """
+        if self.pubsub:
+            try:
+                self.pubsub.punsubscribe(self.pattern)
+            except Exception:
+                pass
+        self.pubsub = None
+        self.changed_tables = set()
+
+    def is_guarded(self):
+        """
+        Returns True if the changes to CONFIG_DB are notified, i.e. if get_changed_tables() can be trusted.
+        """
+        self._connect()
+        return bool(self.pubsub)
+
+    def get_changed_tables(self, ignored_keys=()):
+        """
+        Returns the set of the tables changed since the last call.
+        The notifications of ignored_keys, as 'TABLE|key', are drained without being reported,
+        so that callers can leave out the changes they wrote themselves.
+        """
+        self._connect()
+        changed_tables = self.changed_tables | self._poll_changed_tables(ignored_keys)
+        self.changed_tables = set()
+        return changed_tables
+
+    def _poll_changed_tables(self, ignored_keys=()):
+        changed_tables = set()
+        if not self.pubsub:
+            return changed_tables
+
+        while True:
+            message = self.pubsub.get_message()
+            if not message:
+                return changed_tables
+            if message.get("type") != "pmessage":
+                continue
+            key = message["channel"].split(":", 1)[-1]
+            if key in ignored_keys:
+                continue
+            changed_tables.add(key.split(self.config_db.KEY_SEPARATOR, 1)[0])
+
+    def get_config(self):
+        """
+        Returns the whole CONFIG_DB.
+        """
+        return self._serialize(self._read())
+
+    def get_tables(self, tables):
+        """
+        Returns the given tables of CONFIG_DB, empty tables are omitted.
+        The changes to the other tables are still reported by get_changed_tables().
+        """
+        data = self._read(tables)
+        return self._serialize({table: data[table] for table in tables if data.get(table)})
+
+    def _read(self, tables=None):
+        config_db = self._connect()
+        for _ in range(self.MAX_READ_ATTEMPTS):
+            # Changes notified before the read are only covered by it for the tables returned
+            self.changed_tables |= self._poll_changed_tables()
+            data = config_db.get_config() if tables is None else self._read_tables(config_db, tables)
+            changed_tables = self._poll_changed_tables()
+            if not changed_tables:
+                if tables is None:
+                    self.changed_tables = set()
+                else:
+                    self.changed_tables -= set(tables)
+                return data
+            self.changed_tables |= changed_tables
+        raise GenericConfigUpdaterError(f"Failed to get running config, it kept changing while being read " \
+                                        f"{self.MAX_READ_ATTEMPTS} times")
+
+    def _read_tables(self, config_db, tables):
+        db_name = config_db.db_name
+        client = config_db.get_redis_client(db_name)
+        keys = [key for table in tables for key in client.keys(table + config_db.KEY_SEPARATOR + "*")]
+
+        data = {}
+        for key, entry in zip(keys, BulkFetcher(config_db).get_all(db_name, keys)):
+            # Entries deleted since KEYS are notified
+            if not entry:
+                continue
+            table, row = key.split(config_db.KEY_SEPARATOR, 1)
+            data.setdefault(table, {})[config_db.deserialize_key(row)] = config_db.raw_to_typed(entry)
+        return data
+
+    def _serialize(self, data):
+        return {table: {self.config_db.serialize_key(key): entry for key, entry in entries.items()}
+                for table, entries in data.items()}
+
 class ConfigWrapper:
     def __init__(self, yang_dir = YANG_DIR):
         self.yang_dir = YANG_DIR
         self.sonic_yang_with_loaded_models = None
+        self.config_db_reader = ConfigDbSnapshotReader()
 
     def get_config_db_as_json(self):
-        text = self._get_config_db_as_text()
-        return json.loads(text)
-
-    def _get_config_db_as_text(self):
-        # TODO: Getting configs from CLI is very slow, need to get it from sonic-cffgen directly
-        cmd = "show runningconfiguration all"
-        result = subprocess.Popen(cmd, shell=True, text=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-        text, err = result.communicate()
-        return_code = result.returncode
-        if return_code: # non-zero means failure
-            raise GenericConfigUpdaterError(f"Failed to get running config, Return code: {return_code}, Error: {err}")
-        return text
+        # One-off read, no need to keep listening to CONFIG_DB
+        try:
+            return self.config_db_reader.get_config()
+        finally:
+            self.config_db_reader.close()
 
     def get_sonic_yang_as_json(self):
         config_db_json = self.get_config_db_as_json()
@@ -337,9 +470,13 @@ class PathAddressing:
     """
     PATH_SEPARATOR = "/"
     XPATH_SEPARATOR = "/"
+    # Number of configs whose LeafrefIndex is kept, each holds a loaded sonic_yang data tree
+    REF_INDEX_CACHE_SIZE = 4
 
     def __init__(self, config_wrapper=None):
         self.config_wrapper = config_wrapper
+        # LeafrefIndex per config digest, least recently used first
+        self.ref_indexes = OrderedDict()
 
     def get_path_tokens(self, path):
         return JsonPointer(path).parts
@@ -482,35 +619,53 @@ class PathAddressing:
             /ACL_TABLE/EVERFLOW6/ports/1
         """
         # TODO: Also fetch references by must statement (check similar statements)
-        return self._find_leafref_paths(path, config)
+        return self._get_ref_index(config).find_ref_paths(path)
 
-    def _find_leafref_paths(self, path, config):
-        sy = self._create_sonic_yang_with_loaded_models()
-
-        tmp_config = copy.deepcopy(config)
-
-        sy.loadData(tmp_config)
-
-        xpath = self.convert_path_to_xpath(path, config, sy)
-
-        leaf_xpaths = self._get_inner_leaf_xpaths(xpath, sy)
-
-        ref_xpaths = []
-        for xpath in leaf_xpaths:
-            ref_xpaths.extend(sy.find_data_dependencies(xpath))
-
-        ref_paths = []
-        ref_paths_set = set()
-        for ref_xpath in ref_xpaths:
-            ref_path = self.convert_xpath_to_path(ref_xpath, config, sy)
-            if ref_path not in ref_paths_set:
-                ref_paths.append(ref_path)
-                ref_paths_set.add(ref_path)
+    def _get_ref_index(self, config):
+        """
+        Returns the LeafrefIndex of the given config. Configs are expected not to be modified in place once
+        passed here, the patch sorter only creates new configs sharing the unchanged tables.
 
-        ref_paths.sort()
-        return ref_paths
+        Indexes are cached by the content of their config, so the fresh copies made by move.apply() find
+        the index of an equal config. The index of a new config is derived from the index of the cached
+        config with the fewest changes, so only the references that the changes can affect are looked up again.
+        """
+        for digest, ref_index in self.ref_indexes.items():
+            if ref_index.config is config:
+                self.ref_indexes.move_to_end(digest)
+                return ref_index
+
+        digest = PathAddressing._get_config_digest(config)
+        ref_index = self.ref_indexes.get(digest)
+        if ref_index is not None and ref_index.config == config:
+            self.ref_indexes.move_to_end(digest)
+            return ref_index
+
+        parent = None
+        changes = None
+        for ref_index in self.ref_indexes.values():
+            ref_changes = LeafrefIndex.get_changes(ref_index.config, config)
+            if changes is None or len(ref_changes[0]) + len(ref_changes[1]) < len(changes[0]) + len(changes[1]):
+                parent = ref_index
+                changes = ref_changes
+
+        ref_index = LeafrefIndex(self, config, parent, changes)
+        self.ref_indexes[digest] = ref_index
+        if len(self.ref_indexes) > PathAddressing.REF_INDEX_CACHE_SIZE:
+            self.ref_indexes.popitem(last=False)
+        return ref_index
+
+    @staticmethod
+    def _get_config_digest(config):
+        return hash(json.dumps(config, sort_keys=True))
 
     def _get_inner_leaf_xpaths(self, xpath, sy):
+        for inner_node in self._get_inner_nodes(xpath, sy):
+            # TODO: leaflist also can be used as the 'path' argument in 'leafref' so add support to leaflist
+            if self._is_leaf_node(inner_node):
+                yield inner_node.path()
+
+    def _get_inner_nodes(self, xpath, sy):
         if xpath == "/": # Point to Root element which contains all xpaths
             nodes = sy.root.tree_for()
         else: # Otherwise get all nodes that match xpath
@@ -518,14 +673,19 @@ class PathAddressing:
 
         for node in nodes:
             for inner_node in node.tree_dfs():
-                # TODO: leaflist also can be used as the 'path' argument in 'leafref' so add support to leaflist
-                if self._is_leaf_node(inner_node):
-                    yield inner_node.path()
+                yield inner_node
 
     def _is_leaf_node(self, node):
         schema = node.schema()
         return ly.LYS_LEAF == schema.nodetype()
 
+    def _is_leaf_or_leaflist_node(self, node):
+        schema = node.schema()
+        return schema.nodetype() in [ly.LYS_LEAF, ly.LYS_LEAFLIST]
+
+    def _get_node_value(self, node):
+        return str(node.subtype().value_str())
+
     def convert_path_to_xpath(self, path, config, sy):
         """
         Converts the given JsonPatch path (i.e. JsonPointer) to XPATH.
@@ -978,6 +1138,159 @@ class PathAddressing:
 
         return None
 
+class LeafrefIndex:
+    """
+    Reverse index of the leafref references within a config, from the referenced leaves to the paths
+    referring to them.
+
+    The config is loaded into sonic_yang once. References are looked up lazily per table entry
+    i.e. /<table>/<key>, and kept in a LeafrefBucket along with the values of the entry leaves and the
+    entries the references come from.
+
+    An index derived from the index of another config reuses the buckets of the other config, except for
+    buckets that the changed table entries can affect:
+    - The bucket entry itself is changed.
+    - One of the references to the bucket comes from a changed entry.
+    - A leaf in the bucket has the same value as a leaf under a changed entry, which can be a new reference.
+      A leafref refers to the leaf whose value is the same as the leafref value.
+    """
+    def __init__(self, path_addressing, config, parent=None, changes=None):
+        self.path_addressing = path_addressing
+        self.config = config
+        self.sy = path_addressing._create_sonic_yang_with_loaded_models()
+        self.sy.loadData(copy.deepcopy(config))
+        self.buckets = {}
+
+        if parent is not None:
+            self._inherit_buckets(parent, changes)
+
+    @staticmethod
+    def get_changes(old_config, new_config):
+        """
+        Returns the tables and the table entries i.e. (table, key) that differ between the given configs.
+        Configs sharing their unchanged tables/entries are compared in O(changed entries).
+        """
+        changed_tables = set()
+        changed_entries = set()
+        for table in set(old_config) | set(new_config):
+            old_table = old_config.get(table)
+            new_table = new_config.get(table)
+            if old_table == new_table:
+                continue
+
+            if not isinstance(old_table, dict) or not isinstance(new_table, dict):
+                changed_tables.add(table)
+                continue
+
+            for key in set(old_table) | set(new_table):
+                if key not in old_table or key not in new_table or old_table[key] != new_table[key]:
+                    changed_entries.add((table, key))
+
+        return changed_tables, changed_entries
+
+    def find_ref_paths(self, path):
+        tokens = self.path_addressing.get_path_tokens(path)
+        if len(tokens) > 2:
+            bucket = self._get_bucket(tuple(tokens[:2]))
+            xpath = self.path_addressing.convert_path_to_xpath(path, self.config, self.sy)
+            buckets_refs = [bucket.refs.get(leaf_xpath, []) \
+                            for leaf_xpath in self.path_addressing._get_inner_leaf_xpaths(xpath, self.sy)]
+        else:
+            buckets_refs = []
+            for entry in self._get_entries(tokens):
+                buckets_refs.extend(self._get_bucket(entry).refs.values())
+
+        ref_paths = set()
+        for refs in buckets_refs:
+            ref_paths.update(refs)
+
+        return sorted(ref_paths)
+
+    def _get_entries(self, tokens):
+        if len(tokens) == 2:
+            return [tuple(tokens)]
+
+        tables = tokens if tokens else self.config.keys()
+        entries = []
+        for table in tables:
+            if table not in self.sy.confDbYangMap or not isinstance(self.config.get(table), dict):
+                continue
+            entries.extend((table, key) for key in self.config[table])
+        return entries
+
+    def _get_bucket(self, entry):
+        if entry not in self.buckets:
+            self.buckets[entry] = self._create_bucket(entry)
+        return self.buckets[entry]
+
+    def _create_bucket(self, entry):
+        table, key = entry
+        if table not in self.sy.confDbYangMap or key not in self.config.get(table, {}):
+            return LeafrefBucket({}, frozenset(), frozenset())
+
+        xpath = self.path_addressing.convert_path_to_xpath(
+            self.path_addressing.create_path(entry), self.config, self.sy)
+
+        refs = {}
+        values = set()
+        ref_entries = set()
+        for node in self.path_addressing._get_inner_nodes(xpath, self.sy):
+            if not self.path_addressing._is_leaf_node(node):
+                continue
+
+            values.add(self.path_addressing._get_node_value(node))
+            leaf_xpath = node.path()
+            ref_paths = []
+            for ref_xpath in self.sy.find_data_dependencies(leaf_xpath):
+                ref_path = self.path_addressing.convert_xpath_to_path(ref_xpath, self.config, self.sy)
+                ref_paths.append(ref_path)
+                ref_entries.add(tuple(self.path_addressing.get_path_tokens(ref_path)[:2]))
+            if ref_paths:
+                refs[leaf_xpath] = ref_paths
+
+        return LeafrefBucket(refs, frozenset(values), frozenset(ref_entries))
+
+    def _inherit_buckets(self, parent, changes):
+        changed_tables, changed_entries = changes
+
+        def is_changed(entry):
+            return entry[0] in changed_tables or entry in changed_entries
+
+        # Values under the changed entries of this config, the changes can only add references to leaves
+        # having one of these values
+        changed_values = set()
+        changed_paths = [[table] for table in changed_tables] + [list(entry) for entry in changed_entries]
+        for tokens in changed_paths:
+            if tokens[0] not in self.sy.confDbYangMap or \
+               self.path_addressing.get_from_path(self.config, self.path_addressing.create_path(tokens)) is None:
+                continue
+            xpath = self.path_addressing.convert_path_to_xpath(
+                self.path_addressing.create_path(tokens), self.config, self.sy)
+            for node in self.path_addressing._get_inner_nodes(xpath, self.sy):
+                if self.path_addressing._is_leaf_or_leaflist_node(node):
+                    changed_values.add(self.path_addressing._get_node_value(node))
+
+        for entry, bucket in parent.buckets.items():
+            if is_changed(entry):
+                continue
+            if any(is_changed(ref_entry) for ref_entry in bucket.ref_entries):
+                continue
+            if not bucket.values.isdisjoint(changed_values):
+                continue
+            self.buckets[entry] = bucket
+
+class LeafrefBucket:
+    """
+    The references to the leaves of a table entry, see LeafrefIndex.
+    - refs: leaf xpath to the paths referring to the leaf.
+    - values: values of the leaves.
+    - ref_entries: table entries i.e. (table, key) the references come from.
+    """
+    def __init__(self, refs, values, ref_entries):
+        self.refs = refs
+        self.values = values
+        self.ref_entries = ref_entries
+
 class TitledLogger(logger.Logger):
     def __init__(self, syslog_identifier, title, verbose, print_all_to_console):
         super().__init__(syslog_identifier)
@@ -1,6 +1,10 @@
 import copy
+import itertools
 import json
 import jsonpatch
+import multiprocessing
+import os
+from jsonpointer import JsonPointer
 from collections import deque, OrderedDict
 from enum import Enum
 from .gu_common import OperationWrapper, OperationType, GenericConfigUpdaterError, \
@@ -9,33 +13,156 @@ from .gu_common import OperationWrapper, OperationType, GenericConfigUpdaterErro
 class Diff:
     """
     A class that contains the diff info between current and target configs.
+
+    The configs are never modified in place. Applying a move copies only the dicts/lists on the path of
+    the move, everything else is shared with the config the move was applied to.
+
+    The hash of a config is the sum of the hashes of its table entries i.e. /<table>/<key> values, so
+    applying a move only rehashes the table entry it changes and hashing a Diff is O(1).
     """
+    DIGEST_MASK = (1 << 64) - 1
+
     def __init__(self, current_config, target_config):
         self.current_config = current_config
         self.target_config = target_config
+        self._current_digest = None
+        self._target_digest = None
+
+    @property
+    def current_digest(self):
+        if self._current_digest is None:
+            self._current_digest = Diff._get_digest(self.current_config)
+        return self._current_digest
+
+    @property
+    def target_digest(self):
+        if self._target_digest is None:
+            self._target_digest = Diff._get_digest(self.target_config)
+        return self._target_digest
 
     def __hash__(self):
-        cc = json.dumps(self.current_config, sort_keys=True)
-        tc = json.dumps(self.target_config, sort_keys=True)
-        return hash((cc,tc))
+        return hash((self.current_digest, self.target_digest))
 
     def __eq__(self, other):
         """Overrides the default implementation"""
         if isinstance(other, Diff):
+            if hash(self) != hash(other):
+                return False
             return self.current_config == other.current_config and self.target_config == other.target_config
 
         return False
 
-    # TODO: Can be optimized to apply the move in place. JsonPatch supports that using the option 'in_place=True'
-    # Check: https://python-json-patch.readthedocs.io/en/latest/tutorial.html#applying-a-patch
-    # NOTE: in case move is applied in place, we will need to support `undo_move` as well.
     def apply_move(self, move):
-        new_current_config = move.apply(self.current_config)
-        return Diff(new_current_config, self.target_config)
+        tokens = JsonPointer(move.path).parts
+        try:
+            new_current_config = Diff._apply_shared(self.current_config, move, tokens) if tokens else None
+        except (KeyError, IndexError, ValueError, TypeError):
+            new_current_config = None
+
+        if new_current_config is None:
+            # Whole config moves, or moves that cannot be applied and jsonpatch will report why
+            new_diff = Diff(move.apply(self.current_config), self.target_config)
+        else:
+            new_diff = Diff(new_current_config, self.target_config)
+            if self._current_digest is not None:
+                scope = tuple(tokens[:2]) if len(tokens) > 1 and \
+                        isinstance(self.current_config.get(tokens[0]), dict) else tuple(tokens[:1])
+                new_diff._current_digest = (self._current_digest
+                                            - Diff._get_scope_digest(self.current_config, scope)
+                                            + Diff._get_scope_digest(new_current_config, scope)) & Diff.DIGEST_MASK
+
+        new_diff._target_digest = self._target_digest
+        return new_diff
 
     def has_no_diff(self):
+        if self._current_digest is not None and self._target_digest is not None and \
+           self._current_digest != self._target_digest:
+            return False
         return self.current_config == self.target_config
 
+    @staticmethod
+    def _apply_shared(config, move, tokens):
+        """
+        Applies the single operation of the move to a copy of the config path it refers to.
+        Returns None if the config is not a dict.
+        """
+        if not isinstance(config, dict):
+            return None
+
+        new_config = copy.copy(config)
+        parent = new_config
+        for token in tokens[:-1]:
+            key = Diff._get_key(parent, token)
+            child = parent[key]
+            if not isinstance(child, (dict, list)):
+                raise TypeError(f"Cannot apply move at '{move.path}'")
+            child = copy.copy(child)
+            parent[key] = child
+            parent = child
+
+        token = tokens[-1]
+        if move.op_type == OperationType.ADD:
+            if isinstance(parent, list):
+                index = len(parent) if token == '-' else Diff._get_key(parent, token)
+                if index > len(parent):
+                    raise IndexError(f"Cannot apply move at '{move.path}'")
+                parent.insert(index, move.value)
+            else:
+                parent[token] = move.value
+        elif move.op_type == OperationType.REPLACE:
+            key = Diff._get_key(parent, token)
+            if isinstance(parent, dict) and key not in parent:
+                raise KeyError(key)
+            parent[key] = move.value
+        elif move.op_type == OperationType.REMOVE:
+            del parent[Diff._get_key(parent, token)]
+        else:
+            return None
+
+        return new_config
+
+    @staticmethod
+    def _get_key(container, token):
+        if isinstance(container, dict):
+            return token
+        if not token.isdigit() or (len(token) > 1 and token[0] == '0'):
+            raise ValueError(f"'{token}' is not a valid list index")
+        return int(token)
+
+    @staticmethod
+    def _get_digest(config):
+        if not isinstance(config, dict):
+            return Diff._get_value_digest((), config)
+        digest = 0
+        for table in config:
+            digest += Diff._get_scope_digest(config, (table,))
+        return digest & Diff.DIGEST_MASK
+
+    @staticmethod
+    def _get_scope_digest(config, scope):
+        """
+        Returns the digest of the table i.e. scope=(table,) or of the table entry i.e. scope=(table, key)
+        """
+        table = scope[0]
+        if table not in config:
+            return 0
+        value = config[table]
+        if not isinstance(value, dict):
+            return Diff._get_value_digest(scope[:1], value)
+        if len(scope) == 1:
+            digest = hash(scope) # Empty and non-existing tables differ
+            for key, entry in value.items():
+                digest += Diff._get_value_digest((table, key), entry)
+            return digest & Diff.DIGEST_MASK
+        key = scope[1]
+        if key not in value:
+            return 0
+        return Diff._get_value_digest(scope, value[key])
+
+    @staticmethod
+    def _get_value_digest(path, value):
+        return hash((path, json.dumps(value, sort_keys=True)))
+
     def __str__(self):
         return f"""current_config: {self.current_config}
 target_config: {self.target_config}"""
@@ -675,13 +802,27 @@ class DeleteWholeConfigMoveValidator:
 class FullConfigMoveValidator:
     """
     A class to validate that full config is valid according to YANG models after applying the move.
+
+    The result is cached by the hash of the config after applying the move, so a config reached by different
+    moves or by the same moves in a different order is only validated once.
     """
     def __init__(self, config_wrapper):
         self.config_wrapper = config_wrapper
+        self.validated_configs = {}
 
     def validate(self, move, diff):
-        simulated_config = move.apply(diff.current_config)
+        simulated_diff = diff.apply_move(move)
+        simulated_config = simulated_diff.current_config
+        config_hash = simulated_diff.current_digest
+
+        # Configs share the tables the moves did not change, so comparing them on a hit is cheap
+        if config_hash in self.validated_configs:
+            validated_config, is_valid = self.validated_configs[config_hash]
+            if validated_config == simulated_config:
+                return is_valid
+
         is_valid, error = self.config_wrapper.validate_config_db_config(simulated_config)
+        self.validated_configs[config_hash] = (simulated_config, is_valid)
         return is_valid
 
 class CreateOnlyMoveValidator:
@@ -1558,6 +1699,108 @@ class DfsSorter:
 
         return None
 
+def _run_validators(validators, move, diff):
+    """
+    Returns (is_valid, error), error is the exception raised by a validator if any.
+    """
+    try:
+        for validator in validators:
+            if not validator.validate(move, diff):
+                return False, None
+        return True, None
+    except Exception as ex:
+        return False, ex
+
+# Validators of a ParallelDfsSorter worker process, inherited from the parent process when forked
+_worker_validators = None
+
+def _init_validation_worker(validators):
+    global _worker_validators
+    _worker_validators = validators
+
+def _validate_in_worker(diff, moves):
+    return [_run_validators(_worker_validators, move, diff) for move in moves]
+
+class ParallelDfsSorter(DfsSorter):
+    """
+    A DfsSorter that validates the generated moves of a diff speculatively, in batches.
+
+    The cheap validators run first in this process, then the moves they accept are split between worker
+    processes running the expensive validators i.e. the ones backed by sonic_yang. The moves are then
+    tried in the order they were generated, so the result is the same as DfsSorter.
+    """
+    EXPENSIVE_VALIDATOR_TYPES = (FullConfigMoveValidator,
+                                 NoDependencyMoveValidator,
+                                 RemoveCreateOnlyDependencyMoveValidator)
+
+    def __init__(self, move_wrapper, max_workers=None, batch_size=None):
+        super().__init__(move_wrapper)
+        self.max_workers = max_workers if max_workers else os.cpu_count()
+        self.batch_size = batch_size if batch_size else 2 * self.max_workers
+        self.cheap_validators = [validator for validator in move_wrapper.move_validators
+                                 if not isinstance(validator, ParallelDfsSorter.EXPENSIVE_VALIDATOR_TYPES)]
+        self.expensive_validators = [validator for validator in move_wrapper.move_validators
+                                     if isinstance(validator, ParallelDfsSorter.EXPENSIVE_VALIDATOR_TYPES)]
+        self.pool = None
+
+    def sort(self, diff):
+        if self.max_workers < 2 or not self.expensive_validators:
+            return self._sort(diff)
+
+        # Forked workers inherit the validators along with their loaded YANG models, which cannot be pickled
+        context = multiprocessing.get_context("fork")
+        with context.Pool(self.max_workers, _init_validation_worker, (self.expensive_validators,)) as pool:
+            self.pool = pool
+            try:
+                return self._sort(diff)
+            finally:
+                self.pool = None
+
+    def _sort(self, diff):
+        if diff.has_no_diff():
+            return []
+
+        diff_hash = hash(diff)
+        if diff_hash in self.visited:
+            return None
+        self.visited[diff_hash] = True
+
+        moves = self.move_wrapper.generate(diff)
+
+        while True:
+            batch = list(itertools.islice(moves, self.batch_size))
+            if not batch:
+                return None
+
+            for move, (is_valid, error) in zip(batch, self._validate(batch, diff)):
+                # Errors of the moves validated speculatively are only raised if DFS reaches them
+                if error is not None:
+                    raise error
+                if is_valid:
+                    new_diff = self.move_wrapper.simulate(move, diff)
+                    new_moves = self._sort(new_diff)
+                    if new_moves is not None:
+                        return [move] + new_moves
+
+    def _validate(self, moves, diff):
+        results = [_run_validators(self.cheap_validators, move, diff) for move in moves]
+        indexes = [index for index, (is_valid, error) in enumerate(results) if is_valid]
+
+        if self.pool is None or len(indexes) < 2:
+            for index in indexes:
+                results[index] = _run_validators(self.expensive_validators, moves[index], diff)
+            return results
+
+        chunk_size = -(-len(indexes) // self.max_workers)
+        chunks = [indexes[start:start+chunk_size] for start in range(0, len(indexes), chunk_size)]
+        chunks_results = self.pool.starmap(_validate_in_worker,
+                                           [(diff, [moves[index] for index in chunk]) for chunk in chunks])
+        for chunk, chunk_results in zip(chunks, chunks_results):
+            for index, result in zip(chunk, chunk_results):
+                results[index] = result
+
+        return results
+
 class BfsSorter:
     def __init__(self, move_wrapper):
         self.visited = {}
@@ -1627,6 +1870,7 @@ class Algorithm(Enum):
     DFS = 1
     BFS = 2
     MEMOIZATION = 3
+    PARALLEL_DFS = 4
 
 class SortAlgorithmFactory:
     def __init__(self, operation_wrapper, config_wrapper, path_addressing):
@@ -1659,6 +1903,8 @@ class SortAlgorithmFactory:
             sorter = BfsSorter(move_wrapper)
         elif algorithm == Algorithm.MEMOIZATION:
             sorter = MemoizationSorter(move_wrapper)
+        elif algorithm == Algorithm.PARALLEL_DFS:
+            sorter = ParallelDfsSorter(move_wrapper)
         else:
             raise ValueError(f"Algorithm {algorithm} is not supported")
 
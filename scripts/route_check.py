@@ -29,6 +29,14 @@ To verify:
         down to ensure failure.
         Analyze the reported failures to match expected.
     You may use the exit code to verify the result as success or not.
+
+Daemon mode (-d):
+    Reading both DBs on every scan gets expensive with a large number of
+    routes. In daemon mode, APPL-DB routes & interfaces and ASIC-DB route
+    entries are read once, through subscriptions, and then kept current
+    from the subscribe updates, along with the set of mismatches.
+    Only the mismatches older than the grace period (-g) are reported,
+    once every interval.
     
 
 
@@ -40,6 +48,7 @@ import ipaddress
 import json
 import os
 import re
+import socket
 import sys
 import syslog
 import time
@@ -48,6 +57,7 @@ import traceback
 
 from swsscommon import swsscommon
 from utilities_common import chassis
+from utilities_common.bulk_fetch import BulkFetcher
 
 APPL_DB_NAME = 'APPL_DB'
 ASIC_DB_NAME = 'ASIC_DB'
@@ -55,6 +65,10 @@ ASIC_TABLE_NAME = 'ASIC_STATE'
 ASIC_KEY_PREFIX = 'SAI_OBJECT_TYPE_ROUTE_ENTRY:'
 
 SUBSCRIBE_WAIT_SECS = 1
+SELECT_TIMEOUT_MSECS = 1000
+
+# Mismatches younger than this are assumed to be in flight
+DEFAULT_GRACE_SECS = 60
 
 # Max of 2 minutes
 TIMEOUT_SECONDS = 120
@@ -66,11 +80,19 @@ os.environ['PYTHONUNBUFFERED']='True'
 PREFIX_SEPARATOR = '/'
 IPV6_SEPARATOR = ':'
 
+# Encoded prefix layout: <family:1><address:128><prefix length:8>
+IPV6_FLAG = 1 << 136
+ADDR_MASK = (1 << 128) - 1
+
 MIN_SCAN_INTERVAL = 10      # Every 10 seconds
 MAX_SCAN_INTERVAL = 3600    # An hour
 
 PRINT_MSG_LEN_MAX = 1000
 
+LOCAL_IF_LST = {'eth0', 'docker0'}
+LOCAL_IF_LO_RE = re.compile(r'tun0|lo|Loopback\d+')
+VOQ_INBAND_IF_RE = re.compile(r'Ethernet-IB\d+')
+
 class Level(Enum):
     ERR = 'ERR'
     INFO = 'INFO'
@@ -131,104 +153,71 @@ def print_message(lvl, *args):
     return msg
 
 
-def add_prefix(ip):
-    """
-    helper add static prefix based on IP type
-    :param ip: IP to add prefix as string.
-    :return ip + "/32 or /128"
-    """
-    if ip.find(IPV6_SEPARATOR) == -1:
-        ip = ip + PREFIX_SEPARATOR + "32"
-    else:
-        ip = ip + PREFIX_SEPARATOR + "128"
-    return ip
-
-
-def add_prefix_ifnot(ip):
+def encode_prefix(ip):
     """
-    helper add static prefix if absent
-    :param ip: IP to add prefix as string.
-    :return ip with prefix
+    helper to pack a prefix into a single int, far smaller than the
+    string and the same for all the textual variants of an IPv6 address.
+    :param ip: prefix as string, /32 or /128 assumed when absent
+    :return int holding address family, address & prefix length
     """
-    return ip if ip.find(PREFIX_SEPARATOR) != -1 else add_prefix(ip)
+    addr, _, plen = ip.partition(PREFIX_SEPARATOR)
+    if addr.find(IPV6_SEPARATOR) == -1:
+        return (int.from_bytes(socket.inet_pton(socket.AF_INET, addr), 'big') << 8) | int(plen or 32)
+    return (IPV6_FLAG | (int.from_bytes(socket.inet_pton(socket.AF_INET6, addr), 'big') << 8) |
+            int(plen or 128))
 
 
-def is_local(ip):
+def decode_prefix(val):
     """
-    helper to check if this IP qualify as link local
-    :param ip: IP to check as string
-    :return True if link local, else False
+    helper to get back the prefix string of an encoded prefix
+    :param val: int as returned by encode_prefix
+    :return prefix as string
     """
-    t = ipaddress.ip_address(ip.split("/")[0])
-    return t.is_link_local
+    addr = (val >> 8) & ADDR_MASK
+    t = ipaddress.IPv6Address(addr) if val & IPV6_FLAG else ipaddress.IPv4Address(addr)
+    return "{}{}{}".format(t, PREFIX_SEPARATOR, val & 0xff)
 
 
-def is_default_route(ip):
+def to_prefix_list(prefixes):
     """
-    helper to check if this IP is default route
-    :param ip: IP to check as string
-    :return True if default, else False
+    helper to get the sorted strings of encoded prefixes, for reporting
+    :param prefixes: iterable of encoded prefixes
+    :return sorted list of prefix strings
     """
-    t = ipaddress.ip_address(ip.split("/")[0])
-    return t.is_unspecified and ip.split("/")[1] == "0"
+    return sorted(decode_prefix(val) for val in prefixes)
 
 
-def cmps(s1, s2):
+def is_local(val):
     """
-    helper to compare two strings
-    :param s1: left string
-    :param s2: right string
-    :return comparison result as -1/0/1
+    helper to check if this prefix qualify as link local
+    :param val: encoded prefix to check
+    :return True if link local, else False
     """
-    if (s1 == s2):
-        return 0
-    if (s1 < s2):
-        return -1
-    return 1
+    addr = (val >> 8) & ADDR_MASK
+    if val & IPV6_FLAG:
+        # fe80::/10
+        return (addr >> 118) == 0x3fa
+    # 169.254.0.0/16
+    return (addr >> 16) == 0xa9fe
 
 
-def diff_sorted_lists(t1, t2):
+def is_default_route(val):
     """
-    helper to compare two sorted lists.
-    :param t1: list 1
-    :param t2: list 2
-    :return (<t1 entries that are not in t2>, <t2 entries that are not in t1>)
+    helper to check if this prefix is default route
+    :param val: encoded prefix to check
+    :return True if default, else False
     """
-    t1_x = t2_x = 0
-    t1_miss = []
-    t2_miss = []
-    t1_len = len(t1);
-    t2_len = len(t2);
-    while t1_x < t1_len and t2_x < t2_len:
-        d = cmps(t1[t1_x], t2[t2_x])
-        if (d == 0):
-            t1_x += 1
-            t2_x += 1
-        elif (d < 0):
-            t1_miss.append(t1[t1_x])
-            t1_x += 1
-        else:
-            t2_miss.append(t2[t2_x])
-            t2_x += 1
-
-    while t1_x < t1_len:
-        t1_miss.append(t1[t1_x])
-        t1_x += 1
-
-    while t2_x < t2_len:
-        t2_miss.append(t2[t2_x])
-        t2_x += 1
-    return t1_miss, t2_miss
+    return (val & ~IPV6_FLAG) == 0
 
 
 def checkout_rt_entry(k):
     """
     helper to filter out correct keys and strip out IP alone.
-    :param ip: key to check as string
-    :return (True, ip) or (False, None)
+    :param k: key to check as string
+    :return (True, encoded prefix) or (False, None)
     """
     if k.startswith(ASIC_KEY_PREFIX):
-        e = k.lower().split("\"", -1)[3]
+        e = encode_prefix(k.split("\"", -1)[3])
         if not is_local(e):
             return True, e
     return False, None
@@ -239,10 +228,10 @@ def get_subscribe_updates(selector, subs):
     helper to collect subscribe messages for a period
     :param selector: Selector object to wait
     :param subs: Subscription object to pop messages
-    :return (add, del) messages as sorted
+    :return (add, del) messages as sets of encoded prefixes
     """
-    adds = []
-    deletes = []
+    adds = set()
+    deletes = set()
     t_end = time.time() + SUBSCRIBE_WAIT_SECS
     t_wait = SUBSCRIBE_WAIT_SECS
 
@@ -256,151 +245,171 @@ def get_subscribe_updates(selector, subs):
             res, e = checkout_rt_entry(key)
             if res:
                 if op == "SET":
-                    adds.append(e)
+                    adds.add(e)
                 elif op == "DEL":
-                    deletes.append(e)
+                    deletes.add(e)
 
-    print_message(syslog.LOG_DEBUG, "adds={}".format(adds))
-    print_message(syslog.LOG_DEBUG, "dels={}".format(deletes))
-    return (sorted(adds), sorted(deletes))
+    print_message(syslog.LOG_DEBUG, "adds={}".format(to_prefix_list(adds)))
+    print_message(syslog.LOG_DEBUG, "dels={}".format(to_prefix_list(deletes)))
+    return (adds, deletes)
 
 
 def is_vrf(k):
     return k.startswith("Vrf")
 
 
-def get_routes():
+def get_routes(appl_db):
     """
     helper to read route table from APPL-DB.
-    :return list of sorted routes with prefix ensured
+    :param appl_db: APPL-DB connection
+    :return set of encoded routes
     """
-    db = swsscommon.DBConnector(APPL_DB_NAME, 0)
-    print_message(syslog.LOG_DEBUG, "APPL DB connected for routes")
-    tbl = swsscommon.Table(db, 'ROUTE_TABLE')
+    tbl = swsscommon.Table(appl_db, 'ROUTE_TABLE')
     keys = tbl.getKeys()
 
-    valid_rt = []
+    valid_rt = set()
     for k in keys:
         if (is_vrf(k)):
             k = k.split(":", 1)[1]
 
-        if not is_local(k):
-            valid_rt.append(add_prefix_ifnot(k.lower()))
+        e = encode_prefix(k)
+        if not is_local(e):
+            valid_rt.add(e)
 
-    print_message(syslog.LOG_DEBUG, json.dumps({"ROUTE_TABLE": sorted(valid_rt)}, indent=4))
-    return sorted(valid_rt)
+    if report_level >= syslog.LOG_DEBUG:
+        print_message(syslog.LOG_DEBUG, json.dumps({"ROUTE_TABLE": to_prefix_list(valid_rt)}, indent=4))
+    return valid_rt
 
 
 def get_route_entries():
     """
     helper to read present route entries from ASIC-DB and 
     as well initiate selector for ASIC-DB:ASIC-state updates.
-    :return (selector,  subscriber, <list of sorted routes>)
+    :return (selector,  subscriber, <set of encoded routes>)
     """
     db = swsscommon.DBConnector(ASIC_DB_NAME, 0)
     subs = swsscommon.SubscriberStateTable(db, ASIC_TABLE_NAME)
     print_message(syslog.LOG_DEBUG, "ASIC DB connected")
 
-    rt = []
+    rt = set()
     while True:
         k, _, _ = subs.pop()
         if not k:
             break
         res, e = checkout_rt_entry(k)
         if res:
-            rt.append(e)
-                                
-    print_message(syslog.LOG_DEBUG, json.dumps({"ASIC_ROUTE_ENTRY": sorted(rt)}, indent=4))
+            rt.add(e)
+
+    if report_level >= syslog.LOG_DEBUG:
+        print_message(syslog.LOG_DEBUG, json.dumps({"ASIC_ROUTE_ENTRY": to_prefix_list(rt)}, indent=4))
 
     selector = swsscommon.Select()
     selector.addSelectable(subs)
-    return (selector, subs, sorted(rt))
+    return (selector, subs, rt)
 
 
-def get_interfaces():
+def get_interfaces(appl_db):
     """
     helper to read interface table from APPL-DB.
-    :return sorted list of IP addresses with added prefix
+    :param appl_db: APPL-DB connection
+    :return set of encoded IP addresses, as host routes
     """
-    db = swsscommon.DBConnector(APPL_DB_NAME, 0)
-    print_message(syslog.LOG_DEBUG, "APPL DB connected for interfaces")
-    tbl = swsscommon.Table(db, 'INTF_TABLE')
+    tbl = swsscommon.Table(appl_db, 'INTF_TABLE')
     keys = tbl.getKeys()
 
-    intf = []
+    intf = set()
     for k in keys:
-        lst = re.split(':', k.lower(), maxsplit=1)
+        lst = k.split(':', 1)
         if len(lst) == 1:
             # No IP address in key; ignore
             continue
 
-        ip = add_prefix(lst[1].split("/", -1)[0])
-        if not is_local(ip):
-            intf.append(ip)
+        e = encode_prefix(lst[1].split("/", -1)[0])
+        if not is_local(e):
+            intf.add(e)
 
-    print_message(syslog.LOG_DEBUG, json.dumps({"APPL_DB_INTF": sorted(intf)}, indent=4))
-    return sorted(intf)
+    if report_level >= syslog.LOG_DEBUG:
+        print_message(syslog.LOG_DEBUG, json.dumps({"APPL_DB_INTF": to_prefix_list(intf)}, indent=4))
+    return intf
 
 
-def filter_out_local_interfaces(keys):
+def get_appl_db_fetcher():
     """
-    helper to filter out local interfaces
-    :param keys: APPL-DB:ROUTE_TABLE Routes to check.
-    :return keys filtered out of local
+    helper to connect to APPL-DB for bulk reads.
+    :return BulkFetcher of APPL-DB
     """
-    rt = []
-    local_if_lst = {'eth0', 'docker0'}
-    local_if_lo = [r'tun0', r'lo', r'Loopback\d+']
+    db = swsscommon.SonicV2Connector()
+    db.connect(db.APPL_DB)
+    return BulkFetcher(db)
 
-    chassis_local_intfs = chassis.get_chassis_local_interfaces()
-    local_if_lst.update(set(chassis_local_intfs))
-    
-    db = swsscommon.DBConnector(APPL_DB_NAME, 0)
-    tbl = swsscommon.Table(db, 'ROUTE_TABLE')
+
+def get_route_table_entries(fetcher, keys):
+    """
+    helper to read the APPL-DB:ROUTE_TABLE entries of the given routes,
+    once for all the filters below, in batches.
+    :param fetcher: BulkFetcher of APPL-DB, as from get_appl_db_fetcher
+    :param keys: encoded routes
+    :return dict of encoded route to its entry, empty if not found
+    """
+    appl_db = fetcher.db.APPL_DB
+    routes = {k: decode_prefix(k) for k in keys}
+    entries = dict(zip(routes, fetcher.get_all(appl_db, ['ROUTE_TABLE:' + route for route in routes.values()])))
+
+    # Prefix might have been added. So try w/o it.
+    missing = [k for k, e in entries.items() if not e]
+    prefixes = ['ROUTE_TABLE:' + routes[k].split("/")[0] for k in missing]
+    entries.update(zip(missing, fetcher.get_all(appl_db, prefixes)))
+
+    return entries
+
+
+def filter_out_local_interfaces(keys, entries):
+    """
+    helper to filter out local interfaces
+    :param keys: APPL-DB:ROUTE_TABLE encoded routes to check.
+    :param entries: ROUTE_TABLE entries of keys, as from get_route_table_entries
+    :return set of keys filtered out of local
+    """
+    rt = set()
+    local_if_lst = LOCAL_IF_LST.union(chassis.get_chassis_local_interfaces())
 
     for k in keys:
-        e = dict(tbl.get(k)[1])
+        e = entries[k]
 
         ifname = e.get('ifname', '')
         if ifname in local_if_lst:
             continue
 
-        if any([re.match(x, ifname) for x in local_if_lo]):
+        if LOCAL_IF_LO_RE.match(ifname):
             nh = e.get('nexthop')
             if not nh or ipaddress.ip_address(nh).is_unspecified:
                 continue
 
-        rt.append(k)
+        rt.add(k)
 
     return rt
 
 
-def filter_out_voq_neigh_routes(keys):
+def filter_out_voq_neigh_routes(keys, entries):
     """
     helper to filter out voq neigh routes. These are the
     routes statically added for the voq neighbors. We skip
     writing route entries in asic db for these. We filter
     out reporting error on all the host routes written on
     inband interface prefixed with "Ethernte-IB"
-    :param keys: APPL-DB:ROUTE_TABLE Routes to check.
-    :return keys filtered out for voq neigh routes
+    :param keys: APPL-DB:ROUTE_TABLE encoded routes to check.
+    :param entries: ROUTE_TABLE entries of keys, as from get_route_table_entries
+    :return set of keys filtered out for voq neigh routes
     """
-    rt = []
-    local_if_re = [r'Ethernet-IB\d+']
-
-    db = swsscommon.DBConnector(APPL_DB_NAME, 0)
-    tbl = swsscommon.Table(db, 'ROUTE_TABLE')
+    rt = set()
 
     for k in keys:
-        prefix = k.split("/")
-        e = dict(tbl.get(k)[1])
-        if not e:
-            # Prefix might have been added. So try w/o it.
-            e = dict(tbl.get(prefix[0])[1])
-        if not e or all([not (re.match(x, e['ifname']) and
-            ((prefix[1] == "32" and e['nexthop'] == "0.0.0.0") or
-                (prefix[1] == "128" and e['nexthop'] == "::"))) for x in local_if_re]):
-            rt.append(k)
+        plen = k & 0xff
+        e = entries[k]
+        if not e or not (VOQ_INBAND_IF_RE.match(e['ifname']) and
+            ((plen == 32 and e['nexthop'] == "0.0.0.0") or
+                (plen == 128 and e['nexthop'] == "::"))):
+            rt.add(k)
 
     return rt
 
@@ -408,46 +417,31 @@ def filter_out_voq_neigh_routes(keys):
 def filter_out_default_routes(lst):
     """
     helper to filter out default routes
-    :param lst: list to filter
-    :return filtered list.
+    :param lst: encoded routes to filter
+    :return filtered set.
     """
-    upd = []
-
-    for rt in lst:
-        if not is_default_route(rt):
-            upd.append(rt)
-
-    return upd
+    return {rt for rt in lst if not is_default_route(rt)}
 
 
-def filter_out_vnet_routes(routes):
+def filter_out_vnet_routes(routes, appl_db):
     """
     Helper to filter out VNET routes
-    :param routes: list of routes to filter
-    :return filtered list of routes.
+    :param routes: set of encoded routes to filter
+    :param appl_db: APPL-DB connection
+    :return filtered set of routes.
     """
-    db = swsscommon.DBConnector('APPL_DB', 0)
-
-    vnet_route_table = swsscommon.Table(db, 'VNET_ROUTE_TABLE')
-    vnet_route_tunnel_table = swsscommon.Table(db, 'VNET_ROUTE_TUNNEL_TABLE')
+    vnet_route_table = swsscommon.Table(appl_db, 'VNET_ROUTE_TABLE')
+    vnet_route_tunnel_table = swsscommon.Table(appl_db, 'VNET_ROUTE_TUNNEL_TABLE')
 
     vnet_routes_db_keys = vnet_route_table.getKeys() + vnet_route_tunnel_table.getKeys()
 
-    vnet_routes = []
+    vnet_routes = set()
 
     for vnet_route_db_key in vnet_routes_db_keys:
-        vnet_route_attrs = vnet_route_db_key.split(':')
-        vnet_name = vnet_route_attrs[0]
-        vnet_route = vnet_route_attrs[1]
-        vnet_routes.append(vnet_route)
-
-    updated_routes = []
-
-    for route in routes:
-        if not (route in vnet_routes):
-            updated_routes.append(route)
+        vnet_name, vnet_route = vnet_route_db_key.split(':', 1)
+        vnet_routes.add(encode_prefix(vnet_route))
 
-    return updated_routes
+    return routes - vnet_routes
 
 
 def is_dualtor(config_db):
@@ -456,41 +450,27 @@ def is_dualtor(config_db):
     return subtype.lower() == 'dualtor'
 
 
-def filter_out_standalone_tunnel_routes(routes):
+def filter_out_standalone_tunnel_routes(routes, appl_db):
     config_db = swsscommon.ConfigDBConnector()
     config_db.connect()
 
     if not is_dualtor(config_db):
         return routes
 
-    app_db = swsscommon.DBConnector('APPL_DB', 0)
-    neigh_table = swsscommon.Table(app_db, 'NEIGH_TABLE')
+    neigh_table = swsscommon.Table(appl_db, 'NEIGH_TABLE')
     neigh_keys = neigh_table.getKeys()
-    standalone_tunnel_route_ips = []
-    updated_routes = []
+    standalone_tunnel_routes = set()
 
     for neigh in neigh_keys:
         _, mac = neigh_table.hget(neigh, 'neigh')
         if mac == '00:00:00:00:00:00':
-            # remove preceding 'VlanXXXX' to get just the neighbor IP
-            neigh_ip = ':'.join(neigh.split(':')[1:])
-            standalone_tunnel_route_ips.append(neigh_ip)
-
-    if not standalone_tunnel_route_ips:
-        return routes
-
-    for route in routes:
-        ip, subnet = route.split('/')
-        ip_version = ipaddress.ip_address(ip).version
+            # remove preceding 'VlanXXXX' to get just the neighbor IP.
+            # A standalone tunnel route is the host route of the neighbor;
+            # any route with more than one address is not.
+            neigh_ip = neigh.split(':', 1)[1]
+            standalone_tunnel_routes.add(encode_prefix(neigh_ip))
 
-        # we want to keep the route if it is not a standalone tunnel route.
-        # if the route subnet contains more than one address, it is not a
-        # standalone tunnel route
-        if (ip not in standalone_tunnel_route_ips) or \
-           ((ip_version == 6 and subnet != '128') or (ip_version == 4 and subnet != '32')):
-            updated_routes.append(route)
-
-    return updated_routes
+    return routes - standalone_tunnel_routes
 
 
 def get_soc_ips(config_db):
@@ -521,15 +501,7 @@ def filter_out_soc_ip_routes(routes):
 
     soc_ips = get_soc_ips(config_db)
 
-    if not soc_ips:
-        return routes
-    
-    updated_routes = []
-    for route in routes:
-        if route not in soc_ips:
-            updated_routes.append(route)
-
-    return updated_routes
+    return routes - {encode_prefix(soc_ip) for soc_ip in soc_ips}
 
 
 def check_routes():
@@ -548,68 +520,303 @@ def check_routes():
     :return (0, None) on sucess, else (-1, results) where results holds
     the unjustifiable entries.
     """
-    intf_appl_miss = []
-    rt_appl_miss = []
-    rt_asic_miss = []
+    intf_appl_miss = set()
+    rt_appl_miss = set()
+    rt_asic_miss = set()
 
     results = {}
-    adds = []
-    deletes = []
+    adds = set()
+    deletes = set()
 
     selector, subs, rt_asic = get_route_entries()
 
-    rt_appl = get_routes()
-    intf_appl = get_interfaces()
+    appl_db = swsscommon.DBConnector(APPL_DB_NAME, 0)
+    print_message(syslog.LOG_DEBUG, "APPL DB connected")
+    rt_appl = get_routes(appl_db)
+    intf_appl = get_interfaces(appl_db)
 
     # Diff APPL-DB routes & ASIC-DB routes
-    rt_appl_miss, rt_asic_miss = diff_sorted_lists(rt_appl, rt_asic)
+    rt_appl_miss = rt_appl - rt_asic
 
     # Check missed ASIC routes against APPL-DB INTF_TABLE
-    _, rt_asic_miss = diff_sorted_lists(intf_appl, rt_asic_miss)
+    rt_asic_miss = rt_asic - rt_appl - intf_appl
     rt_asic_miss = filter_out_default_routes(rt_asic_miss)
-    rt_asic_miss = filter_out_vnet_routes(rt_asic_miss)
-    rt_asic_miss = filter_out_standalone_tunnel_routes(rt_asic_miss)
+    rt_asic_miss = filter_out_vnet_routes(rt_asic_miss, appl_db)
+    rt_asic_miss = filter_out_standalone_tunnel_routes(rt_asic_miss, appl_db)
     rt_asic_miss = filter_out_soc_ip_routes(rt_asic_miss)
 
     # Check APPL-DB INTF_TABLE with ASIC table route entries
-    intf_appl_miss, _ = diff_sorted_lists(intf_appl, rt_asic)
+    intf_appl_miss = intf_appl - rt_asic
 
     if rt_appl_miss:
-        rt_appl_miss = filter_out_local_interfaces(rt_appl_miss)
+        entries = get_route_table_entries(get_appl_db_fetcher(), rt_appl_miss)
+        rt_appl_miss = filter_out_local_interfaces(rt_appl_miss, entries)
 
     if rt_appl_miss:
-        rt_appl_miss = filter_out_voq_neigh_routes(rt_appl_miss)
+        rt_appl_miss = filter_out_voq_neigh_routes(rt_appl_miss, entries)
 
     if rt_appl_miss or rt_asic_miss:
         # Look for subscribe updates for a second
         adds, deletes = get_subscribe_updates(selector, subs)
 
         # Drop all those for which SET received
-        rt_appl_miss, _ = diff_sorted_lists(rt_appl_miss, adds)
+        rt_appl_miss -= adds
 
         # Drop all those for which DEL received
-        rt_asic_miss, _ = diff_sorted_lists(rt_asic_miss, deletes)
+        rt_asic_miss -= deletes
 
     if rt_appl_miss:
-        results["missed_ROUTE_TABLE_routes"] = rt_appl_miss
+        results["missed_ROUTE_TABLE_routes"] = to_prefix_list(rt_appl_miss)
 
     if intf_appl_miss:
-        results["missed_INTF_TABLE_entries"] = intf_appl_miss
+        results["missed_INTF_TABLE_entries"] = to_prefix_list(intf_appl_miss)
 
     if rt_asic_miss:
-        results["Unaccounted_ROUTE_ENTRY_TABLE_entries"] = rt_asic_miss
+        results["Unaccounted_ROUTE_ENTRY_TABLE_entries"] = to_prefix_list(rt_asic_miss)
 
     if results:
         print_message(syslog.LOG_WARNING, "Failure results: {",  json.dumps(results, indent=4), "}")
         print_message(syslog.LOG_WARNING, "Failed. Look at reported mismatches above")
-        print_message(syslog.LOG_WARNING, "add: ", json.dumps(adds, indent=4))
-        print_message(syslog.LOG_WARNING, "del: ", json.dumps(deletes, indent=4))
+        print_message(syslog.LOG_WARNING, "add: ", json.dumps(to_prefix_list(adds), indent=4))
+        print_message(syslog.LOG_WARNING, "del: ", json.dumps(to_prefix_list(deletes), indent=4))
         return -1, results
     else:
         print_message(syslog.LOG_INFO, "All good!")
         return 0, None
 
 
+class RouteSet(object):
+    """
+    Set of encoded prefixes, remembering the scopes (VRF, interface ...)
+    each prefix is present in, so that removing it from one scope does
+    not drop it while still present in another.
+    The scope of the lone owner is held as is; a frozenset is created
+    only for prefixes present in more than one scope.
+    """
+    _ABSENT = object()
+
+    def __init__(self):
+        self.routes = {}
+
+    def __contains__(self, prefix):
+        return prefix in self.routes
+
+    def __len__(self):
+        return len(self.routes)
+
+    def add(self, prefix, scope):
+        """
+        :return True if the prefix was not present before
+        """
+        scopes = self.routes.get(prefix, self._ABSENT)
+        if scopes is self._ABSENT:
+            self.routes[prefix] = scope
+            return True
+        if isinstance(scopes, frozenset):
+            self.routes[prefix] = scopes | {scope}
+        elif scopes != scope:
+            self.routes[prefix] = frozenset((scopes, scope))
+        return False
+
+    def remove(self, prefix, scope):
+        """
+        :return True if the prefix is no more present
+        """
+        scopes = self.routes.get(prefix, self._ABSENT)
+        if scopes is self._ABSENT:
+            return False
+        if isinstance(scopes, frozenset):
+            scopes = scopes - {scope}
+            if len(scopes) > 1:
+                self.routes[prefix] = scopes
+            else:
+                self.routes[prefix] = next(iter(scopes))
+            return False
+        if scopes != scope:
+            return False
+        del self.routes[prefix]
+        return True
+
+
+class IncrementalRouteCheck(object):
+    """
+    Keeps APPL-DB routes & interfaces and ASIC-DB route entries, along
+    with their mismatches, current from subscribe updates, instead of
+    reading both DBs on every check.
+    Each mismatch is stamped with the time it was first seen, so that
+    only the ones persisting beyond the grace period get reported.
+    """
+    APPL_MISS = "missed_ROUTE_TABLE_routes"
+    INTF_MISS = "missed_INTF_TABLE_entries"
+    ASIC_MISS = "Unaccounted_ROUTE_ENTRY_TABLE_entries"
+
+    def __init__(self, grace_period):
+        self.grace_period = grace_period
+        self.appl_routes = RouteSet()
+        self.intf_routes = RouteSet()
+        self.asic_routes = RouteSet()
+        self.mismatches = {self.APPL_MISS: {}, self.INTF_MISS: {}, self.ASIC_MISS: {}}
+
+        self.appl_db = swsscommon.DBConnector(APPL_DB_NAME, 0)
+        self.appl_fetcher = get_appl_db_fetcher()
+        asic_db = swsscommon.DBConnector(ASIC_DB_NAME, 0)
+        self.subscribers = [
+            (swsscommon.SubscriberStateTable(self.appl_db, 'ROUTE_TABLE'), self.on_route),
+            (swsscommon.SubscriberStateTable(self.appl_db, 'INTF_TABLE'), self.on_interface),
+            (swsscommon.SubscriberStateTable(asic_db, ASIC_TABLE_NAME), self.on_route_entry)
+        ]
+        self.selector = swsscommon.Select()
+        for subs, _ in self.subscribers:
+            self.selector.addSelectable(subs)
+        print_message(syslog.LOG_DEBUG, "APPL & ASIC DBs subscribed")
+
+
+    def process_updates(self, now):
+        """
+        Apply all the pending subscribe messages. On start, these are
+        the whole content of the subscribed tables.
+        :param now: time stamp for the new mismatches
+        """
+        for subs, on_update in self.subscribers:
+            while True:
+                k, op, _ = subs.pop()
+                if not k:
+                    break
+                on_update(k, op == "SET", now)
+
+
+    def on_route(self, k, is_set, now):
+        scope = None
+        if is_vrf(k):
+            scope, k = k.split(":", 1)
+            scope = sys.intern(scope)
+
+        e = encode_prefix(k)
+        if not is_local(e):
+            self.update(self.appl_routes, e, scope, is_set, now)
+
+
+    def on_interface(self, k, is_set, now):
+        lst = k.split(':', 1)
+        if len(lst) == 1:
+            # No IP address in key; ignore
+            return
+
+        e = encode_prefix(lst[1].split("/", -1)[0])
+        if not is_local(e):
+            self.update(self.intf_routes, e, sys.intern(lst[0]), is_set, now)
+
+
+    def on_route_entry(self, k, is_set, now):
+        res, e = checkout_rt_entry(k)
+        if not res:
+            return
+
+        scope = None
+        idx = k.find('"vr":"')
+        if idx != -1:
+            idx += len('"vr":"')
+            scope = sys.intern(k[idx:k.find('"', idx)])
+        self.update(self.asic_routes, e, scope, is_set, now)
+
+
+    def update(self, routes, prefix, scope, is_set, now):
+        changed = routes.add(prefix, scope) if is_set else routes.remove(prefix, scope)
+        if not changed:
+            return
+
+        in_appl = prefix in self.appl_routes
+        in_intf = prefix in self.intf_routes
+        in_asic = prefix in self.asic_routes
+        self.set_mismatch(self.APPL_MISS, prefix, in_appl and not in_asic, now)
+        self.set_mismatch(self.INTF_MISS, prefix, in_intf and not in_asic, now)
+        self.set_mismatch(self.ASIC_MISS, prefix, in_asic and not in_appl and not in_intf, now)
+
+
+    def set_mismatch(self, kind, prefix, is_mismatch, now):
+        if is_mismatch:
+            self.mismatches[kind].setdefault(prefix, now)
+        else:
+            self.mismatches[kind].pop(prefix, None)
+
+
+    def get_persisting(self, kind, now):
+        return {prefix for prefix, since in self.mismatches[kind].items()
+                if now - since >= self.grace_period}
+
+
+    def check(self, now):
+        """
+        Report the mismatches older than the grace period, discounting
+        the same local, default, VNET, tunnel & SOC routes as check_routes.
+        :return (0, None) on sucess, else (-1, results) where results holds
+        the unjustifiable entries.
+        """
+        results = {}
+
+        rt_appl_miss = self.get_persisting(self.APPL_MISS, now)
+        if rt_appl_miss:
+            entries = get_route_table_entries(self.appl_fetcher, rt_appl_miss)
+            rt_appl_miss = filter_out_local_interfaces(rt_appl_miss, entries)
+
+        if rt_appl_miss:
+            rt_appl_miss = filter_out_voq_neigh_routes(rt_appl_miss, entries)
+
+        intf_appl_miss = self.get_persisting(self.INTF_MISS, now)
+
+        rt_asic_miss = self.get_persisting(self.ASIC_MISS, now)
+        rt_asic_miss = filter_out_default_routes(rt_asic_miss)
+        if rt_asic_miss:
+            rt_asic_miss = filter_out_vnet_routes(rt_asic_miss, self.appl_db)
+            rt_asic_miss = filter_out_standalone_tunnel_routes(rt_asic_miss, self.appl_db)
+            rt_asic_miss = filter_out_soc_ip_routes(rt_asic_miss)
+
+        if rt_appl_miss:
+            results[self.APPL_MISS] = to_prefix_list(rt_appl_miss)
+
+        if intf_appl_miss:
+            results[self.INTF_MISS] = to_prefix_list(intf_appl_miss)
+
+        if rt_asic_miss:
+            results[self.ASIC_MISS] = to_prefix_list(rt_asic_miss)
+
+        print_message(syslog.LOG_DEBUG, "routes: appl={} intf={} asic={}".format(
+            len(self.appl_routes), len(self.intf_routes), len(self.asic_routes)))
+
+        if results:
+            print_message(syslog.LOG_WARNING, "Failure results: {",  json.dumps(results, indent=4), "}")
+            print_message(syslog.LOG_WARNING, "Failed. Look at reported mismatches above")
+            return -1, results
+        else:
+            print_message(syslog.LOG_INFO, "All good!")
+            return 0, None
+
+
+def run_incremental(interval, grace_period):
+    """
+    Daemon mode: build the route sets once, then keep following the
+    updates and check the mismatches every interval.
+    :return Same as check_routes, for the first check when unit testing.
+    """
+    checker = IncrementalRouteCheck(grace_period)
+    checker.process_updates(time.time())
+
+    next_check = time.time()
+    while True:
+        checker.selector.select(SELECT_TIMEOUT_MSECS)
+        now = time.time()
+        checker.process_updates(now)
+        if now < next_check:
+            continue
+
+        signal.alarm(TIMEOUT_SECONDS)
+        ret, res = checker.check(now)
+        signal.alarm(0)
+        if UNIT_TESTING:
+            return ret, res
+        next_check = now + interval
+
+
 def main():
     """
     main entry point, which mainly parses the args and call check_routes
@@ -622,6 +829,10 @@ def main():
     parser.add_argument('-m', "--mode", type=Level, choices=list(Level), default='ERR')
     parser.add_argument("-i", "--interval", type=int, default=0, help="Scan interval in seconds")
     parser.add_argument("-s", "--log_to_syslog", action="store_true", default=True, help="Write message to syslog")
+    parser.add_argument("-d", "--daemon", action="store_true", default=False,
+                        help="Keep running, following DB updates instead of re-reading the DBs on each scan")
+    parser.add_argument("-g", "--grace", type=int, default=DEFAULT_GRACE_SECS,
+                        help="Daemon mode: report mismatches lasting longer than this many seconds")
     args = parser.parse_args()
 
     set_level(args.mode, args.log_to_syslog)
@@ -638,6 +849,9 @@ def main():
 
     signal.signal(signal.SIGALRM, handler)
 
+    if args.daemon:
+        return run_incremental(interval or MIN_SCAN_INTERVAL, args.grace)
+
     while True:
         signal.alarm(TIMEOUT_SECONDS)
         ret, res= check_routes()
@@ -9,12 +9,17 @@ import os
 import sys
 import natsort
 import ast
+import hashlib
+import json
+import mmap
 import time
 import datetime
+import threading
 
 import subprocess
 import click
 import sonic_platform
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 import sonic_platform_base.sonic_sfp.sfputilhelper
 from sonic_platform_base.sfp_base import SfpBase
 from swsscommon.swsscommon import SonicV2Connector
@@ -22,6 +27,8 @@ from natsort import natsorted
 from sonic_py_common import device_info, logger, multi_asic
 from utilities_common.sfp_helper import covert_application_advertisement_to_output_string
 from utilities_common.sfp_helper import QSFP_DATA_MAP
+from utilities_common.cli import UserCache
+from utilities_common.intf_filter import parse_interface_in_filter
 from tabulate import tabulate
 
 VERSION = '3.0'
@@ -46,6 +53,18 @@ CDB_DEFAULT_HOST_PASSWORD = 0x00001011
 
 MAX_LPL_FIRMWARE_BLOCK_SIZE = 116 #Bytes
 
+# Number of transceivers whose EEPROM is read concurrently by default: the
+# platform SFP API is not required to be thread-safe, ports are read one by one
+EEPROM_READ_WORKERS = 1
+XCVR_INFO_CACHE_FILE = 'xcvr_info.json'
+
+# Number of transceivers downloading a firmware concurrently by default: as for
+# the EEPROM reads, ports are downloaded one by one unless --max-workers is given
+FIRMWARE_DOWNLOAD_WORKERS = 1
+# Seconds between the progress reports of a batch firmware download
+FIRMWARE_PROGRESS_INTERVAL = 10
+FIRMWARE_BATCH_STATE_FILE = 'firmware_batch.json'
+
 PAGE_SIZE = 128
 PAGE_OFFSET = 128
 
@@ -511,6 +530,197 @@ def print_all_valid_port_values():
     click.echo("Valid values for port: {}\n".format(str(platform_sfputil.logical)))
 
 
+# ==================== Concurrent EEPROM collection ====================
+
+
+class EepromReadError(Exception):
+    pass
+
+
+class XcvrInfoCache(object):
+    """
+    Static EEPROM info of the transceivers, kept between invocations and
+    keyed by the vendor model and serial number read from the module.
+    The firmware versions and active applications of the cached info
+    may change on the module, they are read again on every hit.
+    Only modules with an xcvr API are cached: it reads the model and serial
+    number fields alone, where Sfp.get_model() may read the whole info.
+    """
+
+    def __init__(self, path=None):
+        if path is None:
+            path = os.path.join(UserCache(app_name='sfputil').get_directory(), XCVR_INFO_CACHE_FILE)
+        self.path = path
+        self.lock = threading.Lock()
+        self.dirty = False
+        try:
+            with open(self.path) as f:
+                self.entries = json.load(f)
+        except (IOError, ValueError):
+            self.entries = {}
+
+    @staticmethod
+    def get_key(sfp):
+        try:
+            api = sfp.get_xcvr_api()
+            if api is None:
+                return None
+            model = api.get_model()
+            serial = api.get_serial()
+        except (AttributeError, NotImplementedError):
+            return None
+        if not model or not serial or 'N/A' in (model, serial):
+            return None
+        return "{}|{}".format(model.strip(), serial.strip())
+
+    @staticmethod
+    def refresh_volatile_info(sfp, xcvr_info):
+        """
+        Return a copy of xcvr_info with its volatile fields read again,
+        None if the transceiver API does not allow it.
+        """
+        xcvr_info = dict(xcvr_info)
+        if not any(key in xcvr_info for key in ('active_firmware', 'inactive_firmware', 'active_apsel_hostlane1')):
+            return xcvr_info
+        try:
+            api = sfp.get_xcvr_api()
+            if 'active_firmware' in xcvr_info:
+                xcvr_info['active_firmware'] = api.get_module_active_firmware()
+            if 'inactive_firmware' in xcvr_info:
+                xcvr_info['inactive_firmware'] = api.get_module_inactive_firmware()
+            if 'active_apsel_hostlane1' in xcvr_info:
+                for key, value in api.get_active_apsel_hostlane().items():
+                    lane = key[len(key.rstrip('0123456789')):]
+                    xcvr_info['active_apsel_hostlane' + lane] = value
+        except (AttributeError, NotImplementedError, KeyError, TypeError):
+            return None
+        return xcvr_info
+
+    def get_transceiver_info(self, sfp):
+        key = self.get_key(sfp)
+        if key is not None:
+            with self.lock:
+                xcvr_info = self.entries.get(key)
+            if xcvr_info is not None:
+                xcvr_info = self.refresh_volatile_info(sfp, xcvr_info)
+                if xcvr_info is not None:
+                    return xcvr_info
+
+        xcvr_info = sfp.get_transceiver_info()
+        if key is not None and xcvr_info:
+            with self.lock:
+                self.entries[key] = xcvr_info
+                self.dirty = True
+        return xcvr_info
+
+    def save(self):
+        if not self.dirty:
+            return
+        try:
+            tmp_path = self.path + '.tmp'
+            with open(tmp_path, 'w') as f:
+                json.dump(self.entries, f)
+            os.rename(tmp_path, self.path)
+            self.dirty = False
+        except (IOError, TypeError) as e:
+            log.log_warning("Failed to save transceiver info cache ({})".format(str(e)))
+
+
+class EepromCollector(object):
+    """
+    Read the EEPROM, and optionally the DOM, of many transceivers.
+
+    Ports are read one by one unless max_workers is more than 1: they are
+    then read by a bounded pool of threads, which requires a thread-safe
+    platform SFP API. The ones sharing a physical port are serialized so
+    that a module is never accessed by two threads at once. The platform
+    API does not describe the I2C topology, hence the pool is bounded as a
+    whole rather than per bus.
+    Output is returned in the order of the ports, as the serial walk did.
+    """
+
+    def __init__(self, dump_dom, cache=None, max_workers=EEPROM_READ_WORKERS):
+        self.dump_dom = dump_dom
+        self.cache = cache
+        self.max_workers = max_workers
+        self.port_locks = {}
+        self.port_locks_lock = threading.Lock()
+
+    def get_port_lock(self, physical_port):
+        with self.port_locks_lock:
+            return self.port_locks.setdefault(physical_port, threading.Lock())
+
+    def get_transceiver_info(self, sfp):
+        if self.cache is not None:
+            return self.cache.get_transceiver_info(sfp)
+        return sfp.get_transceiver_info()
+
+    def read_port(self, port_name, physical_port):
+        """
+        Return the output of a port, raise EepromReadError if the platform does not support it.
+        """
+        with self.get_port_lock(physical_port):
+            if is_port_type_rj45(port_name):
+                return "{}: SFP EEPROM is not applicable for RJ45 port\n\n".format(port_name)
+
+            sfp = platform_chassis.get_sfp(physical_port)
+            try:
+                presence = sfp.get_presence()
+            except NotImplementedError:
+                raise EepromReadError("Sfp.get_presence() is currently not implemented for this platform")
+
+            if not presence:
+                return "{}: SFP EEPROM not detected\n\n".format(port_name)
+
+            output = "{}: SFP EEPROM detected\n".format(port_name)
+            try:
+                xcvr_info = self.get_transceiver_info(sfp)
+            except NotImplementedError:
+                raise EepromReadError("Sfp.get_transceiver_info() is currently not implemented for this platform")
+
+            output += convert_sfp_info_to_output_string(xcvr_info)
+
+            if self.dump_dom:
+                try:
+                    xcvr_dom_info = sfp.get_transceiver_bulk_status()
+                except NotImplementedError:
+                    raise EepromReadError("Sfp.get_transceiver_bulk_status() is currently not implemented for this platform")
+
+                try:
+                    xcvr_dom_threshold_info = sfp.get_transceiver_threshold_info()
+                    if xcvr_dom_threshold_info:
+                        xcvr_dom_info.update(xcvr_dom_threshold_info)
+                except NotImplementedError:
+                    raise EepromReadError("Sfp.get_transceiver_threshold_info() is currently not implemented for this platform")
+
+                output += convert_dom_to_output_string(xcvr_info['type'], xcvr_dom_info)
+
+            return output + '\n'
+
+    def collect(self, ports):
+        """
+        Read the (port_name, physical_port) list, return the outputs in the same order.
+        """
+        if not ports:
+            return []
+        if self.max_workers <= 1 or len(ports) == 1:
+            try:
+                return [self.read_port(port_name, physical_port) for port_name, physical_port in ports]
+            finally:
+                if self.cache is not None:
+                    self.cache.save()
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(ports))) as executor:
+            futures = [executor.submit(self.read_port, port_name, physical_port)
+                       for port_name, physical_port in ports]
+            try:
+                return [future.result() for future in futures]
+            finally:
+                for future in futures:
+                    future.cancel()
+                if self.cache is not None:
+                    self.cache.save()
+
+
 # ==================== Methods for initialization ====================
 
 
@@ -602,10 +812,12 @@ def show():
 @click.option('-p', '--port', metavar='<port_name>', help="Display SFP EEPROM data for port <port_name> only")
 @click.option('-d', '--dom', 'dump_dom', is_flag=True, help="Also display Digital Optical Monitoring (DOM) data")
 @click.option('-n', '--namespace', default=None, help="Display interfaces for specific namespace")
-def eeprom(port, dump_dom, namespace):
+@click.option('--max-workers', type=click.IntRange(1, None), default=EEPROM_READ_WORKERS, show_default=True,
+              help="Number of transceivers read concurrently, only for platforms whose SFP API is thread-safe")
+@click.option('--no-cache', is_flag=True, help="Read the static EEPROM info of all the transceivers again")
+def eeprom(port, dump_dom, namespace, max_workers, no_cache):
     """Display EEPROM data of SFP transceiver(s)"""
     logical_port_list = []
-    output = ""
 
     # Create a list containing the logical port names of all ports we're interested in
     if port is None:
@@ -618,6 +830,7 @@ def eeprom(port, dump_dom, namespace):
 
         logical_port_list = [port]
 
+    ports = []
     for logical_port_name in logical_port_list:
         ganged = False
         i = 1
@@ -631,50 +844,15 @@ def eeprom(port, dump_dom, namespace):
             ganged = True
 
         for physical_port in physical_port_list:
-            port_name = get_physical_port_name(logical_port_name, i, ganged)
-
-            if is_port_type_rj45(port_name):
-                output += "{}: SFP EEPROM is not applicable for RJ45 port\n".format(port_name)
-                output += '\n'
-                continue
+            ports.append((get_physical_port_name(logical_port_name, i, ganged), physical_port))
 
-            try:
-                presence = platform_chassis.get_sfp(physical_port).get_presence()
-            except NotImplementedError:
-                click.echo("Sfp.get_presence() is currently not implemented for this platform")
-                sys.exit(ERROR_NOT_IMPLEMENTED)
-
-            if not presence:
-                output += "{}: SFP EEPROM not detected\n".format(port_name)
-            else:
-                output += "{}: SFP EEPROM detected\n".format(port_name)
-
-                try:
-                    xcvr_info = platform_chassis.get_sfp(physical_port).get_transceiver_info()
-                except NotImplementedError:
-                    click.echo("Sfp.get_transceiver_info() is currently not implemented for this platform")
-                    sys.exit(ERROR_NOT_IMPLEMENTED)
-
-                output += convert_sfp_info_to_output_string(xcvr_info)
-
-                if dump_dom:
-                    try:
-                        xcvr_dom_info = platform_chassis.get_sfp(physical_port).get_transceiver_bulk_status()
-                    except NotImplementedError:
-                        click.echo("Sfp.get_transceiver_bulk_status() is currently not implemented for this platform")
-                        sys.exit(ERROR_NOT_IMPLEMENTED)
-
-                    try:
-                        xcvr_dom_threshold_info = platform_chassis.get_sfp(physical_port).get_transceiver_threshold_info()
-                        if xcvr_dom_threshold_info:
-                            xcvr_dom_info.update(xcvr_dom_threshold_info)
-                    except NotImplementedError:
-                        click.echo("Sfp.get_transceiver_threshold_info() is currently not implemented for this platform")
-                        sys.exit(ERROR_NOT_IMPLEMENTED)
-
-                    output += convert_dom_to_output_string(xcvr_info['type'], xcvr_dom_info)
-
-            output += '\n'
+    # The static EEPROM info is cached, unless asked not to
+    collector = EepromCollector(dump_dom, None if no_cache else XcvrInfoCache(), max_workers)
+    try:
+        output = ''.join(collector.collect(ports))
+    except EepromReadError as e:
+        click.echo(str(e))
+        sys.exit(ERROR_NOT_IMPLEMENTED)
 
     click.echo(output)
 
@@ -1262,76 +1440,325 @@ def commit_firmware(port_name):
 
     return status
 
-def download_firmware(port_name, filepath):
-    """Download firmware on the transceiver"""
-    try:
-        fd = open(filepath, 'rb')
-        fd.seek(0, 2)
-        file_size = fd.tell()
-        fd.seek(0, 0)
-    except FileNotFoundError:
-        click.echo("Firmware file {} NOT found".format(filepath))
-        sys.exit(EXIT_FAIL)
+class FirmwareDownloadError(Exception):
+    def __init__(self, message, exit_code=EXIT_FAIL):
+        super(FirmwareDownloadError, self).__init__(message)
+        self.exit_code = exit_code
 
-    physical_port = logical_port_to_physical_port_index(port_name)
-    sfp = platform_chassis.get_sfp(physical_port)
+
+class FirmwareImage(object):
+    """
+    Firmware image file, memory-mapped once and read-only, so that the
+    blocks written to any number of transceivers are sliced from the
+    same pages instead of being read again from the file.
+    """
+
+    def __init__(self, filepath):
+        self.filepath = filepath
+        self.fd = None
+        self.data = None
+
+    def __enter__(self):
+        self.fd = open(self.filepath, 'rb')
+        try:
+            self.data = mmap.mmap(self.fd.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self.fd.close()
+            raise FirmwareDownloadError("Firmware file {} is empty".format(self.filepath))
+        return self
+
+    def __exit__(self, *args):
+        self.data.close()
+        self.fd.close()
+
+    def __len__(self):
+        return len(self.data)
+
+    def read(self, offset, count):
+        return self.data[offset:offset + count]
+
+    def get_digest(self):
+        return hashlib.sha256(self.data).hexdigest()
+
+
+def cdb_download_firmware(sfp, image, echo=click.echo, progressbar=click.progressbar):
+    """
+    Run the CDB firmware download of a transceiver from a FirmwareImage,
+    return the CDB status of the download completion.
+    Raise FirmwareDownloadError when the download cannot be completed.
+    """
+    file_size = len(image)
     try:
         api = sfp.get_xcvr_api()
     except NotImplementedError:
-        click.echo("This functionality is NOT applicable to this platform")
-        sys.exit(ERROR_NOT_IMPLEMENTED)
+        raise FirmwareDownloadError("This functionality is NOT applicable to this platform", ERROR_NOT_IMPLEMENTED)
 
     try:
         fwinfo = api.get_module_fw_mgmt_feature()
         if fwinfo['status'] == True:
             startLPLsize, maxblocksize, lplonly_flag, autopaging_flag, writelength = fwinfo['feature']
         else:
-            click.echo("Failed to fetch CDB Firmware management features")
-            sys.exit(EXIT_FAIL)
+            raise FirmwareDownloadError("Failed to fetch CDB Firmware management features")
     except NotImplementedError:
-        click.echo("This functionality is NOT applicable for this transceiver")
-        sys.exit(ERROR_NOT_IMPLEMENTED)
+        raise FirmwareDownloadError("This functionality is NOT applicable for this transceiver", ERROR_NOT_IMPLEMENTED)
 
-    click.echo('CDB: Starting firmware download')
-    startdata = fd.read(startLPLsize)
+    echo('CDB: Starting firmware download')
+    startdata = image.read(0, startLPLsize)
     status = api.cdb_start_firmware_download(startLPLsize, startdata, file_size)
     if status != 1:
-        click.echo('CDB: Start firmware download failed - status {}'.format(status))
-        sys.exit(EXIT_FAIL)
+        raise FirmwareDownloadError('CDB: Start firmware download failed - status {}'.format(status))
 
     # Increase the optoe driver's write max to speed up firmware download
     sfp.set_optoe_write_max(SMBUS_BLOCK_WRITE_SIZE)
+    try:
+        with progressbar(length=file_size, label="Downloading ...") as bar:
+            address = 0
+            BLOCK_SIZE = MAX_LPL_FIRMWARE_BLOCK_SIZE if lplonly_flag else maxblocksize
+            remaining = file_size - startLPLsize
+            while remaining > 0:
+                count = BLOCK_SIZE if remaining >= BLOCK_SIZE else remaining
+                data = image.read(startLPLsize + address, count)
+                if len(data) != count:
+                    raise FirmwareDownloadError("Firmware file read failed!")
+
+                if lplonly_flag:
+                    status = api.cdb_lpl_block_write(address, data)
+                else:
+                    status = api.cdb_epl_block_write(address, data, autopaging_flag, writelength)
+                if (status != 1):
+                    raise FirmwareDownloadError("CDB: firmware download failed! - status {}".format(status))
 
-    with click.progressbar(length=file_size, label="Downloading ...") as bar:
-        address = 0
-        BLOCK_SIZE = MAX_LPL_FIRMWARE_BLOCK_SIZE if lplonly_flag else maxblocksize
-        remaining = file_size - startLPLsize
-        while remaining > 0:
-            count = BLOCK_SIZE if remaining >= BLOCK_SIZE else remaining
-            data = fd.read(count)
-            if len(data) != count:
-                click.echo("Firmware file read failed!")
-                sys.exit(EXIT_FAIL)
-
-            if lplonly_flag:
-                status = api.cdb_lpl_block_write(address, data)
-            else:
-                status = api.cdb_epl_block_write(address, data, autopaging_flag, writelength)
-            if (status != 1):
-                click.echo("CDB: firmware download failed! - status {}".format(status))
-                sys.exit(EXIT_FAIL)
-
-            bar.update(count)
-            address += count
-            remaining -= count
-
-    # Restore the optoe driver's write max to '1' (default value)
-    sfp.set_optoe_write_max(1)
+                bar.update(count)
+                address += count
+                remaining -= count
+    finally:
+        # Restore the optoe driver's write max to '1' (default value)
+        sfp.set_optoe_write_max(1)
 
     status = api.cdb_firmware_download_complete()
-    click.echo('CDB: firmware download complete')
+    echo('CDB: firmware download complete')
     return status
 
+def download_firmware(port_name, filepath):
+    """Download firmware on the transceiver"""
+    physical_port = logical_port_to_physical_port_index(port_name)
+    sfp = platform_chassis.get_sfp(physical_port)
+    try:
+        with FirmwareImage(filepath) as image:
+            return cdb_download_firmware(sfp, image)
+    except FileNotFoundError:
+        click.echo("Firmware file {} NOT found".format(filepath))
+        sys.exit(EXIT_FAIL)
+    except FirmwareDownloadError as e:
+        click.echo(str(e))
+        sys.exit(e.exit_code)
+
+
+# ==================== Batch firmware download ====================
+
+
+class FirmwareBatchState(object):
+    """
+    Physical ports already upgraded by batch downloads, kept between
+    invocations and keyed by the digest of the image and the batch mode, so
+    that a batch can be resumed without downloading again to the transceivers
+    that succeeded, whatever logical ports they are given by.
+    """
+
+    def __init__(self, path=None):
+        if path is None:
+            path = os.path.join(UserCache(app_name='sfputil').get_directory(), FIRMWARE_BATCH_STATE_FILE)
+        self.path = path
+        self.lock = threading.Lock()
+        try:
+            with open(self.path) as f:
+                self.entries = json.load(f)
+        except (IOError, ValueError):
+            self.entries = {}
+
+    def get_done_ports(self, key):
+        with self.lock:
+            return set(self.entries.get(key, []))
+
+    def reset(self, key):
+        with self.lock:
+            self.entries.pop(key, None)
+            self.save()
+
+    def add_done_port(self, key, physical_port):
+        with self.lock:
+            ports = self.entries.setdefault(key, [])
+            if physical_port not in ports:
+                ports.append(physical_port)
+            self.save()
+
+    def save(self):
+        try:
+            tmp_path = self.path + '.tmp'
+            with open(tmp_path, 'w') as f:
+                json.dump(self.entries, f)
+            os.rename(tmp_path, self.path)
+        except IOError as e:
+            log.log_warning("Failed to save firmware batch state ({})".format(str(e)))
+
+
+class FirmwareProgress(object):
+    """Progress bar substitute recording the bytes written to a port"""
+
+    def __init__(self, progress, port_name):
+        self.progress = progress
+        self.port_name = port_name
+
+    def __call__(self, length, label=None):
+        self.progress[self.port_name] = [0, length]
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+    def update(self, count):
+        self.progress[self.port_name][0] += count
+
+
+class FirmwareBatch(object):
+    """
+    Download, and optionally run and commit, a firmware image to many
+    transceivers, concurrently if max_workers is more than 1.
+
+    Every transceiver runs its own CDB download state machine in a bounded
+    pool of threads, all of them reading the blocks from the same image.
+    Logical ports sharing a transceiver (breakout) are downloaded once.
+    The ports that succeed are recorded in the state, to be skipped when
+    the batch is resumed.
+    """
+
+    def __init__(self, image, upgrade=False, state=None, max_workers=FIRMWARE_DOWNLOAD_WORKERS):
+        self.image = image
+        self.upgrade = upgrade
+        self.state = state
+        self.max_workers = max_workers
+        self.progress = {}
+        self.key = "{}|{}".format(image.get_digest(), 'upgrade' if upgrade else 'download')
+
+    def download_port(self, port_name, physical_port):
+        """
+        Return the success message of a port, raise FirmwareDownloadError on failure.
+        """
+        if is_port_type_rj45(port_name):
+            raise FirmwareDownloadError("This functionality is not applicable for RJ45 port {}.".format(port_name))
+
+        sfp = platform_chassis.get_sfp(physical_port)
+        try:
+            presence = sfp.get_presence()
+        except NotImplementedError:
+            raise FirmwareDownloadError("sfp get_presence() NOT implemented!", ERROR_NOT_IMPLEMENTED)
+        if not presence:
+            raise FirmwareDownloadError("SFP EEPROM not detected")
+
+        echo = lambda msg: log.log_info("{}: {}".format(port_name, msg))
+        status = cdb_download_firmware(sfp, self.image, echo, FirmwareProgress(self.progress, port_name))
+        if status != 1:
+            raise FirmwareDownloadError("Firmware download complete failed! CDB status = {}".format(status))
+        if not self.upgrade:
+            return "Firmware download complete success"
+
+        api = sfp.get_xcvr_api()
+        try:
+            status = api.cdb_run_firmware(1)
+            if status != 1:
+                raise FirmwareDownloadError('Failed to run firmware in mode=1 ! CDB status: {}'.format(status))
+            status = api.cdb_commit_firmware()
+            if status != 1:
+                raise FirmwareDownloadError('Failed to commit firmware! CDB status: {}'.format(status))
+        except NotImplementedError:
+            raise FirmwareDownloadError("This functionality is not applicable for this transceiver")
+        return "Firmware upgrade successful"
+
+    def run_port(self, port_name, physical_port):
+        try:
+            message = self.download_port(port_name, physical_port)
+        except FirmwareDownloadError as e:
+            return False, str(e)
+        except Exception as e:
+            log.log_error("{}: firmware download failed ({})".format(port_name, repr(e)))
+            return False, "Firmware download failed ({})".format(str(e))
+        if self.state is not None:
+            self.state.add_done_port(self.key, physical_port)
+        return True, message
+
+    def get_progress(self):
+        return ', '.join("{} {}%".format(port_name, done * 100 // total if total else 100)
+                         for port_name, (done, total) in natsorted(self.progress.items()))
+
+    def run(self, ports, resume=False, echo=click.echo):
+        """
+        Download to the (port_name, physical_port) list, echoing the result
+        of every port as it completes and the progress of the ones running.
+        Return the (success, message) of every port, in the order of the ports.
+        """
+        done_ports = set()
+        if self.state is not None:
+            if resume:
+                done_ports = self.state.get_done_ports(self.key)
+            else:
+                self.state.reset(self.key)
+
+        results = {}
+        owners = {}
+        todo = []
+        for port_name, physical_port in ports:
+            if physical_port in owners:
+                continue
+            owners[physical_port] = port_name
+            if physical_port in done_ports:
+                results[port_name] = (True, "Skipped, already done")
+            else:
+                todo.append((port_name, physical_port))
+
+        if todo:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(todo))) as executor:
+                futures = {executor.submit(self.run_port, port_name, physical_port): port_name
+                           for port_name, physical_port in todo}
+                pending = set(futures)
+                while pending:
+                    finished, pending = wait(pending, timeout=FIRMWARE_PROGRESS_INTERVAL,
+                                             return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        port_name = futures[future]
+                        results[port_name] = future.result()
+                        self.progress.pop(port_name, None)
+                        echo("{}: {}".format(port_name, results[port_name][1]))
+                    if not finished and self.progress:
+                        echo("Downloading ... {}".format(self.get_progress()))
+
+        for port_name, physical_port in ports:
+            if port_name not in results:
+                owner = owners[physical_port]
+                success, message = results[owner]
+                results[port_name] = (success, "{} (same transceiver as {})".format(message, owner))
+        return [(port_name,) + results[port_name] for port_name, _ in ports]
+
+
+def get_batch_ports(port_list):
+    """
+    Return the (port_name, physical_port) list of a comma separated list
+    of ports and port ranges, e.g. Ethernet0,Ethernet8-64.
+    The names in a range which are not ports are ignored.
+    """
+    ports = []
+    seen = set()
+    for item in port_list.split(','):
+        for port_name in parse_interface_in_filter(item):
+            if '-' in item and not platform_sfputil.is_logical_port(port_name):
+                continue
+            if port_name not in seen:
+                seen.add(port_name)
+                ports.append((port_name, logical_port_to_physical_port_index(port_name)))
+    return ports
+
 # 'run' subcommand
 @firmware.command()
 @click.argument('port_name', required=True, default=None)
@@ -1445,6 +1872,48 @@ def download(port_name, filepath):
     click.echo("Total download Time: {}".format(str(datetime.timedelta(seconds=end-start))))
 
 
+# 'batch-download' subcommand
+@firmware.command('batch-download')
+@click.argument('port_list', required=True, default=None)
+@click.argument('filepath', required=True, default=None)
+@click.option('--upgrade', is_flag=True, default=False, help="Also run the downloaded firmware in mode 1 and commit it")
+@click.option('--resume', is_flag=True, default=False,
+              help="Skip the ports which succeeded in a previous batch with the same image")
+@click.option('--max-workers', type=click.IntRange(1, None), default=FIRMWARE_DOWNLOAD_WORKERS, show_default=True,
+              help="Number of transceivers downloading concurrently")
+def batch_download(port_list, filepath, upgrade, resume, max_workers):
+    """Download firmware on many transceivers, e.g. Ethernet0,Ethernet8-64"""
+
+    ports = get_batch_ports(port_list)
+    if not ports:
+        click.echo("Error: no port in '{}'".format(port_list))
+        sys.exit(ERROR_INVALID_PORT)
+
+    start = time.time()
+    try:
+        with FirmwareImage(filepath) as image:
+            batch = FirmwareBatch(image, upgrade, FirmwareBatchState(), max_workers)
+            results = batch.run(ports, resume)
+    except FileNotFoundError:
+        click.echo("Firmware file {} NOT found".format(filepath))
+        sys.exit(EXIT_FAIL)
+    except FirmwareDownloadError as e:
+        click.echo(str(e))
+        sys.exit(e.exit_code)
+    end = time.time()
+
+    header = ['Port', 'Result', 'Details']
+    table = [[port_name, 'OK' if success else 'FAILED', message] for port_name, success, message in results]
+    click.echo(tabulate(table, header, tablefmt='simple'))
+    click.echo("Total download Time: {}".format(str(datetime.timedelta(seconds=end-start))))
+
+    failed = [port_name for port_name, success, _ in results if not success]
+    if failed:
+        click.echo("Firmware {} failed on {} port(s), run again with --resume to retry them".format(
+            'upgrade' if upgrade else 'download', len(failed)))
+        sys.exit(EXIT_FAIL)
+
+
 # 'unlock' subcommand
 @firmware.command()
 @click.argument('port_name', required=True, default=None)
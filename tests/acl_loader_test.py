@@ -1,8 +1,12 @@
+import json
 import sys
 import os
 import pytest
+from collections import OrderedDict
 from unittest import mock
 
+from .mock_tables.mock_concurrency import SlowCall
+
 test_path = os.path.dirname(os.path.abspath(__file__))
 modules_path = os.path.dirname(test_path)
 sys.path.insert(0, modules_path)
@@ -79,6 +83,11 @@ class TestAclLoader(object):
             acl_loader.rules_info = {}
             acl_loader.load_rules_from_file(os.path.join(test_path, 'acl_input/illegal_vlan_9000.json'))
 
+    def test_unknown_leaf(self, acl_loader):
+        with pytest.raises(ValueError):
+            acl_loader.rules_info = {}
+            acl_loader.load_rules_from_file(os.path.join(test_path, 'acl_input/unknown_leaf.json'))
+
     def test_vlan_id_not_a_number(self, acl_loader):
         with pytest.raises(ValueError):
             acl_loader.rules_info = {}
@@ -217,3 +226,242 @@ class TestAclLoader(object):
         acl_loader.load_rules_from_file(os.path.join(test_path, 'acl_input/incremental_2.json'))
         acl_loader.incremental_update()
         assert acl_loader.rules_info[(('NTP_ACL', 'RULE_1'))]["PACKET_ACTION"] == "DROP"
+
+    def test_load_acl_json_invalid(self):
+        with pytest.raises(AclLoaderException):
+            list(AclLoader.load_acl_json(os.path.join(test_path, 'acl_input/acl2.json')))
+
+    @pytest.mark.parametrize('filename', sorted(os.listdir(os.path.join(test_path, 'acl_input'))))
+    def test_direct_load_equivalence(self, acl_loader, filename):
+        filename = os.path.join(test_path, 'acl_input', filename)
+        results = []
+        for use_pybind in [True, False]:
+            acl_loader.rules_info = {}
+            try:
+                acl_loader.load_rules_from_file(filename, use_pybind)
+                results.append(acl_loader.rules_info)
+            except (ValueError, AttributeError):
+                # pybind rejects the unknown leaves with an AttributeError
+                results.append(ValueError)
+            except AclLoaderException:
+                results.append(AclLoaderException)
+        assert results[0] == results[1]
+
+    def test_direct_load_scale(self, acl_loader, tmp_path):
+        filename = str(tmp_path / 'acl_scale.json')
+        generate_acl_file(filename, 2000)
+        acl_loader.capabilities = {}
+
+        results = []
+        reads = []
+        conversions = []
+        for use_pybind in [True, False]:
+            acl_loader.rules_info = {}
+            with mock.patch.object(acl_loader.statedb, 'get_all', wraps=acl_loader.statedb.get_all) as get_all, \
+                    mock.patch.object(pybindJSON, 'loads', wraps=pybindJSON.loads) as loads:
+                acl_loader.load_rules_from_file(filename, use_pybind)
+            results.append(acl_loader.rules_info)
+            reads.append(get_all.call_count)
+            conversions.append(loads.call_count)
+
+        assert results[0] == results[1]
+        assert len(results[1]) == 2000 + 1
+        # ACL stage and switch capabilities are read once, not per rule
+        assert reads == [2, 0]
+        # The direct path never builds the pybind model
+        assert conversions == [1, 0]
+
+
+def generate_acl_file(filename, entry_num):
+    acl_entries = {}
+    for seq in range(1, entry_num + 1):
+        acl_entries[str(seq)] = {
+            "config": {"sequence-id": seq},
+            "actions": {"config": {"forwarding-action": "ACCEPT"}},
+            "ip": {"config": {
+                "protocol": ["IP_TCP", "IP_UDP", "17"][seq % 3],
+                "source-ip-address": "10.{}.{}.0/24".format(seq >> 8, seq & 0xff),
+                "destination-ip-address": "20.0.0.{}/32".format(seq & 0xff)
+            }},
+            "transport": {"config": {
+                "source-port": "{}..{}".format(1024 + seq, 2048 + seq),
+                "destination-port": str(seq)
+            }}
+        }
+        if seq % 3 == 0:
+            acl_entries[str(seq)]["l2"] = {"config": {"vlan-id": str(seq % 4094 + 1)}}
+    acl = {"acl": {"acl-sets": {"acl-set": {"dataacl": {"acl-entries": {"acl-entry": acl_entries}}}}}}
+    with open(filename, 'w') as f:
+        json.dump(acl, f)
+
+
+class TestAclRuleWriter(object):
+    def create_acl_loader(self, namespaces):
+        acl_loader = AclLoader.__new__(AclLoader)
+        acl_loader.configdb = mock.MagicMock()
+        acl_loader.per_npu_configdb = {namespace: mock.MagicMock() for namespace in namespaces}
+        acl_loader.rules_db_info = {
+            ('DATAACL', 'RULE_1'): {'PRIORITY': '9999', 'PACKET_ACTION': 'FORWARD', 'SRC_IP': '10.0.0.1/32'},
+            ('DATAACL', 'RULE_2'): {'PRIORITY': '9998', 'PACKET_ACTION': 'FORWARD'},
+            ('EVERFLOW', 'RULE_1'): {'PRIORITY': '9999', 'MIRROR_ACTION': 'everflow0'},
+        }
+        return acl_loader
+
+    def test_write_rules(self):
+        acl_loader = self.create_acl_loader(['asic0', 'asic1'])
+        rule_1 = {'PRIORITY': '9999', 'PACKET_ACTION': 'DROP'}
+        rule_2 = {'PRIORITY': '9998', 'PACKET_ACTION': 'DROP'}
+        rule_3 = {'PRIORITY': '9997', 'PACKET_ACTION': 'FORWARD'}
+        with mock.patch('acl_loader.main.bulk_write.mod_config') as mod_config, \
+                mock.patch('acl_loader.main.info') as info:
+            acl_loader.write_rules(
+                [('DATAACL', 'RULE_1'), ('DATAACL', 'RULE_2'), ('EVERFLOW', 'RULE_1')],
+                {('DATAACL', 'RULE_1'): rule_1, ('DATAACL', 'RULE_2'): rule_2, ('DATAACL', 'RULE_3'): rule_3})
+
+        # One transaction for the whole change set, which also drops the
+        # SRC_IP that RULE_1 loses
+        configdbs = [acl_loader.configdb] + list(acl_loader.per_npu_configdb.values())
+        assert sorted(mod_config.call_args_list, key=lambda call: configdbs.index(call[0][0])) == [
+            mock.call(configdb, {'ACL_RULE': {
+                ('DATAACL', 'RULE_1'): rule_1,
+                ('DATAACL', 'RULE_2'): rule_2,
+                ('DATAACL', 'RULE_3'): rule_3,
+                ('EVERFLOW', 'RULE_1'): None
+            }}, {'ACL_RULE': {('DATAACL', 'RULE_1'): {'SRC_IP'}}}) for configdb in configdbs]
+        assert info.call_args_list[0][0][0].startswith("global: 2 rules written, 1 rules replaced, 1 rules deleted")
+        for configdb in configdbs:
+            configdb.set_entry.assert_not_called()
+            configdb.mod_entry.assert_not_called()
+
+    def test_delete(self):
+        acl_loader = self.create_acl_loader([])
+        acl_loader.delete('DATAACL')
+        acl_loader.configdb.mod_config.assert_called_once_with({'ACL_RULE': {
+            ('DATAACL', 'RULE_1'): None,
+            ('DATAACL', 'RULE_2'): None
+        }})
+
+        acl_loader = self.create_acl_loader([])
+        acl_loader.delete('DATAACL', 'RULE_3')
+        acl_loader.configdb.mod_config.assert_not_called()
+
+    def test_namespaces_written_concurrently(self):
+        mod_config = SlowCall()
+        configdbs = OrderedDict((namespace, mock.MagicMock(mod_config=mock.MagicMock(side_effect=mod_config)))
+                                for namespace in ['', 'asic0', 'asic1', 'asic2', 'asic3', 'asic4', 'asic5'])
+        rules = {('DATAACL', 'RULE_{}'.format(i)): {'PRIORITY': str(10000 - i)} for i in range(10000)}
+
+        AclRuleWriter(configdbs).write(rules)
+
+        assert all(configdb.mod_config.call_count == 1 for configdb in configdbs.values())
+        assert mod_config.active == 0
+        assert mod_config.max_active > 1
+
+
+def dataplane_rules(priorities, max_priority=10000, table_name='DATAACL'):
+    rules = {}
+    for seq, src_ip in priorities:
+        rules[(table_name, 'RULE_{}'.format(seq))] = {
+            'PRIORITY': str(max_priority - seq), 'PACKET_ACTION': 'FORWARD',
+            'ETHER_TYPE': '2048', 'SRC_IP': src_ip}
+    rules[(table_name, 'DEFAULT_RULE')] = {'PRIORITY': '1', 'PACKET_ACTION': 'DROP', 'ETHER_TYPE': '2048'}
+    return rules
+
+
+class TestAclDataplaneDiff(object):
+    def update(self, current_rules, new_rules, max_priority=None):
+        acl_loader = AclLoader.__new__(AclLoader)
+        if max_priority:
+            acl_loader.set_max_priority(max_priority)
+        acl_loader.configdb = mock.MagicMock()
+        acl_loader.per_npu_configdb = {}
+        acl_loader.tables_db_info = {'DATAACL': {'type': 'L3', 'stage': 'INGRESS'}}
+        acl_loader.rules_db_info = current_rules
+        acl_loader.rules_info = new_rules
+        acl_loader.set_dataplane_incremental(True)
+        acl_loader.incremental_update()
+        if not acl_loader.configdb.mod_config.called:
+            return {}
+        return acl_loader.configdb.mod_config.call_args[0][0]['ACL_RULE']
+
+    def test_longest_decreasing_chain(self):
+        assert longest_decreasing_chain([]) == []
+        assert longest_decreasing_chain([9, 8, 7]) == [0, 1, 2]
+        values = [9, 3, 8, 7, 10, 6, 6, 1]
+        chain = longest_decreasing_chain(values)
+        assert [values[idx] for idx in chain] == [9, 8, 7, 6, 1]
+
+    def test_one_rule_changed(self):
+        rules = [(seq, '10.0.{}.{}/32'.format(seq // 256, seq % 256)) for seq in range(1, 5001)]
+        new_rules = dataplane_rules(rules)
+        new_rules[('DATAACL', 'RULE_42')]['PACKET_ACTION'] = 'DROP'
+        del new_rules[('DATAACL', 'RULE_43')]
+
+        written = self.update(dataplane_rules(rules), new_rules)
+        assert written == {('DATAACL', 'RULE_42'): new_rules[('DATAACL', 'RULE_42')], ('DATAACL', 'RULE_43'): None}
+
+    def test_unchanged(self):
+        rules = [(seq, '10.0.0.{}/32'.format(seq)) for seq in range(1, 10)]
+        assert self.update(dataplane_rules(rules), dataplane_rules(rules)) == {}
+
+    def test_max_priority_shift(self):
+        rules = [(seq, '10.0.0.{}/32'.format(seq)) for seq in range(1, 10)]
+        # The order of the rules is the same, their priorities are kept
+        new_rules = dataplane_rules(rules + [(20, '10.0.0.20/32')], max_priority=9000)
+        written = self.update(dataplane_rules(rules, max_priority=9000), new_rules, max_priority=9000)
+        assert list(written) == [('DATAACL', 'RULE_20')]
+        assert written[('DATAACL', 'RULE_20')]['PRIORITY'] == '8980'
+
+        # The priorities above the new max_priority are not kept
+        new_rules = dataplane_rules(rules, max_priority=9000)
+        written = self.update(dataplane_rules(rules), new_rules, max_priority=9000)
+        assert {key: rule['PRIORITY'] for key, rule in written.items()} == {
+            ('DATAACL', 'RULE_{}'.format(seq)): str(9000 - seq) for seq, _ in rules}
+
+        # RULE_1 gets the priority from the file, RULE_3 and RULE_5 are kept
+        rules = [(1, '10.0.0.1/32'), (3, '10.0.0.3/32'), (5, '10.0.0.5/32')]
+        current_rules = dataplane_rules(rules, max_priority=9000)
+        current_rules[('DATAACL', 'RULE_1')]['PRIORITY'] = '9999'
+        new_rules = dataplane_rules(rules + [(2, '10.0.0.2/32'), (4, '10.0.0.4/32')], max_priority=9000)
+        written = self.update(current_rules, new_rules, max_priority=9000)
+        assert {key: rule['PRIORITY'] for key, rule in written.items()} == {
+            ('DATAACL', 'RULE_1'): '8999', ('DATAACL', 'RULE_2'): '8998', ('DATAACL', 'RULE_4'): '8996'}
+
+    def test_no_room_to_resequence(self):
+        current_rules = dataplane_rules([(1, '10.0.0.1/32'), (2, '10.0.0.2/32')])
+        new_rules = dataplane_rules([(1, '10.0.0.1/32'), (2, '10.0.0.3/32'), (3, '10.0.0.2/32')], max_priority=9000)
+        # RULE_2 content changed, RULE_1 and RULE_3 have no room between
+        # RULE_1 and DEFAULT_RULE, the file priorities are used
+        current_rules[('DATAACL', 'DEFAULT_RULE')]['PRIORITY'] = '9997'
+        written = self.update(current_rules, new_rules)
+        assert {key: rule['PRIORITY'] for key, rule in written.items()} == {
+            ('DATAACL', 'RULE_1'): '8999', ('DATAACL', 'RULE_2'): '8998',
+            ('DATAACL', 'RULE_3'): '8997', ('DATAACL', 'DEFAULT_RULE'): '1'}
+
+    def test_no_room_below_max_priority(self):
+        rules = [(4, '10.0.0.4/32'), (5, '10.0.0.5/32'), (6, '10.0.0.6/32')]
+        current_rules = dataplane_rules(rules, max_priority=9003)
+        new_rules = dataplane_rules([(1, '10.0.0.1/32'), (2, '10.0.0.2/32'), (3, '10.0.0.3/32')] + rules,
+                                    max_priority=9000)
+        # The rules added on top of the kept ones cannot go above the max priority,
+        # the file priorities are used
+        written = self.update(current_rules, new_rules, max_priority=9000)
+        assert {key: rule['PRIORITY'] for key, rule in written.items()} == {
+            ('DATAACL', 'RULE_1'): '8999', ('DATAACL', 'RULE_2'): '8998', ('DATAACL', 'RULE_3'): '8997',
+            ('DATAACL', 'RULE_4'): '8996', ('DATAACL', 'RULE_5'): '8995', ('DATAACL', 'RULE_6'): '8994'}
+
+        # Enough room below the max priority
+        written = self.update(current_rules, new_rules, max_priority=9010)
+        assert {key: rule['PRIORITY'] for key, rule in written.items()} == {
+            ('DATAACL', 'RULE_1'): '9002', ('DATAACL', 'RULE_2'): '9001', ('DATAACL', 'RULE_3'): '9000'}
+
+    def test_replace_by_default(self):
+        rules = [(seq, '10.0.0.{}/32'.format(seq)) for seq in range(1, 10)]
+        acl_loader = AclLoader.__new__(AclLoader)
+        acl_loader.configdb = mock.MagicMock()
+        acl_loader.per_npu_configdb = {}
+        acl_loader.tables_db_info = {'DATAACL': {'type': 'L3', 'stage': 'INGRESS'}}
+        acl_loader.rules_db_info = dataplane_rules(rules)
+        acl_loader.rules_info = dataplane_rules(rules)
+        acl_loader.incremental_update()
+        assert len(acl_loader.configdb.mod_config.call_args[0][0]['ACL_RULE']) == 10
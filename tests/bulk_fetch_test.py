@@ -0,0 +1,101 @@
+from unittest import mock
+
+import utilities_common.bulk_fetch as bulk_fetch
+from utilities_common.bulk_fetch import BulkFetcher, get_counters_and_rates
+from .mock_tables.mock_redis import MockDBConnector, MockRedisClient, mock_load_redis_script, mock_run_redis_script
+
+
+class MockSonicV2Connector(object):
+    COUNTERS_DB = 'COUNTERS_DB'
+
+    def __init__(self, client):
+        self.client = client
+
+    def get_redis_client(self, db_name):
+        return self.client
+
+
+def generate_counters_db(port_num):
+    data = {}
+    oids = []
+    for i in range(port_num):
+        oid = 'oid:0x1000000000{:03x}'.format(i)
+        oids.append(oid)
+        data['COUNTERS:' + oid] = {'SAI_PORT_STAT_IF_IN_UCAST_PKTS': str(i),
+                                   'SAI_PORT_STAT_IF_OUT_UCAST_PKTS': str(i * 2)}
+        data['RATES:' + oid] = {'RX_BPS': str(i), 'RX_PPS': '1', 'RX_UTIL': '0',
+                                'TX_BPS': str(i), 'TX_PPS': '1', 'TX_UTIL': '0'}
+    return data, oids
+
+
+class TestBulkFetch(object):
+    def test_get_counters_and_rates(self):
+        data, oids = generate_counters_db(4)
+        client = MockRedisClient(data)
+        fetcher = BulkFetcher(MockSonicV2Connector(client))
+        counters, rates = get_counters_and_rates(fetcher, oids + ['oid:0xdead'])
+        assert client.pipelines == 1
+        assert counters[oids[3]]['SAI_PORT_STAT_IF_OUT_UCAST_PKTS'] == '6'
+        assert rates[oids[2]]['RX_BPS'] == '2'
+        assert counters['oid:0xdead'] == {}
+        assert rates['oid:0xdead'] == {}
+
+    def test_get_counters_only(self):
+        data, oids = generate_counters_db(4)
+        fetcher = BulkFetcher(MockSonicV2Connector(MockRedisClient(data)))
+        counters, rates = get_counters_and_rates(fetcher, oids, with_rates=False)
+        assert len(counters) == 4
+        assert rates == {}
+
+    def test_get_without_pipeline(self):
+        data, oids = generate_counters_db(4)
+        client = MockRedisClient(data, pipelined=False)
+        fetcher = BulkFetcher(MockSonicV2Connector(client))
+        counters, rates = get_counters_and_rates(fetcher, oids)
+        assert counters[oids[2]]['SAI_PORT_STAT_IF_IN_UCAST_PKTS'] == '2'
+        assert rates[oids[1]]['TX_BPS'] == '1'
+        keys = ['RATES:' + oid for oid in oids]
+        assert fetcher.get(MockSonicV2Connector.COUNTERS_DB, keys, 'RX_BPS') == ['0', '1', '2', '3']
+
+    def test_round_trips(self):
+        data, oids = generate_counters_db(1250)
+        keys = ['COUNTERS:' + oid for oid in oids] + ['RATES:' + oid for oid in oids] + ['RATES:oid:0xdead']
+        expected = [data.get(key, {}) for key in keys]
+
+        # One round trip per batch of keys
+        client = MockRedisClient(data)
+        fetcher = BulkFetcher(MockSonicV2Connector(client))
+        assert fetcher.get_all(MockSonicV2Connector.COUNTERS_DB, keys) == expected
+        assert client.round_trips == 3
+
+        # swsscommon DBConnector, the script is loaded once
+        client = MockDBConnector(data)
+        fetcher = BulkFetcher(MockSonicV2Connector(client))
+        with mock.patch.object(bulk_fetch, 'DBConnector', MockDBConnector), \
+                mock.patch.object(bulk_fetch, 'loadRedisScript', mock_load_redis_script), \
+                mock.patch.object(bulk_fetch, 'runRedisScript', mock_run_redis_script):
+            assert fetcher.get_all(MockSonicV2Connector.COUNTERS_DB, keys) == expected
+            assert client.round_trips == 1 + 3
+            values = fetcher.get(MockSonicV2Connector.COUNTERS_DB, keys, 'RX_BPS')
+            assert client.round_trips == 1 + 3 + 3
+        assert values == [entry.get('RX_BPS') for entry in expected]
+        assert values[-1] is None
+
+        # Any other client is read key by key
+        client = MockRedisClient(data, pipelined=False)
+        fetcher = BulkFetcher(MockSonicV2Connector(client))
+        assert fetcher.get_all(MockSonicV2Connector.COUNTERS_DB, keys) == expected
+        assert client.round_trips == len(keys)
+
+    def test_empty(self):
+        fetcher = BulkFetcher(MockSonicV2Connector(MockRedisClient({})))
+        assert fetcher.get_all(MockSonicV2Connector.COUNTERS_DB, []) == []
+        assert fetcher.get(MockSonicV2Connector.COUNTERS_DB, [], 'RX_BPS') == []
+
+    def test_scan(self):
+        data, oids = generate_counters_db(10)
+        client = MockRedisClient(data)
+        fetcher = BulkFetcher(MockSonicV2Connector(client))
+        batches = list(fetcher.scan(MockSonicV2Connector.COUNTERS_DB, 'RATES:*', 4))
+        assert all(len(keys) <= 4 for keys in batches)
+        assert sorted(key for keys in batches for key in keys) == sorted('RATES:' + oid for oid in oids)
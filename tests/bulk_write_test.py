@@ -0,0 +1,96 @@
+import json
+from unittest import mock
+
+import utilities_common.bulk_write as bulk_write
+from .mock_tables.mock_redis import MockDBConnector, MockRedisClient, mock_load_redis_script
+
+
+def mock_run_write_script(client, sha, keys, argv):
+    """ Runs WRITE_SCRIPT """
+    client.round_trips += 1
+    for key, (dropped, fields) in zip(keys, json.loads(argv[0])):
+        if fields is None:
+            client.data.pop(key, None)
+            continue
+        entry = client.data.setdefault(key, {})
+        for field in dropped:
+            entry.pop(field, None)
+        entry.update(fields)
+    return ()
+
+
+class MockConfigDb(object):
+    db_name = 'CONFIG_DB'
+    TABLE_NAME_SEPARATOR = '|'
+
+    def __init__(self, client):
+        self.client = client
+        self.set_entry = mock.MagicMock()
+        self.mod_entry = mock.MagicMock()
+        self.mod_config = mock.MagicMock()
+
+    def get_redis_client(self, db_name):
+        return self.client
+
+    def serialize_key(self, key):
+        return '|'.join(key) if isinstance(key, tuple) else key
+
+    def typed_to_raw(self, entry):
+        raw = {}
+        for field, value in entry.items():
+            if isinstance(value, list):
+                raw[field + '@'] = ','.join(value)
+            else:
+                raw[field] = value
+        return raw or {'NULL': 'NULL'}
+
+
+def generate_config_db():
+    return {'PORT|Ethernet0': {'mtu': '9100', 'fec': 'rs', 'speed': '100000'},
+            'PORT|Ethernet4': {'mtu': '9100'},
+            'VLAN_MEMBER|Vlan1000|Ethernet0': {'tagging_mode': 'untagged'}}
+
+
+CHANGE_SET = {'PORT': {'Ethernet0': {'mtu': '1500', 'speed': '100000'}, 'Ethernet4': {'mtu': '1500'}},
+              'VLAN_MEMBER': {('Vlan1000', 'Ethernet0'): None},
+              'ACL_TABLE': {'EVERFLOW': {'ports': ['Ethernet0', 'Ethernet4']}},
+              'LOOPBACK_INTERFACE': {'Loopback0': {}}}
+DROPPED_FIELDS = {'PORT': {'Ethernet0': {'fec'}}}
+EXPECTED = {'PORT|Ethernet0': {'mtu': '1500', 'speed': '100000'},
+            'PORT|Ethernet4': {'mtu': '1500'},
+            'ACL_TABLE|EVERFLOW': {'ports@': 'Ethernet0,Ethernet4'},
+            'LOOPBACK_INTERFACE|Loopback0': {'NULL': 'NULL'}}
+
+
+class TestBulkWrite(object):
+    def test_pipeline_transaction(self):
+        client = MockRedisClient(generate_config_db())
+        bulk_write.mod_config(MockConfigDb(client), CHANGE_SET, DROPPED_FIELDS)
+        assert client.data == EXPECTED
+        assert client.transactions == client.round_trips == 1
+
+    def test_redis_script(self):
+        client = MockDBConnector(generate_config_db())
+        with mock.patch.object(bulk_write, 'loadRedisScript', mock_load_redis_script), \
+                mock.patch.object(bulk_write, 'runRedisScript', mock_run_write_script):
+            bulk_write.mod_config(MockConfigDb(client), CHANGE_SET, DROPPED_FIELDS)
+        assert client.data == EXPECTED
+        # Loading the script, then the whole change set at once
+        assert client.round_trips == 2
+
+    def test_entry_by_entry(self):
+        config_db = MockConfigDb(MockRedisClient({}, pipelined=False))
+        with mock.patch.object(bulk_write, 'runRedisScript', None):
+            bulk_write.mod_config(config_db, CHANGE_SET, DROPPED_FIELDS)
+        config_db.set_entry.assert_called_once_with('PORT', 'Ethernet0', {'mtu': '1500', 'speed': '100000'})
+        assert config_db.mod_entry.call_count == 4
+
+    def test_no_dropped_fields(self):
+        client = MockRedisClient(generate_config_db())
+        config_db = MockConfigDb(client)
+        bulk_write.mod_config(config_db, CHANGE_SET, {'PORT': {'Ethernet0': set()}})
+        config_db.mod_config.assert_called_once_with(CHANGE_SET)
+        assert client.round_trips == 0
+
+        bulk_write.mod_config(config_db, {'PORT': {}})
+        assert config_db.mod_config.call_count == 1
@@ -16,6 +16,7 @@ from click.testing import CliRunner
 from sonic_py_common import device_info
 from utilities_common.db import Db
 from utilities_common.general import load_module_from_source
+from .mock_tables.mock_concurrency import SlowCall
 from mock import patch
 
 from generic_config_updater.generic_updater import ConfigFormat
@@ -363,14 +364,49 @@ class TestLoadMinigraph(object):
             db = Db()
 
             # From up to down
-            db.cfgdb.set_entry("PORT", "Ethernet0", {"admin_status": "up"})
+            db.cfgdb_pipe.set_entry("PORT", "Ethernet0", {"admin_status": "up"})
             port_config = [{"PORT": {"Ethernet0": {"admin_status": "down"}}}]
-            self.check_port_config(db, config, port_config, "config interface shutdown Ethernet0")
+            self.check_port_config(db, config, port_config, "Setting admin_status of Ethernet0 to down")
+            assert db.cfgdb_pipe.get_entry("PORT", "Ethernet0")["admin_status"] == "down"
 
             # From down to up
-            db.cfgdb.set_entry("PORT", "Ethernet0", {"admin_status": "down"})
+            db.cfgdb_pipe.set_entry("PORT", "Ethernet0", {"admin_status": "down"})
             port_config = [{"PORT": {"Ethernet0": {"admin_status": "up"}}}]
-            self.check_port_config(db, config, port_config, "config interface startup Ethernet0")
+            self.check_port_config(db, config, port_config, "Setting admin_status of Ethernet0 to up")
+            assert db.cfgdb_pipe.get_entry("PORT", "Ethernet0")["admin_status"] == "up"
+
+            # No subprocess per port
+            assert not any('config interface' in str(call) for call in mock_run_command.call_args_list)
+
+    def test_load_minigraph_with_port_config_bulk(self, get_cmd_module, setup_single_broadcom_asic):
+        with mock.patch(
+            "utilities_common.cli.run_command",
+            mock.MagicMock(side_effect=mock_run_command_side_effect)) as mock_run_command:
+            (config, show) = get_cmd_module
+            db = Db()
+            ports = sorted(db.cfgdb_pipe.get_table("PORT"))
+            for port in ports:
+                db.cfgdb_pipe.mod_entry("PORT", port, {"admin_status": "up"})
+            port_config = [{"PORT": {port: {"admin_status": "down"} for port in ports}}]
+
+            with mock.patch.object(db.cfgdb_pipe, "mod_config", wraps=db.cfgdb_pipe.mod_config) as mod_config:
+                self.check_port_config(db, config, port_config, "Setting admin_status of {} to down".format(ports[-1]))
+            mod_config.assert_called_once_with({"PORT": {port: {"admin_status": "down"} for port in ports}})
+            assert all(entry["admin_status"] == "down" for entry in db.cfgdb_pipe.get_table("PORT").values())
+
+    def test_load_minigraph_with_port_config_invalid_admin_status(self, get_cmd_module, setup_single_broadcom_asic):
+        with mock.patch(
+            "utilities_common.cli.run_command",
+            mock.MagicMock(side_effect=mock_run_command_side_effect)) as mock_run_command:
+            (config, show) = get_cmd_module
+            db = Db()
+
+            db.cfgdb_pipe.set_entry("PORT", "Ethernet0", {"admin_status": "up"})
+            db.cfgdb_pipe.set_entry("PORT", "Ethernet4", {"admin_status": "up"})
+            port_config = [{"PORT": {"Ethernet0": {"admin_status": "down"}, "Ethernet4": {"admin_status": "off"}}}]
+            self.check_port_config(db, config, port_config, "Failed to load port_config.json, Error: Invalid admin_status off of port Ethernet4")
+            # Nothing is written when any port is invalid
+            assert db.cfgdb_pipe.get_entry("PORT", "Ethernet0")["admin_status"] == "up"
 
     def test_load_backend_acl(self, get_cmd_module, setup_single_broadcom_asic):
         db = Db()
@@ -639,6 +675,104 @@ class TestReloadConfig(object):
             assert "\n".join([l.rstrip() for l in result.output.split('\n')]) \
                 == RELOAD_MASIC_CONFIG_DB_OUTPUT_FILE_NOT_EXIST
 
+    def test_reload_config_masic_parallel(self, get_cmd_module, setup_multi_broadcom_masic):
+        config_dbs = {}
+        mod_config = SlowCall()
+
+        def mock_config_db(use_unix_socket_path=False, namespace=None):
+            config_db = mock.MagicMock(CONFIG_DB='CONFIG_DB', INIT_INDICATOR='CONFIG_DB_INITIALIZED')
+            config_db.mod_config.side_effect = mod_config
+            config_dbs[namespace] = config_db
+            return config_db
+
+        db_migrator = mock.MagicMock()
+        with mock.patch(
+                "utilities_common.cli.run_command",
+                mock.MagicMock(side_effect=mock_run_command_side_effect)
+        ) as mock_run_command, \
+                mock.patch("config.reload.ConfigDBPipeConnector", side_effect=mock_config_db), \
+                mock.patch("config.reload.load_db_migrator", return_value=db_migrator):
+            (config, show) = get_cmd_module
+            runner = CliRunner()
+            # 3 config files: 1 for host and 2 for asic
+            cfg_files = "{},{},{}".format(
+                            self.dummy_cfg_file,
+                            self.dummy_cfg_file,
+                            self.dummy_cfg_file)
+            result = runner.invoke(
+                config.config.commands["reload"],
+                [cfg_files, '-y', '-f', '--parallel'])
+
+            print(result.exit_code)
+            print(result.output)
+            traceback.print_tb(result.exc_info[2])
+            assert result.exit_code == 0
+
+        assert sorted(config_dbs, key=str) == ['asic0', 'asic1', None]
+        with open(self.dummy_cfg_file) as f:
+            data = sonic_cfggen.FormatConverter.output_to_db(
+                sonic_cfggen.FormatConverter.to_deserialized(json.load(f)))
+        for namespace, config_db in config_dbs.items():
+            # Flushed, written at once and marked as initialized
+            config_db.get_redis_client.return_value.flushdb.assert_called_once_with()
+            config_db.mod_config.assert_called_once_with(data)
+            config_db.get_redis_client.return_value.set.assert_called_once_with('CONFIG_DB_INITIALIZED', 1)
+            assert "{}: Loaded config in".format(namespace or "host") in result.output
+        # Migrated in process
+        assert sorted([call.args for call in db_migrator.DBMigrator.call_args_list], key=str) == \
+            [('asic0',), ('asic1',), (None,)]
+        assert db_migrator.DBMigrator.return_value.migrate.call_count == 3
+        # Namespaces are written concurrently
+        assert "Finished loading 3 namespace(s) in" in result.output
+        assert mod_config.max_active > 1
+        # Not through sonic-cfggen
+        assert "sonic-cfggen" not in result.output
+
+    def test_reload_config_masic_parallel_invalid(self, get_cmd_module, setup_multi_broadcom_masic):
+        with mock.patch(
+                "utilities_common.cli.run_command",
+                mock.MagicMock(side_effect=mock_run_command_side_effect)
+        ) as mock_run_command, \
+                mock.patch("config.reload.ConfigDBPipeConnector") as mock_config_db:
+            (config, show) = get_cmd_module
+            runner = CliRunner()
+            cfg_files = "{},{},{}".format(
+                            self.dummy_cfg_file,
+                            self.dummy_cfg_file_invalid,
+                            self.dummy_cfg_file)
+            result = runner.invoke(
+                config.config.commands["reload"],
+                [cfg_files, '-y', '-f', '--parallel'])
+
+            print(result.exit_code)
+            print(result.output)
+            assert result.exit_code == 1
+
+            output = "\n".join([l.rstrip() for l in result.output.split('\n')])
+            assert RELOAD_CONFIG_DB_OUTPUT_INVALID_MSG in output
+            assert RELOAD_CONFIG_DB_OUTPUT_INVALID_ERROR in output
+            # Files are validated before any namespace is touched
+            mock_config_db.assert_not_called()
+            assert "Stopping SONiC target" not in output
+
+    def test_reload_yang_config_parallel(self, get_cmd_module,
+                                         setup_single_broadcom_asic):
+        with mock.patch(
+                "utilities_common.cli.run_command",
+                mock.MagicMock(side_effect=mock_run_command_side_effect)
+        ) as mock_run_command:
+            (config, show) = get_cmd_module
+            runner = CliRunner()
+
+            result = runner.invoke(config.config.commands["reload"],
+                                    [self.dummy_cfg_file, '-y', '-f', '-t', 'config_yang', '--parallel'])
+
+            print(result.exit_code)
+            print(result.output)
+            assert result.exit_code == 1
+            assert "--parallel is only supported for config files in config_db format" in result.output
+            mock_run_command.assert_not_called()
+
     def test_reload_yang_config(self, get_cmd_module,
                                         setup_single_broadcom_asic):
         with mock.patch(
@@ -0,0 +1,92 @@
+import datetime
+import os
+import _pickle as pickle
+from collections import namedtuple, OrderedDict
+
+from utilities_common import counter_snapshot
+
+NStats = namedtuple("NStats", "rx_ok, rx_err, tx_ok, tx_err")
+QueueStats = namedtuple("QueueStats", "queueindex, queuetype, totalpacket")
+
+
+def build_stats(port_num):
+    stats = OrderedDict()
+    stats['time'] = datetime.datetime(2022, 1, 1, 10, 20, 30, 123456)
+    for i in range(port_num):
+        stats['Ethernet{}'.format(i * 4)] = NStats(str(i), 'N/A', str(i * 10), '0')
+    return stats
+
+
+class TestCounterSnapshot(object):
+    def test_round_trip(self, tmp_path):
+        path = str(tmp_path / 'portstat')
+        stats = build_stats(64)
+        counter_snapshot.dump(stats, path)
+        with open(path, 'rb') as f:
+            assert f.read(len(counter_snapshot.SNAPSHOT_MAGIC)) == counter_snapshot.SNAPSHOT_MAGIC
+        assert counter_snapshot.load(path, NStats) == stats
+
+    def test_filtered_load(self, tmp_path):
+        path = str(tmp_path / 'portstat')
+        counter_snapshot.dump(build_stats(64), path)
+        stats = counter_snapshot.load(path, NStats, ['Ethernet8', 'Ethernet12', 'Ethernet1000'])
+        assert list(stats.keys()) == ['time', 'Ethernet8', 'Ethernet12']
+        assert stats['Ethernet12'] == NStats('3', 'N/A', '30', '0')
+        assert stats['time'] == datetime.datetime(2022, 1, 1, 10, 20, 30, 123456)
+
+    def test_reader(self, tmp_path):
+        path = str(tmp_path / 'portstat')
+        counter_snapshot.dump(build_stats(8), path)
+        with counter_snapshot.SnapshotReader(path) as reader:
+            assert 'Ethernet28' in reader
+            assert 'Ethernet32' not in reader
+            assert reader.get('Ethernet32') is None
+            assert reader.get('Ethernet4') == ('1', 'N/A', '10', '0')
+
+    def test_text_fields(self, tmp_path):
+        path = str(tmp_path / 'queuestat')
+        stats = OrderedDict()
+        stats['time'] = datetime.datetime.now()
+        stats['Ethernet0:0'] = QueueStats('0', 'UC', '100')
+        stats['Ethernet0:8'] = QueueStats('8', 'MC', 'N/A')
+        counter_snapshot.dump(stats, path)
+        assert counter_snapshot.load(path, QueueStats) == stats
+
+    def test_dict_records(self, tmp_path):
+        path = str(tmp_path / 'dropstat')
+        stats = OrderedDict()
+        stats['Ethernet0'] = {'SAI_PORT_STAT_IF_IN_ERRORS': 10, 'DEBUG_0': 2}
+        stats['Ethernet4'] = {'SAI_PORT_STAT_IF_IN_ERRORS': 0}
+        counter_snapshot.dump(stats, path)
+        loaded = counter_snapshot.load(path)
+        assert loaded['time'] is None
+        assert loaded['Ethernet0'] == {'SAI_PORT_STAT_IF_IN_ERRORS': 10, 'DEBUG_0': 2}
+        assert loaded['Ethernet4'] == {'SAI_PORT_STAT_IF_IN_ERRORS': 0}
+
+    def test_list_records_with_tuple_names(self, tmp_path):
+        path = str(tmp_path / 'flow-counter-stats')
+        stats = {('', 'bgp'): ['100', '2000', '10.5', 'oid:0x1'],
+                 ('asic0', 'lldp'): ['0', '0', '0', 'oid:0x2']}
+        counter_snapshot.dump(stats, path)
+        loaded = counter_snapshot.load(path)
+        assert loaded[('', 'bgp')] == ['100', '2000', '10.5', 'oid:0x1']
+        assert loaded[('asic0', 'lldp')] == ['0', '0', '0', 'oid:0x2']
+
+    def test_record_layout_changed(self, tmp_path):
+        path = str(tmp_path / 'portstat')
+        counter_snapshot.dump(build_stats(1), path)
+        NewStats = namedtuple("NewStats", "rx_ok, rx_err, tx_ok, tx_err, fec_corr")
+        assert counter_snapshot.load(path, NewStats)['Ethernet0'] == NewStats('0', 'N/A', '0', '0', 'N/A')
+
+    def test_legacy_pickle(self, tmp_path):
+        path = str(tmp_path / 'portstat')
+        stats = build_stats(4)
+        with open(path, 'wb') as f:
+            pickle.dump(stats, f)
+        assert counter_snapshot.load(path, NStats, ['Ethernet0']) == stats
+
+    def test_empty(self, tmp_path):
+        path = str(tmp_path / 'pfcstat')
+        counter_snapshot.dump(OrderedDict(), path)
+        assert counter_snapshot.load(path) == OrderedDict([('time', None)])
+        assert not os.path.exists(path + '.tmp')
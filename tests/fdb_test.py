@@ -0,0 +1,110 @@
+import os
+from unittest import mock
+
+import pytest
+
+from utilities_common.fdb import FdbEngine, FdbEntry
+from utilities_common.general import load_module_from_source
+from .mock_tables.mock_fdb import FDB_KEY_PREFIX, VLAN_NUM, MockAsicDb, generate_asic_db, mac, mock_port_util
+
+test_path = os.path.dirname(os.path.abspath(__file__))
+modules_path = os.path.dirname(test_path)
+scripts_path = os.path.join(modules_path, "scripts")
+
+FDB_NUM = 10000
+BATCH_SIZE = 1000
+
+
+class TestFdbEngine(object):
+    @pytest.fixture(autouse=True)
+    def port_util(self):
+        with mock.patch('utilities_common.fdb.port_util', mock_port_util()):
+            yield
+
+    def test_filters(self):
+        engine = FdbEngine(MockAsicDb(generate_asic_db(200)), BATCH_SIZE)
+        assert list(engine.entries(address=mac(5))) == [FdbEntry(1005, mac(5), 'Ethernet20', 'Dynamic')]
+        assert list(engine.entries(address=mac(200))) == []
+
+        entries = list(engine.entries(vlan=1003, port='Ethernet12'))
+        assert [entry.mac for entry in entries] == [mac(i) for i in range(200) if i % 160 == 3]
+
+        entries = list(engine.entries(entry_type='Static'))
+        assert len(entries) == len(range(0, 200, 7))
+        assert all(entry.type == 'Static' for entry in entries)
+
+        assert engine.count() == 200
+        assert engine.count(vlan=1001) == 20
+
+    def test_scan_duplicates(self):
+        engine = FdbEngine(MockAsicDb(generate_asic_db(20)), BATCH_SIZE)
+        keys = sorted(key for key in engine.db.client.data if key.startswith(FDB_KEY_PREFIX))
+        # SCAN returning keys twice, as when ASIC_DB is rehashed during the scan
+        with mock.patch.object(engine.fetcher, 'scan', return_value=[keys, keys[:5]]):
+            assert len(list(engine.entries())) == 20
+        with mock.patch.object(engine.fetcher, 'scan', return_value=[keys, keys[:5]]):
+            assert len(list(engine.entries(unique=False))) == 25
+
+    def test_validate_params(self, capsys):
+        engine = FdbEngine(MockAsicDb({}), BATCH_SIZE)
+        assert engine.validate_params('1000', 'Ethernet4', '00:11:22:33:44:55', 'static')
+        assert not engine.validate_params(vlan='4096')
+        assert not engine.validate_params(port='Ethernet1')
+        assert not engine.validate_params(address='00:11:22:33:44')
+        assert not engine.validate_params(entry_type='Remote')
+        assert "Error: Invalid port Ethernet1" in capsys.readouterr().out
+
+    def test_sorted_entries(self):
+        engine = FdbEngine(MockAsicDb(generate_asic_db(200)), BATCH_SIZE)
+        expected = sorted(engine.entries(), key=lambda entry: entry.vlan)
+        with mock.patch.object(engine.fetcher, 'scan', wraps=engine.fetcher.scan) as scan:
+            assert list(engine.sorted_entries(buffer_size=50)) == expected
+        # Counting the entries per vlan, then 2 vlans of 20 entries per group
+        assert scan.call_count == 1 + VLAN_NUM // 2
+
+        assert list(engine.sorted_entries(vlan=1003, buffer_size=50)) == list(engine.entries(vlan=1003))
+
+    def test_scale(self):
+        engine = FdbEngine(MockAsicDb(generate_asic_db(FDB_NUM)), BATCH_SIZE)
+        with mock.patch.object(engine.fetcher, 'get_all', wraps=engine.fetcher.get_all) as get_all:
+            entries = list(engine.entries(vlan=1001))
+
+        assert len(entries) == FDB_NUM // VLAN_NUM
+        # Only the entries of the vlan are read, filtered on their key
+        assert sum(len(call[0][1]) for call in get_all.call_args_list) == FDB_NUM // VLAN_NUM
+        # bvids are resolved once
+        assert len(engine.bvid_tlb) == VLAN_NUM
+
+
+class TestFdbShow(object):
+    def test_display_sorted(self, capsys):
+        fdbshow = load_module_from_source('fdbshow', os.path.join(scripts_path, 'fdbshow'))
+        with mock.patch.object(fdbshow, 'SonicV2Connector', return_value=MockAsicDb(generate_asic_db(200))), \
+             mock.patch('utilities_common.fdb.port_util', mock_port_util()):
+            fdb = fdbshow.FdbShow()
+            fdb.display(None, None, None, None, False)
+            table = capsys.readouterr().out.splitlines()
+            with mock.patch.object(fdbshow, 'SORT_BUFFER_SIZE', 50):
+                fdb.display(None, None, None, None, False)
+            rows = capsys.readouterr().out.splitlines()
+
+        assert table[-1] == rows[-1] == "Total number of entries 200"
+        # Printed as streamed once past the buffer, in the same order
+        assert rows[0].split() == table[0].split()
+        assert [row.split() for row in rows[2:-1]] == [row.split() for row in table[2:-1]]
+        assert [int(row.split()[1]) for row in rows[2:-1]] == sorted(int(row.split()[1]) for row in rows[2:-1])
+
+
+class TestFdbClear(object):
+    def test_validate_params(self):
+        fdbclear = load_module_from_source('fdbclear', os.path.join(scripts_path, 'fdbclear'))
+        with mock.patch.object(fdbclear, 'SonicV2Connector'), \
+             mock.patch.object(fdbclear, 'FdbEngine') as engine:
+            fdb = fdbclear.FdbClear()
+            # Clearing all the entries does not read ASIC_DB
+            assert fdb.validate_params(None, None)
+            engine.assert_not_called()
+
+            fdb.validate_params('1000', None)
+            engine.assert_called_once_with(fdb.db)
+            engine.return_value.validate_params.assert_called_once_with('1000', None)
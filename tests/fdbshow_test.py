@@ -222,6 +222,25 @@ class TestFdbshow():
         assert return_code == 0
         assert result == show_mac_output
 
+    def test_show_mac_stream(self):
+        self.set_mock_variant("1")
+
+        return_code, result = get_result_and_return_code('fdbshow -s')
+        print("return_code: {}".format(return_code))
+        print("result = {}".format(result))
+        assert return_code == 0
+        # Entries are printed in ASIC_DB order, with their own column widths
+        def parse(output):
+            lines = output.splitlines()
+            rows = [line.split() for line in lines[2:-1]]
+            return lines[0].split(), [row[0] for row in rows], sorted(row[1:] for row in rows), lines[-1]
+        header, indexes, rows, total = parse(result)
+        expected_header, expected_indexes, expected_rows, expected_total = parse(show_mac_output)
+        assert header == expected_header
+        assert indexes == expected_indexes
+        assert rows == expected_rows
+        assert total == expected_total
+
     def test_show_mac_count(self):
         self.set_mock_variant("1")
 
@@ -1,6 +1,7 @@
 import copy
 import json
 import jsondiff
+import jsonpatch
 import os
 import unittest
 from collections import defaultdict
@@ -73,17 +74,35 @@ def debug_print(msg):
     print(msg)
 
 
-# Mimics os.system call for sonic-cfggen -d --print-data > filename
+# Mimics ConfigDbSnapshotReader, reading the global running_config
 #
-def os_system_cfggen(cmd):
-    global running_config
+class mock_reader:
+    def __init__(self):
+        self.changed_tables = set()
+        self.ignored_keys = []
+        self.full_reads = 0
+        self.table_reads = []
+        self.closed = False
 
-    fname = cmd.split(">")[-1].strip()
-    with open(fname, "w") as s:
-        s.write(json.dumps(running_config, indent=4))
-    debug_print("File created {} type={} cfg={}".format(fname,
-        type(running_config), json.dumps(running_config)[1:40]))
-    return 0
+    def is_guarded(self):
+        return True
+
+    def get_changed_tables(self, ignored_keys=()):
+        self.ignored_keys.append(set(ignored_keys))
+        changed_tables = self.changed_tables
+        self.changed_tables = set()
+        return changed_tables
+
+    def close(self):
+        self.closed = True
+
+    def get_config(self):
+        self.full_reads += 1
+        return copy.deepcopy(running_config)
+
+    def get_tables(self, tables):
+        self.table_reads.append(sorted(tables))
+        return {tbl: copy.deepcopy(running_config[tbl]) for tbl in tables if tbl in running_config}
 
 
 # mimics config_db.set_entry
@@ -213,14 +232,41 @@ def vlan_validate(old_cfg, new_cfg, keys):
 
 class TestChangeApplier(unittest.TestCase):
 
-    @patch("generic_config_updater.change_applier.os.system")
+    @patch("generic_config_updater.change_applier.ConfigDbSnapshotReader")
     @patch("generic_config_updater.change_applier.get_config_db")
     @patch("generic_config_updater.change_applier.set_config")
-    def test_change_apply(self, mock_set, mock_db, mock_os_sys):
+    def test_change_apply(self, mock_set, mock_db, mock_reader_cls):
+        self.check_change_apply(mock_set, mock_db, mock_reader_cls)
+
+
+    @patch("generic_config_updater.change_applier.ConfigDbSnapshotReader")
+    @patch("generic_config_updater.change_applier.get_config_db_pipe")
+    @patch("generic_config_updater.change_applier.get_config_db")
+    @patch("generic_config_updater.change_applier.mod_config")
+    @patch("generic_config_updater.change_applier.set_config")
+    def test_change_apply__batch_writes(self, mock_set, mock_mod, mock_db, mock_db_pipe, mock_reader_cls):
+        def mod_config(config_db, data, dropped_fields):
+            assert config_db == DB_HANDLE
+            for tbl in data:
+                for key in data[tbl]:
+                    set_entry(config_db, tbl, key, data[tbl][key])
+
+        mock_db_pipe.return_value = DB_HANDLE
+        mock_mod.side_effect = mod_config
+        self.check_change_apply(mock_set, mock_db, mock_reader_cls, batch_writes=True)
+
+        # One transaction per change writing keys
+        writes = sum(1 for change in read_data["json_changes"] if change["update"] or change["remove"])
+        assert mock_mod.call_count == writes
+        mock_set.assert_not_called()
+
+
+    def check_change_apply(self, mock_set, mock_db, mock_reader_cls, batch_writes=False):
         global read_data, running_config, json_changes, json_change_index
         global start_running_config
 
-        mock_os_sys.side_effect = os_system_cfggen
+        reader = mock_reader()
+        mock_reader_cls.return_value = reader
         mock_db.return_value = DB_HANDLE
         mock_set.side_effect = set_entry
 
@@ -234,7 +280,7 @@ class TestChangeApplier(unittest.TestCase):
         generic_config_updater.change_applier.set_verbose(True)
         generic_config_updater.services_validator.set_verbose(True)
         
-        applier = generic_config_updater.change_applier.ChangeApplier()
+        applier = generic_config_updater.change_applier.ChangeApplier(batch_writes=batch_writes)
         debug_print("invoked applier")
 
         for i in range(len(json_changes)):
@@ -269,9 +315,126 @@ class TestChangeApplier(unittest.TestCase):
 
         assert read_data["running_data"] == running_config
 
+        # The config is read once, then only the changed tables are read back
+        assert reader.full_reads == 1
+        for i, tables in enumerate(reader.table_reads):
+            change = read_data["json_changes"][i]
+            assert set(tables) == set(change["update"]).union(change["remove"])
+
         debug_print("all good for applier")
 
 
+    @patch("generic_config_updater.change_applier.ConfigDbSnapshotReader")
+    @patch("generic_config_updater.change_applier.get_config_db")
+    @patch("generic_config_updater.change_applier.set_config")
+    def test_change_apply__tables_changed_by_others__refreshed(self, mock_set, mock_db, mock_reader_cls):
+        global running_config, json_changes, json_change_index
+
+        reader = mock_reader()
+        mock_reader_cls.return_value = reader
+        mock_db.return_value = DB_HANDLE
+        mock_set.side_effect = set_entry
+        running_config = {"PORT": {"Ethernet0": {"mtu": "9100"}}, "VLAN": {"Vlan1000": {"vlanid": "1000"}}}
+        json_changes = [{"update": {"PORT": {"Ethernet0": {"mtu": "1500"}}}, "remove": {}},
+                        {"update": {}, "remove": {"PORT": {"Ethernet0": {}}}}]
+        generic_config_updater.change_applier.UPDATER_CONF_FILE = CONF_FILE
+
+        applier = generic_config_updater.change_applier.ChangeApplier()
+        json_change_index = 0
+        assert applier.apply(mock_obj()) == 0
+
+        # Written by someone else after the first change
+        running_config["VLAN"]["Vlan1000"]["mtu"] = "9000"
+        running_config["LOOPBACK"] = {"Loopback0": {}}
+        reader.changed_tables = {"VLAN", "LOOPBACK"}
+
+        json_change_index = 1
+        assert applier.apply(mock_obj()) == 0
+        assert reader.full_reads == 1
+        assert reader.table_reads == [["PORT"], ["LOOPBACK", "VLAN"], ["PORT"]]
+        assert applier.running_config == running_config == \
+            {"VLAN": {"Vlan1000": {"vlanid": "1000", "mtu": "9000"}}, "LOOPBACK": {"Loopback0": {}}}
+        # The notifications of its own writes are left out when verifying
+        assert reader.ignored_keys == [{"PORT|Ethernet0"}, set(), {"PORT|Ethernet0"}]
+
+        applier.close()
+        assert reader.closed
+        assert applier.running_config is None
+
+
+    @patch("generic_config_updater.change_applier.ConfigDbSnapshotReader")
+    @patch("generic_config_updater.change_applier.get_config_db")
+    @patch("generic_config_updater.change_applier.set_config")
+    def test_change_apply__mismatch__fails(self, mock_set, mock_db, mock_reader_cls):
+        global running_config, json_changes, json_change_index
+
+        reader = mock_reader()
+        mock_reader_cls.return_value = reader
+        mock_db.return_value = DB_HANDLE
+        running_config = {"PORT": {"Ethernet0": {"mtu": "9100"}}}
+        json_changes = [{"update": {"PORT": {"Ethernet0": {"mtu": "1500"}}}, "remove": {}}]
+        json_change_index = 0
+        generic_config_updater.change_applier.UPDATER_CONF_FILE = CONF_FILE
+
+        # The write is lost
+        applier = generic_config_updater.change_applier.ChangeApplier()
+        assert applier.apply(mock_obj()) == -1
+        assert applier.running_config == running_config
+
+
+    @patch("generic_config_updater.change_applier.ConfigDbSnapshotReader")
+    @patch("generic_config_updater.change_applier.get_config_db_pipe")
+    @patch("generic_config_updater.change_applier.get_config_db")
+    @patch("generic_config_updater.change_applier.mod_config")
+    @patch("generic_config_updater.change_applier.set_config")
+    def test_change_apply__batch_writes__only_affected_tables(self, mock_set, mock_mod, mock_db, mock_db_pipe, mock_reader_cls):
+        global running_config
+
+        mock_reader_cls.return_value = mock_reader()
+        mock_db.return_value = DB_HANDLE
+        mock_db_pipe.return_value = "config_db_pipe"
+        running_config = {
+            "PORT": {"Ethernet0": {"mtu": "9100", "fec": "rs"}, "Ethernet4": {"mtu": "9100"}},
+            "BUFFER_PG": {"Ethernet{}|3-4".format(i): {"profile": "pg_lossless"} for i in range(0, 1024, 4)},
+            "VLAN": {"Vlan1000": {"vlanid": "1000"}}
+        }
+        json_patch = jsonpatch.JsonPatch(
+            [{"op": "remove", "path": "/PORT/Ethernet0/fec"},
+             {"op": "replace", "path": "/PORT/Ethernet4/mtu", "value": "1500"},
+             {"op": "remove", "path": "/VLAN"}] +
+            [{"op": "replace", "path": "/BUFFER_PG/Ethernet{}|3-4/profile".format(i), "value": "pg_lossy"}
+             for i in range(0, 1024, 8)])
+        change = generic_config_updater.gu_common.JsonChange(json_patch)
+        generic_config_updater.change_applier.UPDATER_CONF_FILE = CONF_FILE
+
+        applier = generic_config_updater.change_applier.ChangeApplier(batch_writes=True)
+        with patch.object(applier, "_verify_tables", return_value=0):
+            assert applier.apply(change) == 0
+
+        assert generic_config_updater.change_applier.get_affected_tables(change) == {"PORT", "BUFFER_PG", "VLAN"}
+        expected = {
+            "PORT": {"Ethernet0": {"mtu": "9100"}, "Ethernet4": {"mtu": "1500"}},
+            "BUFFER_PG": {"Ethernet{}|3-4".format(i): {"profile": "pg_lossy"} for i in range(0, 1024, 8)},
+            "VLAN": {"Vlan1000": None}
+        }
+        # The removed field is dropped by the same transaction
+        mock_mod.assert_called_once_with("config_db_pipe", expected, {"PORT": {"Ethernet0": {"fec"}}})
+        mock_set.assert_not_called()
+
+
+    def test_get_affected_tables(self):
+        get_affected_tables = generic_config_updater.change_applier.get_affected_tables
+        JsonChange = generic_config_updater.gu_common.JsonChange
+
+        assert get_affected_tables(mock_obj()) is None
+        assert get_affected_tables(JsonChange(jsonpatch.JsonPatch([]))) == set()
+        assert get_affected_tables(JsonChange(jsonpatch.JsonPatch(
+            [{"op": "move", "from": "/PORT/Ethernet0/mtu", "path": "/VLAN/Vlan1000/mtu"},
+             {"op": "add", "path": "/ACL_TABLE", "value": {}}]))) == {"PORT", "VLAN", "ACL_TABLE"}
+        assert get_affected_tables(JsonChange(jsonpatch.JsonPatch(
+            [{"op": "replace", "path": "", "value": {}}]))) is None
+
+
 class TestDryRunChangeApplier(unittest.TestCase):
     def test_apply__calls_apply_change_to_config_db(self):
         # Arrange
@@ -52,6 +52,203 @@ class TestDryRunConfigWrapper(unittest.TestCase):
             # Assert
             self.assertDictEqual(expected, actual)
 
+class FakePubSub:
+    def __init__(self):
+        self.messages = [{"type": "psubscribe", "channel": "__keyspace@4__:*", "data": 1}]
+        self.pattern = None
+
+    def psubscribe(self, pattern):
+        self.pattern = pattern
+
+    def punsubscribe(self, pattern):
+        assert pattern == self.pattern
+        self.pattern = None
+        self.messages = []
+
+    def notify(self, key):
+        self.messages.append({"type": "pmessage", "channel": f"__keyspace@4__:{key}", "data": "hset"})
+
+    def get_message(self):
+        return self.messages.pop(0) if self.messages else None
+
+class FakeRedisClient:
+    def __init__(self, config_db):
+        self.config_db = config_db
+        self.patterns = []
+
+    def pubsub(self):
+        return self.config_db.pubsub
+
+    def keys(self, pattern):
+        self.patterns.append(pattern)
+        self.config_db.on_read()
+        table = pattern.split(self.config_db.KEY_SEPARATOR)[0]
+        return [self.config_db.KEY_SEPARATOR.join([table, self.config_db.serialize_key(key)])
+                for key in self.config_db.data.get(table, {})]
+
+    def hgetall(self, key):
+        table, row = key.split(self.config_db.KEY_SEPARATOR, 1)
+        entries = {self.config_db.serialize_key(typed_key): entry
+                   for typed_key, entry in self.config_db.data.get(table, {}).items()}
+        raw = {}
+        for field, value in entries.get(row, {}).items():
+            if isinstance(value, list):
+                raw[field + "@"] = ",".join(value)
+            else:
+                raw[field] = value
+        return raw
+
+class FakeConfigDb:
+    KEY_SEPARATOR = "|"
+    db_name = "CONFIG_DB"
+
+    def __init__(self, data, changes_while_reading=0):
+        self.data = data
+        self.changes_while_reading = changes_while_reading
+        self.pubsub = FakePubSub()
+        self.client = FakeRedisClient(self)
+        self.reads = 0
+        self.changes = 0
+
+    def on_read(self):
+        if self.changes < self.changes_while_reading:
+            self.changes += 1
+            self.pubsub.notify("PORT|Ethernet0")
+
+    def get_dbid(self, db_name):
+        return 4
+
+    def get_redis_client(self, db_name):
+        return self.client
+
+    def serialize_key(self, key):
+        return self.KEY_SEPARATOR.join(key) if isinstance(key, tuple) else str(key)
+
+    def deserialize_key(self, key):
+        keys = tuple(key.split(self.KEY_SEPARATOR))
+        return keys if len(keys) > 1 else key
+
+    def raw_to_typed(self, raw):
+        typed = {}
+        for field, value in raw.items():
+            if field.endswith("@"):
+                typed[field[:-1]] = value.split(",")
+            else:
+                typed[field] = value
+        return typed
+
+    def get_config(self):
+        self.reads += 1
+        self.on_read()
+        return copy.deepcopy(self.data)
+
+class TestConfigDbSnapshotReader(unittest.TestCase):
+    def setUp(self):
+        self.data = {"PORT": {"Ethernet0": {"mtu": "9100"}},
+                     "VLAN_MEMBER": {("Vlan1000", "Ethernet0"): {"tagging_mode": "untagged"}},
+                     "ACL_TABLE": {"EVERFLOW": {"ports": ["Ethernet0", "Ethernet4"]}}}
+        self.expected = {"PORT": {"Ethernet0": {"mtu": "9100"}},
+                         "VLAN_MEMBER": {"Vlan1000|Ethernet0": {"tagging_mode": "untagged"}},
+                         "ACL_TABLE": {"EVERFLOW": {"ports": ["Ethernet0", "Ethernet4"]}}}
+
+    def test_get_config__keys_serialized_as_cfggen(self):
+        config_db = FakeConfigDb(self.data)
+        reader = gu_common.ConfigDbSnapshotReader(config_db)
+
+        self.assertDictEqual(self.expected, reader.get_config())
+        self.assertEqual("__keyspace@4__:*", config_db.pubsub.pattern)
+        self.assertTrue(reader.is_guarded())
+        self.assertEqual(1, config_db.reads)
+
+    def test_get_config__changed_while_reading__read_again(self):
+        config_db = FakeConfigDb(self.data, changes_while_reading=2)
+        reader = gu_common.ConfigDbSnapshotReader(config_db)
+
+        self.assertDictEqual(self.expected, reader.get_config())
+        self.assertEqual(3, config_db.reads)
+
+    def test_get_config__always_changing__failure(self):
+        config_db = FakeConfigDb(self.data, changes_while_reading=gu_common.ConfigDbSnapshotReader.MAX_READ_ATTEMPTS)
+        reader = gu_common.ConfigDbSnapshotReader(config_db)
+
+        self.assertRaises(gu_common.GenericConfigUpdaterError, reader.get_config)
+
+    def test_get_changed_tables__tables_of_notified_keys(self):
+        config_db = FakeConfigDb(self.data)
+        reader = gu_common.ConfigDbSnapshotReader(config_db)
+        reader.get_config()
+
+        config_db.pubsub.notify("VLAN_MEMBER|Vlan1000|Ethernet0")
+        config_db.pubsub.notify("PORT|Ethernet4")
+        config_db.pubsub.notify("PORT|Ethernet0")
+
+        self.assertEqual({"VLAN_MEMBER", "PORT"}, reader.get_changed_tables())
+        self.assertEqual(set(), reader.get_changed_tables())
+
+    def test_get_changed_tables__ignored_keys__not_reported(self):
+        config_db = FakeConfigDb(self.data)
+        reader = gu_common.ConfigDbSnapshotReader(config_db)
+        reader.get_config()
+
+        config_db.pubsub.notify("PORT|Ethernet0")
+        config_db.pubsub.notify("VLAN_MEMBER|Vlan1000|Ethernet0")
+
+        self.assertEqual({"VLAN_MEMBER"}, reader.get_changed_tables({"PORT|Ethernet0"}))
+        self.assertEqual(set(), reader.get_changed_tables())
+
+    def test_get_tables__only_given_non_empty_tables(self):
+        config_db = FakeConfigDb(self.data)
+        reader = gu_common.ConfigDbSnapshotReader(config_db)
+
+        actual = reader.get_tables(["VLAN_MEMBER", "LOOPBACK", "ACL_TABLE"])
+
+        self.assertDictEqual({"VLAN_MEMBER": self.expected["VLAN_MEMBER"],
+                              "ACL_TABLE": self.expected["ACL_TABLE"]}, actual)
+        # The other tables are not read
+        self.assertEqual(0, config_db.reads)
+        self.assertEqual(["VLAN_MEMBER|*", "LOOPBACK|*", "ACL_TABLE|*"], config_db.client.patterns)
+
+    def test_get_tables__changed_while_reading__read_again(self):
+        config_db = FakeConfigDb(self.data, changes_while_reading=1)
+        reader = gu_common.ConfigDbSnapshotReader(config_db)
+
+        self.assertDictEqual({"PORT": self.expected["PORT"]}, reader.get_tables(["PORT"]))
+        self.assertEqual(["PORT|*", "PORT|*"], config_db.client.patterns)
+        self.assertEqual(set(), reader.get_changed_tables())
+
+    def test_get_tables__other_tables_changed__still_reported(self):
+        config_db = FakeConfigDb(self.data)
+        reader = gu_common.ConfigDbSnapshotReader(config_db)
+        reader.get_config()
+
+        config_db.pubsub.notify("PORT|Ethernet0")
+        config_db.pubsub.notify("VLAN_MEMBER|Vlan1000|Ethernet0")
+        reader.get_tables(["PORT"])
+
+        self.assertEqual({"VLAN_MEMBER"}, reader.get_changed_tables())
+
+    def test_close__unsubscribed(self):
+        config_db = FakeConfigDb(self.data)
+        reader = gu_common.ConfigDbSnapshotReader(config_db)
+        reader.get_config()
+        config_db.pubsub.notify("PORT|Ethernet0")
+
+        reader.close()
+
+        self.assertIsNone(config_db.pubsub.pattern)
+        self.assertEqual(set(), reader.get_changed_tables())
+        # Subscribed again on the next read
+        self.assertEqual("__keyspace@4__:*", config_db.pubsub.pattern)
+
+    def test_is_guarded__no_notifications__false(self):
+        config_db = FakeConfigDb(self.data)
+        config_db.client.pubsub = MagicMock(side_effect=RuntimeError("no pubsub"))
+        reader = gu_common.ConfigDbSnapshotReader(config_db)
+
+        self.assertFalse(reader.is_guarded())
+        self.assertDictEqual(self.expected, reader.get_config())
+        self.assertEqual(set(), reader.get_changed_tables())
+
 class TestConfigWrapper(unittest.TestCase):
     def setUp(self):
         self.config_wrapper_mock = gu_common.ConfigWrapper()
@@ -1080,3 +1277,202 @@ class TestPathAddressing(unittest.TestCase):
         check(config={"ANOTHER_TABLE": {}, "TABLE":{"key1":{"key11":{"key111":[1,2,3,4,5]}}}},
               path="/TABLE/key1/key11/key111/5",
               expected=False)
+
+class FakeDataNode:
+    def __init__(self, xpath, value, nodetype):
+        self.xpath = xpath
+        self.value = value
+        self.nodetype = nodetype
+
+    def path(self):
+        return self.xpath
+
+    def schema(self):
+        schema = Mock()
+        schema.nodetype.return_value = self.nodetype
+        return schema
+
+    def subtype(self):
+        subtype = Mock()
+        subtype.value_str.return_value = self.value
+        return subtype
+
+    def tree_dfs(self):
+        return [self]
+
+class FakeSonicYang:
+    """
+    Loads a config where xpaths are the same as paths, with the list keys as leaves '<path>/@<index>'.
+    VLAN_MEMBER keys refer to VLAN and PORT keys, ACL_TABLE ports refer to PORT keys.
+    """
+    def __init__(self, counts):
+        self.confDbYangMap = {"PORT": {}, "VLAN": {}, "VLAN_MEMBER": {}, "ACL_TABLE": {}}
+        self.counts = counts
+        self.nodes = []
+
+    def loadData(self, config):
+        self.counts["loadData"] += 1
+        self.nodes = []
+        for table in self.confDbYangMap:
+            for key, fields in config.get(table, {}).items():
+                for index, key_part in enumerate(key.split("|")):
+                    self.nodes.append(FakeDataNode(f"/{table}/{key}/@{index}", key_part, gu_common.ly.LYS_LEAF))
+                for field, value in fields.items():
+                    if isinstance(value, list):
+                        for index, item in enumerate(value):
+                            self.nodes.append(FakeDataNode(f"/{table}/{key}/{field}/{index}", item,
+                                                           gu_common.ly.LYS_LEAFLIST))
+                    else:
+                        self.nodes.append(FakeDataNode(f"/{table}/{key}/{field}", value, gu_common.ly.LYS_LEAF))
+
+    @property
+    def root(self):
+        return self
+
+    def find_path(self, xpath):
+        data = Mock()
+        data.data.return_value = [node for node in self.nodes
+                                  if node.xpath == xpath or node.xpath.startswith(xpath + "/")]
+        return data
+
+    def find_data_dependencies(self, xpath):
+        self.counts["find_data_dependencies"] += 1
+        target = next(node for node in self.nodes if node.xpath == xpath)
+        if xpath.startswith("/PORT/") and xpath.endswith("/@0"):
+            refs = [node for node in self.nodes if node.xpath.startswith("/VLAN_MEMBER/") and node.xpath.endswith("/@1")]
+            refs += [node for node in self.nodes if node.xpath.startswith("/ACL_TABLE/") and "/ports/" in node.xpath]
+        elif xpath.startswith("/VLAN/") and xpath.endswith("/@0"):
+            refs = [node for node in self.nodes if node.xpath.startswith("/VLAN_MEMBER/") and node.xpath.endswith("/@0")]
+        else:
+            refs = []
+        return [node.xpath for node in refs if node.value == target.value]
+
+class TestLeafrefIndex(unittest.TestCase):
+    def setUp(self):
+        self.config = {
+            "PORT": {"Ethernet0": {"lanes": "65"}, "Ethernet4": {"lanes": "66"}, "Ethernet8": {"lanes": "67"}},
+            "VLAN": {"Vlan1000": {"vlanid": "1000"}, "Vlan2000": {"vlanid": "2000"}},
+            "VLAN_MEMBER": {"Vlan1000|Ethernet0": {"tagging_mode": "untagged"}},
+            "ACL_TABLE": {"EVERFLOW": {"ports": ["Ethernet0", "Ethernet4"]}},
+            "TABLE_WITHOUT_YANG": {"any": {"ports": ["Ethernet8"]}}
+        }
+        self.counts = {"loadData": 0, "find_data_dependencies": 0}
+
+    def create_path_addressing(self):
+        config_wrapper = Mock()
+        config_wrapper.create_sonic_yang_with_loaded_models.side_effect = lambda: FakeSonicYang(self.counts)
+        path_addressing = gu_common.PathAddressing(config_wrapper)
+        path_addressing.convert_path_to_xpath = lambda path, config, sy: path
+        path_addressing.convert_xpath_to_path = lambda xpath, config, sy: xpath.rsplit("/@", 1)[0]
+        return path_addressing
+
+    def find_all_ref_paths(self, config):
+        path_addressing = self.create_path_addressing()
+        return {(table, key): path_addressing.find_ref_paths(f"/{table}/{key}", config)
+                for table in ["PORT", "VLAN", "VLAN_MEMBER", "ACL_TABLE"] for key in config.get(table, {})}
+
+    def test_find_ref_paths__returns_ref_paths(self):
+        # Arrange
+        path_addressing = self.create_path_addressing()
+
+        # Act and assert
+        self.assertEqual(["/ACL_TABLE/EVERFLOW/ports/0", "/VLAN_MEMBER/Vlan1000|Ethernet0"],
+                         path_addressing.find_ref_paths("/PORT/Ethernet0", self.config))
+        self.assertEqual([], path_addressing.find_ref_paths("/PORT/Ethernet0/lanes", self.config))
+        self.assertEqual(["/ACL_TABLE/EVERFLOW/ports/0",
+                          "/ACL_TABLE/EVERFLOW/ports/1",
+                          "/VLAN_MEMBER/Vlan1000|Ethernet0"],
+                         path_addressing.find_ref_paths("/PORT", self.config))
+        self.assertEqual(["/ACL_TABLE/EVERFLOW/ports/0",
+                          "/ACL_TABLE/EVERFLOW/ports/1",
+                          "/VLAN_MEMBER/Vlan1000|Ethernet0"],
+                         path_addressing.find_ref_paths("", self.config))
+        self.assertEqual([], path_addressing.find_ref_paths("/TABLE_WITHOUT_YANG/any", self.config))
+        self.assertEqual([], path_addressing.find_ref_paths("/PORT/Ethernet12", self.config))
+
+    def test_find_ref_paths__same_config__loaded_and_indexed_once(self):
+        # Arrange
+        path_addressing = self.create_path_addressing()
+        path_addressing.find_ref_paths("/PORT/Ethernet0", self.config)
+        dependencies_count = self.counts["find_data_dependencies"]
+
+        # Act
+        for _ in range(10):
+            path_addressing.find_ref_paths("/PORT/Ethernet0", self.config)
+            path_addressing.find_ref_paths("/PORT/Ethernet0", copy.deepcopy(self.config))
+
+        # Assert
+        self.assertEqual(1, self.counts["loadData"])
+        self.assertEqual(dependencies_count, self.counts["find_data_dependencies"])
+
+    def test_find_ref_paths__fresh_copies_of_cached_configs__hit(self):
+        # Arrange
+        path_addressing = self.create_path_addressing()
+        moves = []
+        for index in range(2 * gu_common.PathAddressing.REF_INDEX_CACHE_SIZE):
+            config = copy.deepcopy(self.config)
+            config["VLAN"][f"Vlan{3000 + index}"] = {"vlanid": str(3000 + index)}
+            moves.append(config)
+
+        # Act, the current config is checked against every move like the patch sorter does,
+        # each time as a fresh copy made by move.apply()
+        lookups = 0
+        for _ in range(3):
+            for config in moves:
+                path_addressing.find_ref_paths("/PORT/Ethernet0", copy.deepcopy(self.config))
+                path_addressing.find_ref_paths("/PORT/Ethernet0", copy.deepcopy(config))
+                lookups += 2
+
+        # Assert, the current config stays cached, only the moves evicted since the last round are loaded again
+        misses = self.counts["loadData"]
+        hits = lookups - misses
+        self.assertEqual(1 + 3 * len(moves), misses)
+        self.assertEqual(3 * len(moves) - 1, hits)
+
+    def test_find_ref_paths__derived_configs__same_as_new_index(self):
+        # Arrange
+        path_addressing = self.create_path_addressing()
+        configs = [self.config]
+        config = dict(self.config)
+        config["VLAN_MEMBER"] = dict(config["VLAN_MEMBER"])
+        config["VLAN_MEMBER"]["Vlan2000|Ethernet8"] = {"tagging_mode": "tagged"}
+        configs.append(config)
+        config = dict(config)
+        config["ACL_TABLE"] = {"EVERFLOW": {"ports": ["Ethernet4"]}}
+        configs.append(config)
+        config = dict(config)
+        del config["VLAN_MEMBER"]
+        configs.append(config)
+        config = dict(config)
+        config["PORT"] = dict(config["PORT"])
+        del config["PORT"]["Ethernet4"]
+        configs.append(config)
+
+        for config in configs:
+            expected = self.find_all_ref_paths(config)
+
+            # Act
+            actual = {(table, key): path_addressing.find_ref_paths(f"/{table}/{key}", config)
+                      for table in ["PORT", "VLAN", "VLAN_MEMBER", "ACL_TABLE"] for key in config.get(table, {})}
+
+            # Assert
+            self.assertEqual(expected, actual)
+
+    def test_find_ref_paths__derived_config__unaffected_entries_reused(self):
+        # Arrange
+        path_addressing = self.create_path_addressing()
+        path_addressing.find_ref_paths("", self.config)
+        config = dict(self.config)
+        config["VLAN"] = dict(config["VLAN"])
+        config["VLAN"]["Vlan2000"] = {"vlanid": "2000", "mtu": "9100"}
+        dependencies_count = self.counts["find_data_dependencies"]
+
+        # Act
+        actual = path_addressing.find_ref_paths("", config)
+
+        # Assert
+        self.assertEqual(["/ACL_TABLE/EVERFLOW/ports/0",
+                          "/ACL_TABLE/EVERFLOW/ports/1",
+                          "/VLAN_MEMBER/Vlan1000|Ethernet0"], actual)
+        # Only the 3 leaves of the changed VLAN entry are looked up again
+        self.assertEqual(dependencies_count + 3, self.counts["find_data_dependencies"])
@@ -1,3 +1,4 @@
+import copy
 from collections import OrderedDict
 import jsonpatch
 import unittest
@@ -108,6 +109,103 @@ class TestDiff(unittest.TestCase):
         self.assertEqual(diff, other_diff)
         self.assertTrue(diff == other_diff)
 
+    def test_apply_move__list_and_nested_paths__same_as_jsonpatch(self):
+        # Arrange
+        current_config = {
+            "PORT": {"Ethernet0": {"lanes": "65", "speed": "10000"}},
+            "VLAN": {"Vlan1000": {"dhcp_servers": ["192.0.0.1", "192.0.0.2"]}},
+            "LIST_TABLE": ["item0"]
+        }
+        patches = [
+            [{"op": "add", "path": "/PORT/Ethernet4", "value": {"lanes": "66"}}],
+            [{"op": "add", "path": "/PORT/Ethernet0/mtu", "value": "9100"}],
+            [{"op": "replace", "path": "/PORT/Ethernet0/speed", "value": "40000"}],
+            [{"op": "remove", "path": "/PORT/Ethernet0"}],
+            [{"op": "add", "path": "/VLAN/Vlan1000/dhcp_servers/1", "value": "192.0.0.3"}],
+            [{"op": "add", "path": "/VLAN/Vlan1000/dhcp_servers/-", "value": "192.0.0.3"}],
+            [{"op": "remove", "path": "/VLAN/Vlan1000/dhcp_servers/0"}],
+            [{"op": "replace", "path": "/LIST_TABLE/0", "value": "item1"}],
+            [{"op": "remove", "path": "/LIST_TABLE"}],
+            [{"op": "add", "path": "/ACL_TABLE", "value": {}}],
+            [{"op": "replace", "path": "", "value": {"PORT": {}}}],
+        ]
+        diff = ps.Diff(current_config, Files.ANY_CONFIG_DB)
+        hash(diff)
+
+        for patch in patches:
+            move = ps.JsonMove.from_patch(jsonpatch.JsonPatch(patch))
+            expected = ps.Diff(jsonpatch.apply_patch(current_config, patch), Files.ANY_CONFIG_DB)
+
+            # Act
+            actual = diff.apply_move(move)
+
+            # Assert
+            self.assertEqual(expected.current_config, actual.current_config, str(patch))
+            self.assertEqual(hash(expected), hash(actual), str(patch))
+
+    def test_apply_move__invalid_move__jsonpatch_error_raised(self):
+        # Arrange
+        diff = ps.Diff({"PORT": {"Ethernet0": {}}, "LIST_TABLE": []}, {})
+        patches = [
+            [{"op": "remove", "path": "/PORT/Ethernet4"}],
+            [{"op": "replace", "path": "/PORT/Ethernet4", "value": {}}],
+            [{"op": "add", "path": "/VLAN/Vlan1000", "value": {}}],
+            [{"op": "add", "path": "/LIST_TABLE/1", "value": "item1"}],
+        ]
+
+        for patch in patches:
+            move = ps.JsonMove.from_patch(jsonpatch.JsonPatch(patch))
+
+            # Act and assert
+            self.assertRaises((jsonpatch.JsonPatchException, jsonpatch.JsonPointerException), diff.apply_move, move)
+
+    def test_apply_move__untouched_config__shared_not_modified(self):
+        # Arrange
+        current_config = {"PORT": {"Ethernet0": {"lanes": "65"}}, "VLAN": {"Vlan1000": {"vlanid": "1000"}}}
+        diff = ps.Diff(current_config, {})
+        move = ps.JsonMove.from_patch(jsonpatch.JsonPatch(
+            [{"op": "add", "path": "/PORT/Ethernet0/mtu", "value": "9100"}]))
+
+        # Act
+        actual = diff.apply_move(move)
+
+        # Assert
+        self.assertEqual({"PORT": {"Ethernet0": {"lanes": "65"}}, "VLAN": {"Vlan1000": {"vlanid": "1000"}}},
+                         current_config)
+        self.assertIs(current_config["VLAN"], actual.current_config["VLAN"])
+        self.assertIsNot(current_config["PORT"], actual.current_config["PORT"])
+        self.assertIs(diff.target_config, actual.target_config)
+
+    def test_hash__empty_and_missing_table__different_hashes(self):
+        # Arrange
+        diff1 = ps.Diff({"PORT": {}}, {})
+        diff2 = ps.Diff({}, {})
+
+        # Act and assert
+        self.assertNotEqual(hash(diff1), hash(diff2))
+
+    def test_apply_move__large_config__incremental_hash(self):
+        # Arrange
+        key_num = 20000
+        current_config = {"PORT": {f"Ethernet{i}": {"lanes": str(i), "admin_status": "up"} for i in range(key_num)}}
+        target_config = copy.deepcopy(current_config)
+        for i in range(0, key_num, 20):
+            target_config["PORT"][f"Ethernet{i}"]["admin_status"] = "down"
+
+        diff = ps.Diff(current_config, target_config)
+        hash(diff)
+
+        # Act
+        for i in range(0, key_num, 20):
+            move = ps.JsonMove(diff, OperationType.REPLACE, ["PORT", f"Ethernet{i}", "admin_status"],
+                                                            ["PORT", f"Ethernet{i}", "admin_status"])
+            diff = diff.apply_move(move)
+            hash(diff)
+
+        # Assert
+        self.assertTrue(diff.has_no_diff())
+        self.assertEqual(hash(diff), hash(ps.Diff(target_config, target_config)))
+
 class TestJsonMove(unittest.TestCase):
     def setUp(self):
         self.operation_wrapper = OperationWrapper()
@@ -905,13 +1003,12 @@ class TestDeleteWholeConfigMoveValidator(unittest.TestCase):
 
 class TestFullConfigMoveValidator(unittest.TestCase):
     def setUp(self):
-        self.any_current_config = Mock()
-        self.any_target_config = Mock()
-        self.any_simulated_config = Mock()
+        self.any_current_config = {"PORT": {"Ethernet0": {"lanes": "65"}}}
+        self.any_target_config = {"PORT": {"Ethernet0": {"lanes": "65", "mtu": "9100"}}}
+        self.any_simulated_config = {"PORT": {"Ethernet0": {"lanes": "65", "mtu": "9100"}}}
         self.any_diff = ps.Diff(self.any_current_config, self.any_target_config)
-        self.any_move = Mock()
-        self.any_move.apply.side_effect = \
-            create_side_effect_dict({(str(self.any_current_config),): self.any_simulated_config})
+        self.any_move = ps.JsonMove(self.any_diff, OperationType.ADD, ["PORT", "Ethernet0", "mtu"],
+                                                                      ["PORT", "Ethernet0", "mtu"])
 
     def test_validate__invalid_config_db_after_applying_move__failure(self):
         # Arrange
@@ -933,6 +1030,32 @@ class TestFullConfigMoveValidator(unittest.TestCase):
         # Act and assert
         self.assertTrue(validator.validate(self.any_move, self.any_diff))
 
+    def test_validate__same_config_after_different_moves__validated_once(self):
+        # Arrange
+        config_wrapper = Mock()
+        config_wrapper.validate_config_db_config.return_value = (True, None)
+        validator = ps.FullConfigMoveValidator(config_wrapper)
+        replace_move = ps.JsonMove(self.any_diff, OperationType.REPLACE, ["PORT", "Ethernet0"], ["PORT", "Ethernet0"])
+        other_diff = ps.Diff({"PORT": {"Ethernet0": {"lanes": "65", "mtu": "1500"}}}, self.any_target_config)
+
+        # Act and assert
+        self.assertTrue(validator.validate(self.any_move, self.any_diff))
+        self.assertTrue(validator.validate(replace_move, self.any_diff))
+        self.assertTrue(validator.validate(self.any_move, other_diff))
+        config_wrapper.validate_config_db_config.assert_called_once_with(self.any_simulated_config)
+
+    def test_validate__hash_collision__config_validated(self):
+        # Arrange
+        config_wrapper = Mock()
+        config_wrapper.validate_config_db_config.side_effect = \
+            create_side_effect_dict({(str(self.any_simulated_config),): (True, None)})
+        validator = ps.FullConfigMoveValidator(config_wrapper)
+        config_hash = self.any_diff.apply_move(self.any_move).current_digest
+        validator.validated_configs[config_hash] = ({"PORT": {}}, False)
+
+        # Act and assert
+        self.assertTrue(validator.validate(self.any_move, self.any_diff))
+
 class TestCreateOnlyMoveValidator(unittest.TestCase):
     def setUp(self):
         self.validator = ps.CreateOnlyMoveValidator(ps.PathAddressing())
@@ -3222,6 +3345,99 @@ class DeleteRefsMoveExtender(unittest.TestCase):
         moves_ops = [list(move.patch)[0] for move in moves]
         self.assertCountEqual(ex_ops, moves_ops)
 
+class VlanMemberConfigWrapper:
+    """
+    Validates VLAN_MEMBER refer to existing VLAN and PORT, in place of YANG models.
+    """
+    def validate_config_db_config(self, config):
+        for member in config.get("VLAN_MEMBER", {}):
+            vlan, port = member.split("|")
+            if vlan not in config.get("VLAN", {}) or port not in config.get("PORT", {}):
+                return False, f"VLAN_MEMBER {member} refers to a missing VLAN or PORT"
+        return True, None
+
+class TestParallelDfsSorter(unittest.TestCase):
+    def setUp(self):
+        self.current_config = {
+            "PORT": {"Ethernet0": {"mtu": "9100"}, "Ethernet4": {"mtu": "9100"}},
+            "VLAN": {"Vlan1000": {"vlanid": "1000"}},
+            "VLAN_MEMBER": {"Vlan1000|Ethernet0": {"tagging_mode": "untagged"},
+                            "Vlan1000|Ethernet4": {"tagging_mode": "untagged"}}
+        }
+        self.target_config = {
+            "PORT": {"Ethernet0": {"mtu": "1500"}, "Ethernet4": {"mtu": "9100"}, "Ethernet8": {"mtu": "9100"}},
+            "VLAN": {"Vlan2000": {"vlanid": "2000"}},
+            "VLAN_MEMBER": {"Vlan2000|Ethernet4": {"tagging_mode": "tagged"},
+                            "Vlan2000|Ethernet8": {"tagging_mode": "untagged"}}
+        }
+
+    def create_move_wrapper(self, config_wrapper):
+        path_addressing = PathAddressing()
+        return ps.MoveWrapper([ps.LowLevelMoveGenerator(path_addressing)],
+                              [ps.KeyLevelMoveGenerator()],
+                              [ps.UpperLevelMoveExtender(), ps.DeleteInsteadOfReplaceMoveExtender()],
+                              [ps.DeleteWholeConfigMoveValidator(),
+                               ps.FullConfigMoveValidator(config_wrapper),
+                               ps.NoEmptyTableMoveValidator(path_addressing)])
+
+    def test_sort__same_moves_as_dfs_sorter(self):
+        # Arrange
+        diff = ps.Diff(self.current_config, self.target_config)
+        expected = ps.DfsSorter(self.create_move_wrapper(VlanMemberConfigWrapper())).sort(diff)
+
+        for max_workers, batch_size in [(1, 1), (1, 3), (2, 4), (3, 16)]:
+            sorter = ps.ParallelDfsSorter(self.create_move_wrapper(VlanMemberConfigWrapper()), max_workers, batch_size)
+
+            # Act
+            actual = sorter.sort(diff)
+
+            # Assert
+            self.assertIsNotNone(actual)
+            self.assertEqual(expected, actual)
+
+    def test_sort__no_possible_sorting__returns_none(self):
+        # Arrange
+        diff = ps.Diff(self.current_config, {"VLAN_MEMBER": {"Vlan1000|Ethernet0": {}}})
+        sorter = ps.ParallelDfsSorter(self.create_move_wrapper(VlanMemberConfigWrapper()), 2, 4)
+
+        # Act and assert
+        self.assertIsNone(sorter.sort(diff))
+
+    def test_validate__cheap_validators_reject_first(self):
+        # Arrange
+        config_wrapper = Mock()
+        config_wrapper.validate_config_db_config.return_value = (True, None)
+        sorter = ps.ParallelDfsSorter(self.create_move_wrapper(config_wrapper), 1)
+        diff = ps.Diff(self.current_config, {})
+        remove_whole_config = ps.JsonMove(diff, OperationType.REMOVE, [])
+        remove_port = ps.JsonMove(diff, OperationType.REMOVE, ["PORT", "Ethernet0"])
+
+        # Act
+        actual = sorter._validate([remove_whole_config, remove_port], diff)
+
+        # Assert
+        self.assertEqual([(False, None), (True, None)], actual)
+        config_wrapper.validate_config_db_config.assert_called_once()
+
+    def test_sort__error_in_speculated_move__not_raised(self):
+        # Arrange
+        diff = ps.Diff({"PORT": {"Ethernet0": {"mtu": "9100"}}}, {"PORT": {"Ethernet0": {"mtu": "1500"}}})
+        first_move = ps.JsonMove(diff, OperationType.REPLACE, ["PORT", "Ethernet0", "mtu"], ["PORT", "Ethernet0", "mtu"])
+        second_move = ps.JsonMove(diff, OperationType.REPLACE, ["PORT"], ["PORT"])
+        move_wrapper = Mock()
+        move_wrapper.generate.side_effect = lambda diff: iter([first_move, second_move])
+        move_wrapper.simulate.side_effect = lambda move, diff: diff.apply_move(move)
+        failing_validator = Mock()
+        failing_validator.validate.side_effect = lambda move, diff: move == first_move or 1/0
+        move_wrapper.move_validators = [failing_validator]
+        sorter = ps.ParallelDfsSorter(move_wrapper, 1, 2)
+
+        # Act
+        actual = sorter.sort(diff)
+
+        # Assert
+        self.assertEqual([first_move], actual)
+
 class TestSortAlgorithmFactory(unittest.TestCase):
     def test_dfs_sorter(self):
         self.verify(ps.Algorithm.DFS, ps.DfsSorter)
@@ -3232,6 +3448,9 @@ class TestSortAlgorithmFactory(unittest.TestCase):
     def test_memoization_sorter(self):
         self.verify(ps.Algorithm.MEMOIZATION, ps.MemoizationSorter)
 
+    def test_parallel_dfs_sorter(self):
+        self.verify(ps.Algorithm.PARALLEL_DFS, ps.ParallelDfsSorter)
+
     def verify(self, algo, algo_class):
         # Arrange
         config_wrapper = ConfigWrapper()
@@ -3311,6 +3530,24 @@ class TestPatchSorter(unittest.TestCase):
             self.assertTrue(is_valid, f"Change will produce invalid config. Error: {error}")
         self.assertEqual(target_config, simulated_config)
 
+    def test_patch_sorter_parallel_dfs__same_changes_as_dfs(self):
+        # Representative patches, sorted by the parallel DFS sorter as by the DFS sorter
+        data = Files.PATCH_SORTER_TEST_SUCCESS
+        test_case_names = ["ADD_2_ITEMS_WITH_DEPENDENCY_FROM_DIFFERENT_TABLES__SUCCESS", # PORT, VLAN_MEMBER
+                           "ADD_TABLE__SUCCESS", # ACL_TABLE
+                           "ADDING_BGP_NEIGHBORS", # BGP_NEIGHBOR
+                           "DPB_1_TO_4__SUCCESS", # PORT, ACL_TABLE, VLAN_MEMBER
+                           "ADD_RACK"]
+        for test_case_name in test_case_names:
+            with self.subTest(name=test_case_name):
+                current_config = data[test_case_name]["current_config"]
+                patch = jsonpatch.JsonPatch(data[test_case_name]["patch"])
+
+                expected_changes = self.create_patch_sorter(current_config).sort(patch, ps.Algorithm.DFS)
+                actual_changes = self.create_patch_sorter(current_config).sort(patch, ps.Algorithm.PARALLEL_DFS)
+
+                self.assertEqual(expected_changes, actual_changes)
+
     def test_patch_sorter_failure(self):
         # Format of the JSON file containing the test-cases:
         #
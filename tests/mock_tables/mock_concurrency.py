@@ -0,0 +1,27 @@
+"""
+Mock slow calls, to count the threads running them at once.
+"""
+import threading
+import time
+
+CALL_TIME = 0.1
+
+
+class SlowCall(object):
+    """ Call lasting duration seconds, recording its arguments, usable as a mock side_effect """
+
+    def __init__(self, duration=CALL_TIME):
+        self.duration = duration
+        self.lock = threading.Lock()
+        self.calls = []
+        self.active = 0
+        self.max_active = 0
+
+    def __call__(self, *args):
+        with self.lock:
+            self.calls.append(args)
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(self.duration)
+        with self.lock:
+            self.active -= 1
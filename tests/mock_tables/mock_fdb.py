@@ -0,0 +1,73 @@
+"""
+Mock ASIC_DB holding FDB entries, for the FDB and neighbor show scripts.
+"""
+import fnmatch
+import json
+from unittest import mock
+
+from .mock_redis import MockRedisClient
+
+PORT_NUM = 32
+VLAN_NUM = 10
+
+FDB_KEY_PREFIX = "ASIC_STATE:SAI_OBJECT_TYPE_FDB_ENTRY:"
+
+
+class MockAsicDb(object):
+    ASIC_DB = 'ASIC_DB'
+
+    def __init__(self, data):
+        self.data = data
+        self.client = MockRedisClient(data)
+
+    def connect(self, db_name):
+        pass
+
+    def keys(self, db_name, pattern):
+        return [key for key in self.data if fnmatch.fnmatchcase(key, pattern)]
+
+    def get_all(self, db_name, key, blocking=False):
+        return self.client.hgetall(key)
+
+    def get_redis_client(self, db_name):
+        return self.client
+
+
+def mac(i):
+    return ':'.join('{:02X}'.format((i >> shift) & 0xff) for shift in (40, 32, 24, 16, 8, 0))
+
+
+def generate_asic_db(fdb_num):
+    """
+    fdb_num FDB entries mac(i) on Vlan 1000 + i % VLAN_NUM, learned on
+    Ethernet(4 * (i % PORT_NUM)), one of 7 is static. Then one static entry
+    mac(fdb_num) not behind a bridge port, and one entry which is not FDB.
+    """
+    data = {}
+    for i in range(fdb_num):
+        fdb = {"bvid": "oid:0x2600000000{:04x}".format(i % VLAN_NUM),
+               "mac": mac(i), "switch_id": "oid:0x21000000000000"}
+        data[FDB_KEY_PREFIX + json.dumps(fdb, separators=(',', ':'))] = {
+            "SAI_FDB_ENTRY_ATTR_BRIDGE_PORT_ID": "oid:0x3a0000000000{:02x}".format(i % PORT_NUM),
+            "SAI_FDB_ENTRY_ATTR_TYPE": ["SAI_FDB_ENTRY_TYPE_DYNAMIC", "SAI_FDB_ENTRY_TYPE_STATIC"][i % 7 == 0]
+        }
+    # Static entry on a Vlan, not behind a bridge port
+    fdb = {"vlan": "1000", "mac": mac(fdb_num), "switch_id": "oid:0x21000000000000"}
+    data[FDB_KEY_PREFIX + json.dumps(fdb, separators=(',', ':'))] = {
+        "SAI_FDB_ENTRY_ATTR_BRIDGE_PORT_ID": "oid:0x3a00000000ffff",
+        "SAI_FDB_ENTRY_ATTR_TYPE": "SAI_FDB_ENTRY_TYPE_STATIC"
+    }
+    # Not an FDB entry
+    data["ASIC_STATE:SAI_OBJECT_TYPE_SWITCH:oid:0x21000000000000"] = {"SAI_SWITCH_ATTR_INIT_SWITCH": "true"}
+    return data
+
+
+def mock_port_util():
+    port_util = mock.MagicMock()
+    if_oid_map = {'1000000000{:02x}'.format(p): 'Ethernet{}'.format(p * 4) for p in range(PORT_NUM)}
+    if_name_map = {name: oid for oid, name in if_oid_map.items()}
+    port_util.get_interface_oid_map.return_value = (if_name_map, if_oid_map)
+    port_util.get_bridge_port_map.return_value = {
+        '3a0000000000{:02x}'.format(p): '1000000000{:02x}'.format(p) for p in range(PORT_NUM)}
+    port_util.get_vlan_id_from_bvid.side_effect = lambda db, bvid: str(1000 + int(bvid[-4:], 16))
+    return port_util
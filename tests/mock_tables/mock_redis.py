@@ -0,0 +1,87 @@
+"""
+Mock redis clients, to count the round trips of bulk reads.
+"""
+import fnmatch
+import json
+
+
+class MockRedisClient(object):
+    """ Redis client, with a redis-py style pipeline unless pipelined is False """
+
+    def __init__(self, data, pipelined=True):
+        self.data = data
+        self.pipelines = 0
+        self.transactions = 0
+        self.round_trips = 0
+        if not pipelined:
+            self.pipeline = None
+
+    def hgetall(self, key):
+        self.round_trips += 1
+        return dict(self.data.get(key, {}))
+
+    def hget(self, key, field):
+        self.round_trips += 1
+        return self.data.get(key, {}).get(field)
+
+    def pipeline(self, transaction=True):
+        self.pipelines += 1
+        return MockPipeline(self, transaction)
+
+    def scan(self, cursor, match, count):
+        keys = sorted(self.data.keys())
+        cursor = int(cursor)
+        batch = [key for key in keys[cursor:cursor + count] if fnmatch.fnmatchcase(key, match)]
+        cursor += count
+        return (cursor if cursor < len(keys) else 0), batch
+
+
+class MockPipeline(object):
+    def __init__(self, client, transaction):
+        self.client = client
+        self.transaction = transaction
+        self.commands = []
+
+    def hgetall(self, key):
+        self.commands.append(lambda: dict(self.client.data.get(key, {})))
+
+    def hget(self, key, field):
+        self.commands.append(lambda: self.client.data.get(key, {}).get(field))
+
+    def delete(self, key):
+        self.commands.append(lambda: self.client.data.pop(key, None) is not None)
+
+    def hdel(self, key, *fields):
+        self.commands.append(lambda: sum(self.client.data.get(key, {}).pop(field, None) is not None
+                                         for field in fields))
+
+    def hmset(self, key, mapping):
+        self.commands.append(lambda: self.client.data.setdefault(key, {}).update(mapping))
+
+    def execute(self):
+        self.client.round_trips += 1
+        if self.transaction:
+            self.client.transactions += 1
+        return [command() for command in self.commands]
+
+
+class MockDBConnector(MockRedisClient):
+    """ swsscommon DBConnector, without pipeline but running redis scripts """
+
+    def __init__(self, data):
+        super(MockDBConnector, self).__init__(data, pipelined=False)
+
+
+def mock_load_redis_script(client, script):
+    client.round_trips += 1
+    return 'sha'
+
+
+def mock_run_redis_script(client, sha, keys, argv):
+    """ Runs bulk_fetch.READ_SCRIPT """
+    client.round_trips += 1
+    if argv[0] == 'HGET':
+        values = [client.data.get(key, {}).get(argv[1], False) for key in keys]
+    else:
+        values = [client.data.get(key, {}) for key in keys]
+    return (json.dumps(values),)
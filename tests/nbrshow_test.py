@@ -0,0 +1,76 @@
+import math
+import os
+from unittest import mock
+
+from utilities_common.bulk_fetch import BATCH_SIZE
+from utilities_common.general import load_module_from_source
+from .mock_tables.mock_fdb import VLAN_NUM, MockAsicDb, generate_asic_db, mac, mock_port_util
+
+test_path = os.path.dirname(os.path.abspath(__file__))
+modules_path = os.path.dirname(test_path)
+scripts_path = os.path.join(modules_path, "scripts")
+nbrshow_path = os.path.join(scripts_path, 'nbrshow')
+nbrshow = load_module_from_source('nbrshow', nbrshow_path)
+
+FDB_NUM = 6000
+ARP_NUM = 3000
+
+
+def generate_arp_output(arp_num=ARP_NUM):
+    lines = ["Address                  HWtype  HWaddress           Flags Mask            Iface"]
+    for i in range(arp_num):
+        lines.append("192.{}.{}.{}  ether   {}   C                     Vlan{}".format(
+            (i >> 16) & 0xff, (i >> 8) & 0xff, i & 0xff, mac(i).lower(), 1000 + i % VLAN_NUM))
+    # Neighbor not in FDB
+    lines.append("10.0.0.1  ether   {}   C                     Vlan1000".format(mac(FDB_NUM + 1).lower()))
+    lines.append("10.0.0.57  ether   52:54:00:87:8f:2c   C                     PortChannel0001")
+    lines.append("10.0.0.59  (incomplete)                              PortChannel0002")
+    return '\n'.join(lines) + '\n'
+
+
+class TestNbrshow(object):
+    def run_arpshow(self, data, arp_output):
+        db = MockAsicDb(data)
+        with mock.patch.object(nbrshow, 'SonicV2Connector', return_value=db), \
+             mock.patch.object(nbrshow, 'port_util', mock_port_util()), \
+             mock.patch.object(nbrshow.NbrBase, 'fetch_nbr_data', return_value=arp_output):
+            arp = nbrshow.ArpShow(None, None)
+            arp.display()
+        return arp, db
+
+    def test_arp_vlan_port(self, capsys):
+        arp, db = self.run_arpshow(generate_asic_db(64), generate_arp_output(64))
+        assert arp.bridge_mac_map[(1005, mac(5))] == 'Ethernet20'
+
+        by_addr = {ent[0]: ent for ent in arp.nbrdata}
+        assert by_addr['192.0.0.5'] == ['192.0.0.5', mac(5).lower(), 'Ethernet20', 1005]
+        assert by_addr['10.0.0.1'] == ['10.0.0.1', mac(FDB_NUM + 1).lower(), '-', 1000]
+        assert by_addr['10.0.0.57'] == ['10.0.0.57', '52:54:00:87:8f:2c', 'PortChannel0001', '-']
+        assert '10.0.0.59' not in by_addr
+        assert "Total number of entries 66" in capsys.readouterr().out
+
+    def test_neigh_parse(self, capsys):
+        output = ("fc00::76 dev PortChannel0002 lladdr 52:54:00:33:90:d0 router REACHABLE\n"
+                  "fc00::7a dev Vlan1003 lladdr 00:00:00:00:00:03 STALE\n"
+                  "fe80::1 dev eth0 FAILED\n")
+        with mock.patch.object(nbrshow, 'SonicV2Connector', return_value=MockAsicDb(generate_asic_db(4))), \
+             mock.patch.object(nbrshow, 'port_util', mock_port_util()), \
+             mock.patch.object(nbrshow.NbrBase, 'fetch_nbr_data', return_value=output):
+            neigh = nbrshow.NeighShow(None, None)
+            neigh.display()
+
+        by_addr = {ent[0]: ent for ent in neigh.nbrdata}
+        assert by_addr == {
+            'fc00::76': ['fc00::76', '52:54:00:33:90:d0', 'PortChannel0002', '-', 'REACHABLE'],
+            'fc00::7a': ['fc00::7a', '00:00:00:00:00:03', 'Ethernet12', 1003, 'STALE']
+        }
+        assert "Total number of entries 2" in capsys.readouterr().out
+
+    def test_arp_scale(self, capsys):
+        arp, db = self.run_arpshow(generate_asic_db(FDB_NUM), generate_arp_output())
+        capsys.readouterr()
+
+        assert len(arp.bridge_mac_map) == FDB_NUM
+        # The FDB entries, and the static one not behind a bridge port, are read in batches
+        assert db.client.round_trips == math.ceil((FDB_NUM + 1) / BATCH_SIZE)
+        assert sum(1 for ent in arp.nbrdata if ent[2].startswith('Ethernet')) == ARP_NUM
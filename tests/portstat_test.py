@@ -1,12 +1,18 @@
+import json
 import os
 import shutil
+import time
+from collections import OrderedDict
+from unittest import mock
 
 from click.testing import CliRunner
 
 import clear.main as clear
 import show.main as show
+from .mock_tables.mock_redis import MockRedisClient
 from .utils import get_result_and_return_code
 from utilities_common.cli import UserCache
+from utilities_common.general import load_module_from_source
 
 root_path = os.path.dirname(os.path.abspath(__file__))
 modules_path = os.path.dirname(root_path)
@@ -339,6 +345,33 @@ class TestPortStat(object):
         assert return_code == 0
         assert result == intf_counters_detailed
 
+    def test_show_intf_counters_watch(self):
+        return_code, result = get_result_and_return_code(
+            'portstat -w 0.1 --count 2 -j')
+        print("return_code: {}".format(return_code))
+        print("result = {}".format(result))
+        assert return_code == 0
+        lines = result.splitlines()
+        assert len(lines) == 2
+        for line in lines:
+            data = json.loads(line)
+            assert list(data["ports"].keys()) == ["Ethernet0", "Ethernet4", "Ethernet8"]
+            assert data["ports"]["Ethernet0"]["STATE"] == "D"
+            assert data["ports"]["Ethernet0"]["RX_OK"] == "0"
+            assert data["ports"]["Ethernet0"]["RX_BPS"] == "0.00 B/s"
+            assert data["ports"]["Ethernet0"]["RX_UTIL"] == "0.00%"
+            assert data["ports"]["Ethernet4"]["TX_ERR"] == "N/A"
+
+    def test_show_intf_counters_watch_interface(self):
+        return_code, result = get_result_and_return_code(
+            'portstat -w 0.1 --count 1 -i Ethernet4')
+        print("return_code: {}".format(return_code))
+        print("result = {}".format(result))
+        assert return_code == 0
+        assert "Ethernet4" in result
+        assert "Ethernet0" not in result
+        assert "Ethernet8" not in result
+
     def test_clear_intf_counters(self):
         runner = CliRunner()
         result = runner.invoke(clear.cli.commands["counters"], [])
@@ -505,3 +538,111 @@ class TestMultiAsicPortStat(object):
         os.environ["UTILITIES_UNIT_TESTING"] = "0"
         os.environ["UTILITIES_UNIT_TESTING_TOPOLOGY"] = ""
         remove_tmp_cnstat_file()
+
+
+class MockCountersDb(object):
+    COUNTERS_DB = 'COUNTERS_DB'
+    APPL_DB = 'APPL_DB'
+    STATE_DB = 'STATE_DB'
+
+    def __init__(self, dbs):
+        self.clients = {db_name: MockRedisClient(data) for db_name, data in dbs.items()}
+
+    def get_db_list(self):
+        return list(self.clients)
+
+    def get_all(self, db_name, key, blocking=False):
+        return self.clients[db_name].hgetall(key)
+
+    def get_redis_client(self, db_name):
+        return self.clients[db_name]
+
+
+class TestGearboxPortStat(object):
+    def test_gearbox_counters(self):
+        portstat = load_module_from_source('portstat', os.path.join(scripts_path, 'portstat'))
+        db = MockCountersDb({
+            'COUNTERS_DB': {
+                'COUNTERS_PORT_NAME_MAP': {'Ethernet0': 'oid:0x1000000000001', 'Ethernet4': 'oid:0x1000000000002'},
+                'COUNTERS:oid:0x1000000000001': {'SAI_PORT_STAT_IF_IN_UCAST_PKTS': '10',
+                                                 'SAI_PORT_STAT_IF_IN_NON_UCAST_PKTS': '0'},
+                'COUNTERS:oid:0x1000000000002': {'SAI_PORT_STAT_IF_IN_UCAST_PKTS': '20',
+                                                 'SAI_PORT_STAT_IF_IN_NON_UCAST_PKTS': '0'},
+            },
+            'GB_COUNTERS_DB': {
+                'COUNTERS_PORT_NAME_MAP': {'Ethernet0_system': 'oid:0x1010000000001',
+                                           'Ethernet0_line': 'oid:0x1010000000002'},
+            },
+        })
+        counter_table = mock.MagicMock()
+        counter_table.get.return_value = (True, (('SAI_PORT_STAT_IF_IN_UCAST_PKTS', '110'),
+                                                 ('SAI_PORT_STAT_IF_IN_NON_UCAST_PKTS', '1')))
+
+        with mock.patch.object(portstat, 'CounterTable', return_value=counter_table):
+            stat = portstat.Portstat(None, 'all')
+            stat.db = db
+            cnstat_dict, _ = stat.get_cnstat()
+
+        # The gearbox port is aggregated by CounterTable, the other one read from COUNTERS_DB
+        assert [call.args[1] for call in counter_table.get.call_args_list] == ['Ethernet0']
+        assert cnstat_dict['Ethernet0'].rx_ok == '111'
+        assert cnstat_dict['Ethernet4'].rx_ok == '20'
+
+
+def generate_port_dbs(portstat, port_num):
+    ports = ['Ethernet{}'.format(i * 4) for i in range(port_num)]
+    counters_db = {'COUNTERS_PORT_NAME_MAP': {port: 'oid:0x1000000000{:03x}'.format(i) for i, port in enumerate(ports)}}
+    for port, oid in counters_db['COUNTERS_PORT_NAME_MAP'].items():
+        counters_db['COUNTERS:' + oid] = {counter: '0' for cntr_list in portstat.counter_bucket_dict.values()
+                                          for counter in cntr_list}
+        counters_db['RATES:' + oid] = {'RX_BPS': '0', 'TX_BPS': '0'}
+    appl_db = {'PORT_TABLE:' + port: {'admin_status': 'up', 'oper_status': 'up', 'speed': '100000'} for port in ports}
+    return MockCountersDb({'COUNTERS_DB': counters_db, 'APPL_DB': appl_db, 'STATE_DB': {}})
+
+
+class TestPortStatWatch(object):
+    def create_portstat(self, port_num):
+        portstat = load_module_from_source('portstat', os.path.join(scripts_path, 'portstat'))
+        db = generate_port_dbs(portstat, port_num)
+        stat = portstat.Portstat(None, 'all')
+        stat.multi_asic.get_db_client = mock.MagicMock(return_value=db)
+        stat.multi_asic.get_config_db_client = mock.MagicMock()
+        return portstat, stat, db
+
+    def test_watch_reads_only_counters(self, capsys):
+        portstat, stat, db = self.create_portstat(512)
+        ticks = []
+
+        with mock.patch.object(portstat.time, 'sleep', side_effect=lambda secs: ticks.append(time.perf_counter())):
+            stat.watch(1, None, True, count=5)
+
+        ports = [json.loads(line)['ports'] for line in capsys.readouterr().out.splitlines()]
+        assert len(ports) == 5
+        assert all(len(tick) == 512 and tick['Ethernet4']['STATE'] == 'U' for tick in ports)
+        # The port name map once, then one bulk read of the COUNTERS hashes per interval, no RATES
+        assert db.clients['COUNTERS_DB'].round_trips == 1 + 6
+        # Port state is not read again within PORT_TABLES_REFRESH_INTERVAL
+        assert db.clients['APPL_DB'].round_trips == 1
+        assert db.clients['STATE_DB'].round_trips == 1
+        # Budget of an interval for 512 ports, the fastest one is measured to leave out CI load
+        assert min(end - start for start, end in zip(ticks, ticks[1:])) < 0.05
+
+    def test_watch_refreshes_port_state(self, capsys):
+        portstat, stat, db = self.create_portstat(1)
+        counters = db.clients['COUNTERS_DB'].data['COUNTERS:oid:0x1000000000000']
+        port_table = db.clients['APPL_DB'].data['PORT_TABLE:Ethernet0']
+
+        def sleep(secs):
+            # The port flaps between the two intervals
+            counters['SAI_PORT_STAT_IF_IN_UCAST_PKTS'] = str(int(counters['SAI_PORT_STAT_IF_IN_UCAST_PKTS']) + 10)
+            counters['SAI_PORT_STAT_IF_IN_OCTETS'] = str(int(counters['SAI_PORT_STAT_IF_IN_OCTETS']) + 1000)
+            port_table['oper_status'] = 'up' if port_table['oper_status'] == 'down' else 'down'
+
+        with mock.patch.object(portstat.time, 'sleep', side_effect=sleep), \
+                mock.patch.object(portstat, 'PORT_TABLES_REFRESH_INTERVAL', 0):
+            stat.watch(0, None, True, count=2)
+
+        ticks = [json.loads(line)['ports']['Ethernet0'] for line in capsys.readouterr().out.splitlines()]
+        assert [tick['STATE'] for tick in ticks] == ['D', 'U']
+        assert [tick['RX_OK'] for tick in ticks] == ['10', '10']
+        assert [tick['TX_ERR'] for tick in ticks] == ['0', '0']
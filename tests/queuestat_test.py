@@ -0,0 +1,101 @@
+import os
+from unittest import mock
+
+from utilities_common.bulk_fetch import BATCH_SIZE
+from utilities_common.general import load_module_from_source
+from .mock_tables.mock_redis import MockRedisClient
+
+test_path = os.path.dirname(os.path.abspath(__file__))
+modules_path = os.path.dirname(test_path)
+scripts_path = os.path.join(modules_path, "scripts")
+queuestat_path = os.path.join(scripts_path, 'queuestat')
+queuestat = load_module_from_source('queuestat', queuestat_path)
+
+PORT_NUM = 512
+QUEUE_NUM = 20
+
+
+class MockCountersDb(object):
+    COUNTERS_DB = 'COUNTERS_DB'
+
+    def __init__(self, data):
+        self.client = MockRedisClient(data)
+
+    def connect(self, db_name):
+        pass
+
+    def get_all(self, db_name, key, blocking=False):
+        return self.client.hgetall(key)
+
+    def get_redis_client(self, db_name):
+        return self.client
+
+
+def generate_counters_db(port_num=PORT_NUM, queue_num=QUEUE_NUM):
+    data = {
+        'COUNTERS_PORT_NAME_MAP': {},
+        'COUNTERS_QUEUE_NAME_MAP': {},
+        'COUNTERS_QUEUE_PORT_MAP': {},
+        'COUNTERS_QUEUE_INDEX_MAP': {},
+        'COUNTERS_QUEUE_TYPE_MAP': {},
+    }
+    for p in range(port_num):
+        port = 'Ethernet{}'.format(p * 4)
+        port_oid = 'oid:0x1000000000{:04x}'.format(p)
+        data['COUNTERS_PORT_NAME_MAP'][port] = port_oid
+        for q in range(queue_num):
+            queue_oid = 'oid:0x15{:04x}{:04x}'.format(p, q)
+            data['COUNTERS_QUEUE_NAME_MAP']['{}:{}'.format(port, q)] = queue_oid
+            data['COUNTERS_QUEUE_PORT_MAP'][queue_oid] = port_oid
+            data['COUNTERS_QUEUE_INDEX_MAP'][queue_oid] = str(q)
+            data['COUNTERS_QUEUE_TYPE_MAP'][queue_oid] = \
+                'SAI_QUEUE_TYPE_UNICAST' if q < queue_num // 2 else 'SAI_QUEUE_TYPE_MULTICAST'
+            if q == queue_num - 1:
+                # No counters polled for this queue
+                continue
+            data['COUNTERS:' + queue_oid] = {
+                'SAI_QUEUE_STAT_PACKETS': str(p + q),
+                'SAI_QUEUE_STAT_BYTES': str((p + q) * 64),
+                'SAI_QUEUE_STAT_DROPPED_PACKETS': '0',
+                'SAI_QUEUE_STAT_DROPPED_BYTES': '0'
+            }
+    return data
+
+
+class TestQueuestat(object):
+    def create_queuestat(self, data):
+        db = MockCountersDb(data)
+        with mock.patch.object(queuestat, 'SonicV2Connector', return_value=db):
+            return queuestat.Queuestat(), db
+
+    def test_port_cnstat(self):
+        stat, db = self.create_queuestat(generate_counters_db(4))
+
+        cnstat = stat.get_cnstat(stat.port_queues_map['Ethernet8'])
+        assert list(cnstat.keys())[1:] == ['Ethernet8:{}'.format(q) for q in range(QUEUE_NUM)]
+        assert cnstat['Ethernet8:3'] == queuestat.QueueStats('3', 'UC', '5', '320', '0', '0')
+        assert cnstat['Ethernet8:12'] == queuestat.QueueStats('12', 'MC', '14', '896', '0', '0')
+        assert cnstat['Ethernet8:19'] == queuestat.QueueStats('19', 'MC', 'N/A', 'N/A', 'N/A', 'N/A')
+
+    def test_missing_queue_type(self):
+        data = generate_counters_db(1)
+        data['COUNTERS_QUEUE_TYPE_MAP'].pop('oid:0x1500000001')
+        stat, _ = self.create_queuestat(data)
+        try:
+            stat.get_cnstat(stat.port_queues_map['Ethernet0'])
+            assert False, "Missing queue type should exit"
+        except SystemExit as e:
+            assert e.code == 1
+
+    def test_scale(self):
+        data = generate_counters_db()
+        stat, db = self.create_queuestat(data)
+        pipelines = db.client.pipelines
+        ports_cnstat = stat.get_ports_cnstat(sorted(stat.counter_port_name_map))
+
+        # The counters of all the queues of all the ports in batches of BATCH_SIZE keys
+        assert db.client.pipelines - pipelines == -(-PORT_NUM * QUEUE_NUM // BATCH_SIZE)
+        assert len(ports_cnstat) == PORT_NUM
+        assert ports_cnstat['Ethernet2044']['Ethernet2044:0'] == \
+            queuestat.QueueStats('0', 'UC', '511', '32704', '0', '0')
+        assert all(len(cnstat) == QUEUE_NUM + 1 for cnstat in ports_cnstat.values())
@@ -2,22 +2,49 @@ import copy
 import json
 import os
 import logging
+import random
 import sys
 import syslog
 import time
 from sonic_py_common import device_info
 from unittest.mock import MagicMock, patch
 from tests.route_check_test_data import APPL_DB, ARGS, ASIC_DB, CONFIG_DB, DEFAULT_CONFIG_DB, DESCR, OP_DEL, OP_SET, PRE, RESULT, RET, TEST_DATA, UPD
+from tests.mock_tables.mock_redis import MockRedisClient
+from utilities_common.bulk_fetch import BATCH_SIZE
 
 import pytest
 
 logger = logging.getLogger(__name__)
 
+ROUTE_BENCHMARK_NUM = 20000
+DIFF_ROUTE_NUM = 20000
+
 sys.path.append("scripts")
 import route_check
 
 current_test_data = None
 
+
+def diff_sorted_lists(t1, t2):
+    """
+    Reference diff of sorted route strings, as route_check used to do
+    """
+    t1_x = t2_x = 0
+    t1_miss = []
+    t2_miss = []
+    while t1_x < len(t1) and t2_x < len(t2):
+        if t1[t1_x] == t2[t2_x]:
+            t1_x += 1
+            t2_x += 1
+        elif t1[t1_x] < t2[t2_x]:
+            t1_miss.append(t1[t1_x])
+            t1_x += 1
+        else:
+            t2_miss.append(t2[t2_x])
+            t2_x += 1
+    return t1_miss + t1[t1_x:], t2_miss + t2[t2_x:]
+
+
 tables_returned = {}
 selector_returned = None
 subscribers_returned = {}
@@ -89,6 +116,28 @@ class Table:
         return True, ret
 
 
+class MockApplDbClient:
+    """
+    Redis client of APPL-DB, reading the mocked tables
+    """
+    def hgetall(self, key):
+        tbl, k = key.split(':', 1)
+        return table_side_effect(APPL_DB, tbl).get(k)[1]
+
+
+class MockSonicV2Connector:
+    APPL_DB = 'APPL_DB'
+
+    def __init__(self, client=None):
+        self.client = client or MockApplDbClient()
+
+    def connect(self, db_name):
+        pass
+
+    def get_redis_client(self, db_name):
+        return self.client
+
+
 db_conns = {"APPL_DB": APPL_DB, "ASIC_DB": ASIC_DB}
 def conn_side_effect(arg, _):
     return db_conns[arg]
@@ -258,6 +307,7 @@ class TestRouteCheck(object):
              patch("route_check.swsscommon.Table") as mock_table, \
              patch("route_check.swsscommon.Select") as mock_sel, \
              patch("route_check.swsscommon.SubscriberStateTable") as mock_subs, \
+             patch("route_check.swsscommon.SonicV2Connector", MockSonicV2Connector), \
              patch("route_check.swsscommon.ConfigDBConnector", return_value=mock_config_db):
             device_info.get_platform = MagicMock(return_value='unittest')
             set_mock(mock_table, mock_conn, mock_sel, mock_subs, mock_config_db)
@@ -283,6 +333,108 @@ class TestRouteCheck(object):
             assert ret == expect_ret
             assert res == expect_res
 
+    @pytest.mark.parametrize("test_num", TEST_DATA.keys())
+    def test_route_check_daemon(self, mock_dbs, test_num):
+        self.init()
+
+        ct_data = TEST_DATA[test_num]
+        set_test_case_data(ct_data)
+        logger.info("Running daemon test case {}: {}".format(test_num, ct_data[DESCR]))
+
+        # Same results expected, once the updates are past the grace period
+        with patch('sys.argv', ct_data[ARGS].split() + ['-d', '-g', '0']):
+            ret, res = route_check.main()
+            expect_ret = ct_data[RET] if RET in ct_data else 0
+            expect_res = ct_data[RESULT] if RESULT in ct_data else None
+            assert ret == expect_ret
+            assert res == expect_res
+
+    def test_daemon_grace_period(self, mock_dbs):
+        self.init()
+        set_test_case_data(TEST_DATA['2'])
+
+        # Mismatches not older than the grace period are not reported yet
+        with patch('sys.argv', ['route_check', '-d', '-g', '60']):
+            ret, res = route_check.main()
+            assert ret == 0
+            assert res is None
+
+    def test_prefix_encoding(self):
+        for ip in ["10.10.196.12/31", "0.0.0.0/0", "2603:10b0:503:df4::5d/128", "::/0"]:
+            assert route_check.decode_prefix(route_check.encode_prefix(ip)) == ip
+        assert route_check.encode_prefix("10.10.197.1") == route_check.encode_prefix("10.10.197.1/32")
+        assert route_check.encode_prefix("::a/128") != route_check.encode_prefix("0.0.0.10/128")
+
+    def test_route_set(self):
+        routes = route_check.RouteSet()
+        prefix = route_check.encode_prefix("10.0.0.0/24")
+        assert routes.add(prefix, None)
+        assert not routes.add(prefix, "Vrf1")
+        assert not routes.remove(prefix, None)
+        assert prefix in routes
+        assert routes.remove(prefix, "Vrf1")
+        assert prefix not in routes
+
+    def test_filter_benchmark(self):
+        # Synthetic ROUTE_TABLE of routes, all missing from ASIC
+        data = {}
+        for i in range(ROUTE_BENCHMARK_NUM):
+            ip = "{}.{}.{}.0".format(10 + (i >> 16), (i >> 8) & 0xff, i & 0xff)
+            if i % 4 == 0:
+                data[ip + "/32"] = {"ifname": "Ethernet-IB0", "nexthop": "0.0.0.0"}
+            elif i % 4 == 1:
+                data[ip + "/24"] = {"ifname": "Loopback{}".format(i % 8), "nexthop": "0.0.0.0"}
+            else:
+                data[ip + "/24"] = {"ifname": "PortChannel0001", "nexthop": "10.0.0.1"}
+        keys = [route_check.encode_prefix(k) for k in data.keys()]
+        client = MockRedisClient({'ROUTE_TABLE:' + k: v for k, v in data.items()})
+
+        with patch("route_check.swsscommon.SonicV2Connector", return_value=MockSonicV2Connector(client)), \
+             patch("route_check.chassis.get_chassis_local_interfaces", return_value=[]):
+            entries = route_check.get_route_table_entries(route_check.get_appl_db_fetcher(), keys)
+            rt = route_check.filter_out_local_interfaces(keys, entries)
+            rt = route_check.filter_out_voq_neigh_routes(rt, entries)
+
+        # One round trip per batch of routes, none is read again without its prefix
+        assert client.round_trips == ROUTE_BENCHMARK_NUM // BATCH_SIZE
+        assert len(rt) == ROUTE_BENCHMARK_NUM // 2
+
+    def test_diff_equivalence(self):
+        # Set differences of encoded prefixes against the sorted string diff
+        random.seed(0)
+        rt_appl = set()
+        rt_asic = set()
+        for i in range(DIFF_ROUTE_NUM):
+            if i % 3:
+                rt = "{}.{}.{}.0/24".format(random.randint(1, 223), random.randint(0, 255), random.randint(0, 255))
+            else:
+                rt = "2603:10b0:{:x}:{:x}::/64".format(random.randint(0, 0xffff), random.randint(0, 0xffff))
+            if random.random() < 0.95:
+                rt_appl.add(rt)
+            if random.random() < 0.95:
+                rt_asic.add(rt)
+
+        appl_miss, asic_miss = diff_sorted_lists(sorted(rt_appl), sorted(rt_asic))
+
+        enc_appl = {route_check.encode_prefix(rt) for rt in rt_appl}
+        enc_asic = {route_check.encode_prefix(rt) for rt in rt_asic}
+        enc_appl_miss = enc_appl - enc_asic
+        enc_asic_miss = enc_asic - enc_appl
+
+        assert route_check.to_prefix_list(enc_appl_miss) == appl_miss
+        assert route_check.to_prefix_list(enc_asic_miss) == asic_miss
+
+    def test_prefix_helpers(self):
+        enc = route_check.encode_prefix
+        assert enc("2603:10B0:0503:0DF4:0:0:0:5d/128") == enc("2603:10b0:503:df4::5d")
+        assert route_check.is_local(enc("fe80::1/64"))
+        assert route_check.is_local(enc("169.254.0.1/32"))
+        assert not route_check.is_local(enc("fec0::1/64"))
+        assert not route_check.is_local(enc("10.0.0.1/32"))
+        assert route_check.is_default_route(enc("0.0.0.0/0"))
+        assert route_check.is_default_route(enc("::/0"))
+        assert not route_check.is_default_route(enc("0.0.0.0/8"))
+
     def test_timeout(self, mock_dbs, force_hang):
         # Test timeout
         ex_raised = False
@@ -359,5 +359,33 @@ TEST_DATA = {
                 }
             }
         }
+    },
+    "10": {
+        DESCR: "Good one with IPv6 textual variants & VNET routes",
+        ARGS: "route_check",
+        PRE: {
+            APPL_DB: {
+                ROUTE_TABLE: {
+                    "0.0.0.0/0" : { "ifname": "portchannel0" },
+                    "2603:10B0:503:DF4:0:0:0:0/64" : { "ifname": "portchannel0" },
+                    "Vrf1:fc00:0::1/128" : { "ifname": "portchannel0" }
+                },
+                INTF_TABLE: {
+                    "PortChannel1023:2603:10B0:0503:0df4::5d/126": {}
+                },
+                VNET_ROUTE_TABLE: {
+                    "Vnet1:fd00:1::/64": {}
+                }
+            },
+            ASIC_DB: {
+                RT_ENTRY_TABLE: {
+                    RT_ENTRY_KEY_PREFIX + "2603:10b0:503:df4::/64" + RT_ENTRY_KEY_SUFFIX: {},
+                    RT_ENTRY_KEY_PREFIX + "fc00::1/128" + RT_ENTRY_KEY_SUFFIX: {},
+                    RT_ENTRY_KEY_PREFIX + "2603:10b0:503:df4::5d/128" + RT_ENTRY_KEY_SUFFIX: {},
+                    RT_ENTRY_KEY_PREFIX + "fd00:1::/64" + RT_ENTRY_KEY_SUFFIX: {},
+                    RT_ENTRY_KEY_PREFIX + "0.0.0.0/0" + RT_ENTRY_KEY_SUFFIX: {}
+                }
+            }
+        }
     }
 }
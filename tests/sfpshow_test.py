@@ -0,0 +1,102 @@
+import fnmatch
+import os
+from unittest import mock
+
+from click.testing import CliRunner
+
+from utilities_common.general import load_module_from_source
+from utilities_common.sfp_helper import QSFP_DATA_MAP
+from .mock_tables.mock_redis import MockRedisClient
+
+test_path = os.path.dirname(os.path.abspath(__file__))
+modules_path = os.path.dirname(test_path)
+scripts_path = os.path.join(modules_path, "scripts")
+sfpshow_path = os.path.join(scripts_path, 'sfpshow')
+sfpshow = load_module_from_source('sfpshow', sfpshow_path)
+
+PORT_NUM = 128
+ASIC_NUM = 4
+
+
+class MockStateDb(object):
+    APPL_DB = 'APPL_DB'
+    STATE_DB = 'STATE_DB'
+
+    def __init__(self, data):
+        self.data = data
+        self.client = MockRedisClient(data)
+
+    def keys(self, db_name, pattern):
+        return [key for key in self.data if fnmatch.fnmatchcase(key, pattern)]
+
+    def get_all(self, db_name, key, blocking=False):
+        return self.client.hgetall(key)
+
+    def get_redis_client(self, db_name):
+        return self.client
+
+
+def generate_db(port_num=PORT_NUM, first_port=0):
+    data = {}
+    for p in range(first_port, first_port + port_num):
+        port = 'Ethernet{}'.format(p * 4)
+        data['PORT_TABLE:' + port] = {'admin_status': 'up'}
+        if p % 8 == 7:
+            # Empty cage
+            continue
+        info = {key: 'N/A' for key in QSFP_DATA_MAP}
+        info.update({'type': 'QSFP28 or later', 'manufacturer': 'VENDOR{}'.format(p),
+                     'specification_compliance': "{'10/40G Ethernet Compliance Code': '40G CR4'}",
+                     'cable_type': 'Length Cable Assembly(m)', 'cable_length': '3'})
+        data['TRANSCEIVER_INFO|' + port] = info
+        data['TRANSCEIVER_DOM_SENSOR|' + port] = {'temperature': '{}.0'.format(p), 'voltage': '3.3'}
+        data['TRANSCEIVER_DOM_THRESHOLD|' + port] = {'temphighalarm': '75.0'}
+    data['PORT_TABLE:Ethernet-IB{}'.format(first_port)] = {'admin_status': 'up'}
+    return data
+
+
+def run_sfpshow(dbs, command, args):
+    namespaces = sorted(dbs)
+    with mock.patch.object(sfpshow.multi_asic_util.MultiAsic, 'get_ns_list_based_on_options',
+                           return_value=namespaces), \
+         mock.patch.object(sfpshow.multi_asic_util.MultiAsic, 'get_db_client', side_effect=dbs.get), \
+         mock.patch.object(sfpshow, 'is_rj45_port', return_value=False):
+        return CliRunner().invoke(sfpshow.cli.commands[command], args)
+
+
+class TestSfpshow(object):
+    def test_eeprom_dom(self):
+        db = MockStateDb(generate_db(8))
+        result = run_sfpshow({'': db}, 'eeprom', ['-d'])
+        assert result.exit_code == 0
+
+        ports = result.output.split('\n\n')
+        assert ports[0].startswith("Ethernet0: SFP EEPROM detected\n")
+        assert "        Vendor Name: VENDOR1\n" in ports[1]
+        assert "                Temperature: 1.0C\n" in ports[1]
+        assert "Ethernet28: SFP EEPROM Not detected" == ports[7]
+        assert 'Ethernet-IB0' not in result.output
+
+        result = run_sfpshow({'': db}, 'eeprom', ['-p', 'Ethernet4'])
+        assert result.output.startswith("Ethernet4: SFP EEPROM detected\n")
+        assert "Temperature" not in result.output
+
+    def test_presence(self):
+        db = MockStateDb(generate_db(8))
+        result = run_sfpshow({'': db}, 'presence', [])
+        assert result.exit_code == 0
+        assert "Ethernet24  Present\n" in result.output
+        assert "Ethernet28  Not present\n" in result.output
+
+    def test_multi_asic_scale(self):
+        ports_per_asic = PORT_NUM // ASIC_NUM
+        dbs = {'asic{}'.format(i): MockStateDb(generate_db(ports_per_asic, i * ports_per_asic))
+               for i in range(ASIC_NUM)}
+
+        result = run_sfpshow(dbs, 'eeprom', ['-d'])
+
+        assert result.exit_code == 0
+        # The transceiver tables of all the ports of an ASIC in one round trip
+        assert [db.client.round_trips for db in dbs.values()] == [1] * ASIC_NUM
+        lines = [line for line in result.output.split('\n') if line.startswith('Ethernet')]
+        assert [line.split(':')[0] for line in lines] == ['Ethernet{}'.format(p * 4) for p in range(PORT_NUM)]
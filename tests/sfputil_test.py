@@ -4,6 +4,7 @@ from unittest import mock
 from unittest.mock import MagicMock, patch
 
 from .mock_tables import dbconnector
+from .mock_tables.mock_concurrency import SlowCall
 
 import pytest
 from click.testing import CliRunner
@@ -20,6 +21,102 @@ EXIT_FAIL = -1
 ERROR_NOT_IMPLEMENTED = 5
 ERROR_INVALID_PORT = 6
 
+class MockEepromSfp(object):
+    """ Transceiver counting its EEPROM reads and the threads reading it at once """
+
+    READ_TIME = 0.05
+
+    def __init__(self, index, reads):
+        self.index = index
+        self.reads = reads
+
+    def _read(self, name):
+        self.reads(self.index, name)
+
+    def get_presence(self):
+        return self.index % 4 != 3
+
+    def get_model(self):
+        return 'QDD-400G'
+
+    def get_serial(self):
+        return 'SN{:04d}'.format(self.index)
+
+    def get_transceiver_info(self):
+        self._read('info')
+        return {'type': 'QSFP-DD Double Density 8X Pluggable Transceiver', 'serial': self.get_serial(),
+                'active_firmware': '1.0', 'active_apsel_hostlane1': 1}
+
+    def get_transceiver_bulk_status(self):
+        self._read('dom')
+        return {'temperature': '{}C'.format(self.index)}
+
+    def get_transceiver_threshold_info(self):
+        return {}
+
+    def get_xcvr_api(self):
+        return MagicMock(get_model=MagicMock(return_value=self.get_model()),
+                         get_serial=MagicMock(return_value=self.get_serial()),
+                         get_module_active_firmware=MagicMock(return_value='2.0'),
+                         get_active_apsel_hostlane=MagicMock(return_value={'ActiveAppSelLane1': 3}))
+
+
+def create_mock_eeprom_chassis(port_num):
+    reads = SlowCall(MockEepromSfp.READ_TIME)
+    sfps = [MockEepromSfp(i, reads) for i in range(port_num)]
+    return MagicMock(get_sfp=MagicMock(side_effect=lambda index: sfps[index])), reads
+
+
+def mock_info_to_output_string(sfp_info_dict):
+    return "        Vendor SN: {} FW {} AppSel {}\n".format(
+        sfp_info_dict['serial'], sfp_info_dict['active_firmware'], sfp_info_dict['active_apsel_hostlane1'])
+
+
+def mock_dom_to_output_string(sfp_type, dom_info_dict):
+    return "        Temperature: {}\n".format(dom_info_dict['temperature'])
+
+
+class MockFirmwareApi(object):
+    """ CDB firmware download of a transceiver, rebuilding the image from the blocks written """
+
+    WRITE_TIME = 0.01
+
+    def __init__(self, writes, fail=False):
+        self.writes = writes
+        self.fail = fail
+        self.image = b''
+
+    def get_module_fw_mgmt_feature(self):
+        return {'status': True, 'feature': (16, 64, False, True, 32)}
+
+    def cdb_start_firmware_download(self, startLPLsize, startdata, file_size):
+        self.image = startdata
+        return 1
+
+    def cdb_epl_block_write(self, address, data, autopaging_flag, writelength):
+        self.writes(address)
+        assert address == len(self.image) - 16
+        self.image += data
+        return 0 if self.fail else 1
+
+    def cdb_firmware_download_complete(self):
+        return 1
+
+    def cdb_run_firmware(self, mode):
+        return 1
+
+    def cdb_commit_firmware(self):
+        return 1
+
+
+def create_mock_firmware_chassis(port_num, fail_ports=()):
+    writes = SlowCall(MockFirmwareApi.WRITE_TIME)
+    apis = [MockFirmwareApi(writes, i in fail_ports) for i in range(port_num)]
+    sfps = [MagicMock(get_presence=MagicMock(return_value=True), get_xcvr_api=MagicMock(return_value=api))
+            for api in apis]
+    return MagicMock(get_sfp=MagicMock(side_effect=lambda index: sfps[index])), apis, writes
+
+
 class TestSfputil(object):
     def test_format_dict_value_to_string(self):
         sorted_key_table = [
@@ -751,3 +848,158 @@ Ethernet0  N/A
         result = runner.invoke(sfputil.cli.commands['firmware'].commands['download'], ["Ethernet0", "a.b"])
         assert result.output == 'This functionality is not applicable for RJ45 port Ethernet0.\n'
         assert result.exit_code == EXIT_FAIL
+
+    @patch('sfputil.main.is_port_type_rj45', MagicMock(return_value=False))
+    @patch('sfputil.main.convert_sfp_info_to_output_string', MagicMock(side_effect=mock_info_to_output_string))
+    @patch('sfputil.main.convert_dom_to_output_string', MagicMock(side_effect=mock_dom_to_output_string))
+    def test_eeprom_collector(self, tmp_path):
+        port_num = 32
+        chassis, reads = create_mock_eeprom_chassis(port_num)
+        ports = [('Ethernet{}'.format(i * 8), i) for i in range(port_num)]
+        cache_path = str(tmp_path / 'xcvr_info.json')
+
+        with patch('sfputil.main.platform_chassis', chassis):
+            collector = sfputil.EepromCollector(True, sfputil.XcvrInfoCache(cache_path), max_workers=4)
+            outputs = collector.collect(ports)
+
+        # Ports were read concurrently, within the pool size
+        assert 1 < reads.max_active <= 4
+        assert outputs[0] == ("Ethernet0: SFP EEPROM detected\n"
+                              "        Vendor SN: SN0000 FW 1.0 AppSel 1\n"
+                              "        Temperature: 0C\n\n")
+        assert outputs[3] == "Ethernet24: SFP EEPROM not detected\n\n"
+        assert sum(1 for _, name in reads.calls if name == 'info') == port_num * 3 // 4
+
+        # The static info is cached, only DOM is read again
+        reads.calls = []
+        with patch('sfputil.main.platform_chassis', chassis):
+            collector = sfputil.EepromCollector(True, sfputil.XcvrInfoCache(cache_path))
+            outputs = collector.collect(ports)
+        assert all(name == 'dom' for _, name in reads.calls)
+        assert len(reads.calls) == port_num * 3 // 4
+        # but the firmware versions and active applications
+        assert outputs[0] == ("Ethernet0: SFP EEPROM detected\n"
+                              "        Vendor SN: SN0000 FW 2.0 AppSel 3\n"
+                              "        Temperature: 0C\n\n")
+
+    @patch('sfputil.main.is_port_type_rj45', MagicMock(return_value=False))
+    @patch('sfputil.main.convert_sfp_info_to_output_string', MagicMock(side_effect=mock_info_to_output_string))
+    @patch('sfputil.main.convert_dom_to_output_string', MagicMock(side_effect=mock_dom_to_output_string))
+    def test_eeprom_collector_serial(self):
+        port_num = 8
+        chassis, reads = create_mock_eeprom_chassis(port_num)
+        ports = [('Ethernet{}'.format(i * 8), i) for i in range(port_num)]
+
+        with patch('sfputil.main.platform_chassis', chassis):
+            outputs = sfputil.EepromCollector(True).collect(ports)
+
+        # Serial by default, without any cache
+        assert reads.max_active == 1
+        assert [index for index, name in reads.calls if name == 'info'] == [0, 1, 2, 4, 5, 6]
+        assert outputs[7] == "Ethernet56: SFP EEPROM not detected\n\n"
+
+    @patch('sfputil.main.EepromCollector')
+    @patch('sfputil.main.XcvrInfoCache')
+    @patch('sfputil.main.logical_port_name_to_physical_port_list', MagicMock(return_value=[1]))
+    @patch('sfputil.main.platform_sfputil', MagicMock(is_logical_port=MagicMock(return_value=1)))
+    def test_show_eeprom_options(self, mock_cache, mock_collector):
+        mock_collector.return_value.collect.return_value = ["Ethernet16: SFP EEPROM not detected\n\n"]
+        runner = CliRunner()
+        result = runner.invoke(sfputil.cli.commands['show'].commands['eeprom'], ["-p", "Ethernet16"])
+        assert result.exit_code == 0
+        mock_collector.assert_called_with(False, mock_cache.return_value, sfputil.EEPROM_READ_WORKERS)
+
+        result = runner.invoke(sfputil.cli.commands['show'].commands['eeprom'],
+                               ["-p", "Ethernet16", "--no-cache", "--max-workers", "4"])
+        assert result.exit_code == 0
+        mock_collector.assert_called_with(False, None, 4)
+        assert mock_cache.call_count == 1
+
+    @patch('sfputil.main.platform_chassis')
+    @patch('sfputil.main.logical_port_name_to_physical_port_list', MagicMock(return_value=[1]))
+    @patch('sfputil.main.platform_sfputil', MagicMock(is_logical_port=MagicMock(return_value=1)))
+    @patch('sfputil.main.is_port_type_rj45', MagicMock(return_value=False))
+    @patch('sfputil.main.XcvrInfoCache', MagicMock(return_value=None))
+    def test_show_eeprom_not_implemented(self, mock_chassis):
+        mock_sfp = MagicMock()
+        mock_sfp.get_presence.return_value = True
+        mock_sfp.get_transceiver_info.side_effect = NotImplementedError
+        mock_chassis.get_sfp = MagicMock(return_value=mock_sfp)
+        runner = CliRunner()
+        result = runner.invoke(sfputil.cli.commands['show'].commands['eeprom'], ["-p", "Ethernet16"])
+        assert result.output == "Sfp.get_transceiver_info() is currently not implemented for this platform\n"
+        assert result.exit_code == ERROR_NOT_IMPLEMENTED
+
+    @patch('sfputil.main.is_port_type_rj45', MagicMock(return_value=False))
+    def test_firmware_batch(self, tmp_path):
+        port_num = 8
+        firmware = bytes(range(256)) * 4 + b'end'
+        image_path = tmp_path / 'firmware.bin'
+        image_path.write_bytes(firmware)
+        state = sfputil.FirmwareBatchState(str(tmp_path / 'firmware_batch.json'))
+        # Ethernet0 and Ethernet2 are the breakout ports of the same transceiver
+        ports = [('Ethernet0', 0), ('Ethernet2', 0)] + [('Ethernet{}'.format(i * 8), i) for i in range(1, port_num)]
+        chassis, apis, writes = create_mock_firmware_chassis(port_num, fail_ports=(3,))
+
+        with patch('sfputil.main.platform_chassis', chassis), sfputil.FirmwareImage(str(image_path)) as image:
+            results = sfputil.FirmwareBatch(image, True, state, max_workers=4).run(ports, echo=lambda msg: None)
+
+        # Transceivers were upgraded concurrently, within the pool size
+        assert 1 < writes.max_active <= 4
+        assert all(api.image == firmware for i, api in enumerate(apis) if i != 3)
+        assert results[0] == ('Ethernet0', True, 'Firmware upgrade successful')
+        assert results[1] == ('Ethernet2', True, 'Firmware upgrade successful (same transceiver as Ethernet0)')
+        assert results[4] == ('Ethernet24', False, 'CDB: firmware download failed! - status 0')
+        assert [port_name for port_name, success, _ in results if not success] == ['Ethernet24']
+
+        # Resuming downloads again to the failed port only, even with the
+        # ports given in another order
+        chassis, apis, writes = create_mock_firmware_chassis(port_num)
+        state = sfputil.FirmwareBatchState(str(tmp_path / 'firmware_batch.json'))
+        ports = list(reversed(ports))
+        with patch('sfputil.main.platform_chassis', chassis), sfputil.FirmwareImage(str(image_path)) as image:
+            results = sfputil.FirmwareBatch(image, True, state).run(ports, resume=True, echo=lambda msg: None)
+        assert writes.max_active == 1
+        assert [i for i, api in enumerate(apis) if api.image] == [3]
+        assert results[4] == ('Ethernet24', True, 'Firmware upgrade successful')
+        assert results[7] == ('Ethernet2', True, 'Skipped, already done')
+        assert results[8] == ('Ethernet0', True, 'Skipped, already done (same transceiver as Ethernet2)')
+
+        # The download only batch of the image is a different one
+        with patch('sfputil.main.platform_chassis', chassis), sfputil.FirmwareImage(str(image_path)) as image:
+            batch = sfputil.FirmwareBatch(image, False, state)
+            assert state.get_done_ports(batch.key) == set()
+
+    @patch('sfputil.main.platform_sfputil', MagicMock(is_logical_port=MagicMock(
+        side_effect=lambda port_name: int(port_name[len('Ethernet'):]) % 8 == 0)))
+    @patch('sfputil.main.logical_port_name_to_physical_port_list',
+           MagicMock(side_effect=lambda port_name: [int(port_name[len('Ethernet'):]) // 8]))
+    @patch('sfputil.main.is_port_type_rj45', MagicMock(return_value=False))
+    def test_firmware_batch_download(self, tmp_path):
+        image_path = tmp_path / 'firmware.bin'
+        image_path.write_bytes(bytes(range(256)))
+        chassis, apis, writes = create_mock_firmware_chassis(4, fail_ports=(2,))
+        runner = CliRunner()
+        with patch('sfputil.main.platform_chassis', chassis), \
+             patch('sfputil.main.FirmwareBatchState', MagicMock(return_value=None)):
+            result = runner.invoke(sfputil.cli.commands['firmware'].commands['batch-download'],
+                                   ["Ethernet0-16,Ethernet24", str(image_path)])
+        assert "Ethernet8: Firmware download complete success\n" in result.output
+        assert "Ethernet16  FAILED    CDB: firmware download failed! - status 0\n" in result.output
+        assert "Firmware download failed on 1 port(s), run again with --resume to retry them\n" in result.output
+        assert result.exit_code == EXIT_FAIL
+        assert all(api.image == bytes(range(256)) for i, api in enumerate(apis) if i != 2)
+        assert writes.max_active == 1
+
+        chassis, apis, writes = create_mock_firmware_chassis(4)
+        with patch('sfputil.main.platform_chassis', chassis), \
+             patch('sfputil.main.FirmwareBatchState', MagicMock(return_value=None)):
+            result = runner.invoke(sfputil.cli.commands['firmware'].commands['batch-download'],
+                                   ["Ethernet0-24", str(image_path), "--max-workers", "4"])
+        assert result.exit_code == 0
+        assert 1 < writes.max_active <= 4
+
+        result = runner.invoke(sfputil.cli.commands['firmware'].commands['batch-download'],
+                               ["Ethernet0", str(tmp_path / 'missing.bin')])
+        assert result.output == "Firmware file {} NOT found\n".format(tmp_path / 'missing.bin')
+        assert result.exit_code == EXIT_FAIL
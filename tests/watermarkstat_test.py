@@ -1,10 +1,14 @@
 import os
 import sys
 import pytest
+from unittest import mock
 
 import show.main as show
 from click.testing import CliRunner
 
+from utilities_common.bulk_fetch import BATCH_SIZE
+from utilities_common.general import load_module_from_source
+from .mock_tables.mock_redis import MockRedisClient
 from .wm_input.wm_test_vectors import *
 
 test_path = os.path.dirname(os.path.abspath(__file__))
@@ -13,6 +17,10 @@ scripts_path = os.path.join(modules_path, "scripts")
 sys.path.insert(0, test_path)
 sys.path.insert(0, modules_path)
 
+PORT_NUM = 512
+QUEUE_NUM = 20
+PG_NUM = 8
+
 
 @pytest.fixture(scope="function")
 def q_multicast_wm_neg():
@@ -97,3 +105,102 @@ class TestWatermarkstat(object):
         os.environ["PATH"] = os.pathsep.join(os.environ["PATH"].split(os.pathsep)[:-1])
         os.environ['UTILITIES_UNIT_TESTING'] = "0"
         print("TEARDOWN")
+
+
+class MockCountersDb(object):
+    COUNTERS_DB = 'COUNTERS_DB'
+    APPL_DB = 'APPL_DB'
+
+    def __init__(self, client):
+        self.client = client
+
+    def connect(self, db_name):
+        pass
+
+    def get_all(self, db_name, key, blocking=False):
+        return self.client.hgetall(key)
+
+    def get_redis_client(self, db_name):
+        return self.client
+
+
+def generate_counters_db(port_num=PORT_NUM):
+    data = {name: {} for name in ['COUNTERS_PORT_NAME_MAP', 'COUNTERS_QUEUE_NAME_MAP', 'COUNTERS_QUEUE_TYPE_MAP',
+                                  'COUNTERS_QUEUE_INDEX_MAP', 'COUNTERS_QUEUE_PORT_MAP', 'COUNTERS_PG_NAME_MAP',
+                                  'COUNTERS_PG_PORT_MAP', 'COUNTERS_PG_INDEX_MAP', 'COUNTERS_BUFFER_POOL_NAME_MAP']}
+    for p in range(port_num):
+        port = 'Ethernet{}'.format(p * 4)
+        port_oid = 'oid:0x1000000000{:04x}'.format(p)
+        data['COUNTERS_PORT_NAME_MAP'][port] = port_oid
+        for q in range(QUEUE_NUM):
+            oid = 'oid:0x15{:04x}{:04x}'.format(p, q)
+            data['COUNTERS_QUEUE_NAME_MAP']['{}:{}'.format(port, q)] = oid
+            data['COUNTERS_QUEUE_PORT_MAP'][oid] = port_oid
+            data['COUNTERS_QUEUE_INDEX_MAP'][oid] = str(q)
+            data['COUNTERS_QUEUE_TYPE_MAP'][oid] = \
+                'SAI_QUEUE_TYPE_UNICAST' if q < QUEUE_NUM // 2 else 'SAI_QUEUE_TYPE_MULTICAST'
+            if q != 3:
+                data['USER_WATERMARKS:' + oid] = {'SAI_QUEUE_STAT_SHARED_WATERMARK_BYTES': str(p * 100 + q)}
+        for g in range(PG_NUM):
+            oid = 'oid:0x1a{:04x}{:04x}'.format(p, g)
+            data['COUNTERS_PG_NAME_MAP']['{}:{}'.format(port, g)] = oid
+            data['COUNTERS_PG_PORT_MAP'][oid] = port_oid
+            data['COUNTERS_PG_INDEX_MAP'][oid] = str(g)
+            data['PERSISTENT_WATERMARKS:' + oid] = {
+                'SAI_INGRESS_PRIORITY_GROUP_STAT_SHARED_WATERMARK_BYTES': '' if g == PG_NUM - 1 else str(g)}
+    for i, pool in enumerate(['egress_lossy_pool', 'ingress_lossless_pool']):
+        oid = 'oid:0x18000000000{:03x}'.format(i)
+        data['COUNTERS_BUFFER_POOL_NAME_MAP'][pool] = oid
+        data['USER_WATERMARKS:' + oid] = {'SAI_BUFFER_POOL_STAT_XOFF_ROOM_WATERMARK_BYTES': str(i * 1000)}
+    return data
+
+
+class TestWatermarkstatBulk(object):
+    @classmethod
+    def setup_class(cls):
+        cls.watermarkstat = load_module_from_source('watermarkstat', os.path.join(scripts_path, 'watermarkstat'))
+
+    def create_watermarkstat(self, port_num=PORT_NUM):
+        client = MockRedisClient(generate_counters_db(port_num))
+        with mock.patch.object(self.watermarkstat, 'SonicV2Connector', side_effect=lambda **kwargs: MockCountersDb(client)):
+            return self.watermarkstat.Watermarkstat(), client
+
+    def test_counters_matrix(self):
+        wm, client = self.create_watermarkstat(4)
+        wm_type = wm.watermark_types['q_shared_multi']
+        wm.build_header(wm_type, 'q_shared_multi')
+
+        ports = ['Ethernet0', 'Ethernet12']
+        matrix = wm.get_counters_matrix('USER_WATERMARKS:', ports, wm_type['obj_map'],
+                                        wm_type['idx_func'], wm_type['wm_name'])
+        assert wm.header_list == ['Port'] + ['MC{}'.format(q) for q in range(QUEUE_NUM // 2, QUEUE_NUM)]
+        assert matrix == [[q for q in range(QUEUE_NUM // 2, QUEUE_NUM)],
+                          [300 + q for q in range(QUEUE_NUM // 2, QUEUE_NUM)]]
+
+        wm_type = wm.watermark_types['q_shared_uni']
+        wm.build_header(wm_type, 'q_shared_uni')
+        matrix = wm.get_counters_matrix('USER_WATERMARKS:', ports, wm_type['obj_map'],
+                                        wm_type['idx_func'], wm_type['wm_name'])
+        assert matrix[1][:5] == [300, 301, 302, None, 304]
+
+    def test_print_all_stat(self, capsys):
+        wm, client = self.create_watermarkstat(2)
+        capsys.readouterr()
+
+        wm.print_all_stat('PERSISTENT_WATERMARKS:', 'pg_shared')
+        wm.print_all_stat('USER_WATERMARKS:', 'headroom_pool')
+        output = capsys.readouterr().out.splitlines()
+        assert output[0] == "Ingress shared pool occupancy per PG:"
+        assert output[3].split() == ['Ethernet0', '0', '1', '2', '3', '4', '5', '6', 'N/A']
+        assert output[-1].split() == ['ingress_lossless_pool', '1000']
+        assert 'egress_lossy_pool' not in ''.join(output)
+
+    def test_scale(self, capsys):
+        wm, client = self.create_watermarkstat()
+        pipelines = client.pipelines
+        wm.print_all_stat('USER_WATERMARKS:', 'q_shared_uni')
+        output = capsys.readouterr().out.splitlines()
+
+        # The watermarks of the unicast queues of all the ports in batches of BATCH_SIZE keys
+        assert client.pipelines - pipelines == -(-PORT_NUM * QUEUE_NUM // 2 // BATCH_SIZE)
+        assert sum(1 for line in output if line.lstrip().startswith('Ethernet')) == PORT_NUM
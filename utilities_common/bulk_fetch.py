@@ -0,0 +1,141 @@
+# Bulk fetch helpers for redis hashes #
+
+import json
+from collections import OrderedDict
+
+try:
+    from swsscommon.swsscommon import DBConnector, loadRedisScript, runRedisScript
+except ImportError:
+    # swsscommon without the redis script API, the keys are read one by one
+    DBConnector = loadRedisScript = runRedisScript = None
+
+COUNTER_TABLE_PREFIX = "COUNTERS:"
+RATES_TABLE_PREFIX = "RATES:"
+
+SCAN_COUNT = 1000
+# Number of keys read per round trip, redis is blocked while a batch is read
+BATCH_SIZE = 1000
+
+# Reads the hashes at KEYS, or their ARGV[2] field if ARGV[1] is HGET.
+# The redis scripts of swsscommon can only return a list of strings, so the
+# values are returned JSON encoded in a single string. A missing field is false.
+READ_SCRIPT = """
+local values = {}
+for i, key in ipairs(KEYS) do
+    if ARGV[1] == 'HGET' then
+        values[i] = redis.call('HGET', key, ARGV[2])
+    else
+        local fields = redis.call('HGETALL', key)
+        local entry = {}
+        for j = 1, #fields, 2 do
+            entry[fields[j]] = fields[j + 1]
+        end
+        values[i] = entry
+    end
+end
+return {cjson.encode(values)}
+"""
+
+
+class BulkFetcher(object):
+    """
+    Fetch many redis hashes of a SonicV2Connector over its redis client.
+
+    The requested keys are read in batches of BATCH_SIZE, one round trip per
+    batch:
+    - with a redis-py style pipeline() if the client has one,
+    - else with one READ_SCRIPT call per batch on a swsscommon DBConnector.
+    Other clients are read key by key, so callers never have to care which
+    client they were handed.
+    """
+
+    def __init__(self, db, batch_size=BATCH_SIZE):
+        self.db = db
+        self.batch_size = batch_size
+        # SHA of READ_SCRIPT by DB name, loaded once per fetcher
+        self.script_shas = {}
+
+    def _read(self, db_name, keys, command, *args):
+        client = self.db.get_redis_client(db_name)
+        pipeline = getattr(client, 'pipeline', None)
+        scripted = runRedisScript is not None and isinstance(client, DBConnector)
+
+        results = []
+        for start in range(0, len(keys), self.batch_size):
+            batch = keys[start:start + self.batch_size]
+            if callable(pipeline):
+                pipe = pipeline(transaction=False)
+                for key in batch:
+                    getattr(pipe, command)(key, *args)
+                results.extend(pipe.execute())
+            elif scripted:
+                results.extend(self._run_script(db_name, client, batch, command, *args))
+            else:
+                results.extend(getattr(client, command)(key, *args) for key in batch)
+        return results
+
+    def _run_script(self, db_name, client, keys, command, *args):
+        if db_name not in self.script_shas:
+            self.script_shas[db_name] = loadRedisScript(client, READ_SCRIPT)
+        reply = runRedisScript(client, self.script_shas[db_name], keys, [command.upper()] + list(args))
+        return [None if value is False else value for value in json.loads(next(iter(reply)))]
+
+    def get_all(self, db_name, keys):
+        """
+        Return the list of hashes stored at keys, in the same order.
+        Missing keys are returned as empty dicts.
+        """
+        keys = list(keys)
+        if not keys:
+            return []
+
+        results = self._read(db_name, keys, 'hgetall')
+        return [dict(result) if result else {} for result in results]
+
+    def get_all_map(self, db_name, keys):
+        """
+        Same as get_all() but return an OrderedDict indexed by key.
+        """
+        keys = list(keys)
+        return OrderedDict(zip(keys, self.get_all(db_name, keys)))
+
+    def get(self, db_name, keys, field):
+        """
+        Return the value of field for every key, None if it does not exist.
+        """
+        keys = list(keys)
+        if not keys:
+            return []
+
+        return self._read(db_name, keys, 'hget', field)
+
+    def scan(self, db_name, pattern, count=SCAN_COUNT):
+        """
+        Generate the keys matching pattern, one batch per SCAN call.
+        Unlike KEYS, redis is never blocked for the whole key space.
+        A key may be returned more than once if the DB is rehashed meanwhile.
+        """
+        client = self.db.get_redis_client(db_name)
+        cursor = 0
+        while True:
+            cursor, keys = client.scan(cursor, pattern, count)
+            if keys:
+                yield keys
+            if int(cursor) == 0:
+                break
+
+
+def get_counters_and_rates(fetcher, oids, with_rates=True):
+    """
+    Fetch the COUNTERS and RATES hashes of all the oids together.
+    Returns two dicts indexed by oid.
+    """
+    oids = list(oids)
+    keys = [COUNTER_TABLE_PREFIX + oid for oid in oids]
+    if with_rates:
+        keys += [RATES_TABLE_PREFIX + oid for oid in oids]
+
+    values = fetcher.get_all(fetcher.db.COUNTERS_DB, keys)
+    counters = dict(zip(oids, values[:len(oids)]))
+    rates = dict(zip(oids, values[len(oids):])) if with_rates else {}
+    return counters, rates
@@ -0,0 +1,84 @@
+# Transactional writes of CONFIG_DB change sets #
+
+import json
+
+try:
+    from swsscommon.swsscommon import loadRedisScript, runRedisScript
+except ImportError:
+    # swsscommon without the redis script API, the entries are written one by one
+    loadRedisScript = runRedisScript = None
+
+# Writes the hashes at KEYS. ARGV[1] is the JSON encoded list of the
+# [fields to delete, fields to set] of every hash, the hash is deleted if
+# the fields to set are null. A redis script runs atomically, as a
+# MULTI/EXEC transaction would.
+WRITE_SCRIPT = """
+local entries = cjson.decode(ARGV[1])
+for i, key in ipairs(KEYS) do
+    local dropped, fields = entries[i][1], entries[i][2]
+    if fields == cjson.null then
+        redis.call('DEL', key)
+    else
+        if #dropped > 0 then
+            redis.call('HDEL', key, unpack(dropped))
+        end
+        local args = {}
+        for field, value in pairs(fields) do
+            args[#args + 1] = field
+            args[#args + 1] = value
+        end
+        redis.call('HMSET', key, unpack(args))
+    end
+end
+return {}
+"""
+
+
+def mod_config(config_db, data, dropped_fields=None):
+    """
+    Write a change set as ConfigDBPipeConnector.mod_config() does, in one
+    transaction: the fields of an entry are set, or the entry is deleted
+    if None. dropped_fields gives by table and key the fields removed from
+    the entries by the same transaction.
+
+    Without dropped fields this is config_db.mod_config(). Else the
+    transaction is a redis-py style pipeline if the client of config_db
+    has one, or a WRITE_SCRIPT call on a swsscommon DBConnector. Other
+    clients are written entry by entry.
+    """
+    dropped_fields = dropped_fields or {}
+    if not any(fields for table_fields in dropped_fields.values() for fields in table_fields.values()):
+        if any(data.values()):
+            config_db.mod_config(data)
+        return
+
+    client = config_db.get_redis_client(config_db.db_name)
+
+    keys = []
+    entries = []
+    for table, table_data in data.items():
+        for key, entry in table_data.items():
+            keys.append(table.upper() + config_db.TABLE_NAME_SEPARATOR + config_db.serialize_key(key))
+            raw = None if entry is None else config_db.typed_to_raw(entry)
+            entries.append((sorted(dropped_fields.get(table, {}).get(key, ())), raw))
+
+    pipeline = getattr(client, 'pipeline', None)
+    if callable(pipeline):
+        pipe = pipeline(transaction=True)
+        for key, (dropped, raw) in zip(keys, entries):
+            if raw is None:
+                pipe.delete(key)
+                continue
+            if dropped:
+                pipe.hdel(key, *dropped)
+            pipe.hmset(key, raw)
+        pipe.execute()
+    elif runRedisScript is not None:
+        runRedisScript(client, loadRedisScript(client, WRITE_SCRIPT), keys, [json.dumps(entries)])
+    else:
+        for table, table_data in data.items():
+            for key, entry in table_data.items():
+                if entry is not None and dropped_fields.get(table, {}).get(key):
+                    config_db.set_entry(table, key, entry)
+                else:
+                    config_db.mod_entry(table, key, entry)
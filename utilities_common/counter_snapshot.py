@@ -0,0 +1,268 @@
+# Persistent counter snapshots used by the *stat utilities #
+#
+# A snapshot file has the following layout:
+#
+#   magic        8 bytes, SNAPSHOT_MAGIC
+#   header size  uint32, little endian
+#   header       JSON: time, record kind, field names and types,
+#                object names (the row index) and the non-numeric cells
+#   padding      up to the next 8 bytes boundary
+#   rows         one fixed-width row of uint64 (little endian) per object,
+#                holding the numeric fields in header order
+#
+# The rows are read through mmap, so looking up a few objects of a large
+# snapshot only touches the pages holding those rows.
+
+import _pickle as pickle
+import datetime
+import json
+import mmap
+import os
+import struct
+from collections import OrderedDict
+
+SNAPSHOT_MAGIC = b'SNCNTR01'
+STATUS_NA = 'N/A'
+
+NA_VALUE = 2 ** 64 - 1
+ABSENT_VALUE = 2 ** 64 - 2
+MAX_VALUE = 2 ** 64 - 3
+
+# Field types
+FIELD_INT = 'i'     # python int
+FIELD_STR = 's'     # decimal string or N/A
+FIELD_TEXT = 't'    # anything else, kept in the header
+
+# Record kinds
+RECORD_TUPLE = 'tuple'
+RECORD_LIST = 'list'
+RECORD_DICT = 'dict'
+
+TIME_KEY = 'time'
+
+_ABSENT = object()
+
+_HEADER_SIZE = struct.Struct('<I')
+
+
+def _field_type(values):
+    """
+    Find the narrowest type able to hold all the values of a field
+    """
+    if all(type(v) is int and 0 <= v <= MAX_VALUE for v in values):
+        return FIELD_INT
+    if all(isinstance(v, str) and (v == STATUS_NA or (v.isdigit() and str(int(v)) == v and int(v) <= MAX_VALUE))
+           for v in values):
+        return FIELD_STR
+    return FIELD_TEXT
+
+
+def _encode(value):
+    if value == STATUS_NA:
+        return NA_VALUE
+    return int(value)
+
+
+def _decode(value, field_type):
+    if value == NA_VALUE:
+        return STATUS_NA
+    if field_type == FIELD_STR:
+        return str(value)
+    return value
+
+
+def _json_name(name):
+    return list(name) if isinstance(name, tuple) else name
+
+
+def _py_name(name):
+    return tuple(name) if isinstance(name, list) else name
+
+
+def dump(stats, path):
+    """
+    Save stats to path.
+
+    stats maps object names (strings or tuples of strings) to records,
+    plus an optional 'time' entry. All the records must be of the same
+    kind: namedtuples/tuples, lists or dicts of counter name to value.
+    """
+    names = []
+    records = []
+    time = None
+    for name, record in stats.items():
+        if name == TIME_KEY:
+            time = record
+            continue
+        names.append(name)
+        records.append(record)
+
+    if records and isinstance(records[0], dict):
+        kind = RECORD_DICT
+        fields = list(OrderedDict.fromkeys(field for record in records for field in record))
+        columns = [[record[field] for record in records if field in record] for field in fields]
+    else:
+        kind = RECORD_LIST if records and isinstance(records[0], list) else RECORD_TUPLE
+        fields = list(getattr(records[0], '_fields', range(len(records[0])))) if records else []
+        fields = [str(field) for field in fields]
+        columns = [[record[pos] for record in records] for pos in range(len(fields))]
+
+    types = [_field_type(column) for column in columns]
+    numeric = [pos for pos, field_type in enumerate(types) if field_type != FIELD_TEXT]
+    text = {}
+    for pos, field_type in enumerate(types):
+        if field_type != FIELD_TEXT:
+            continue
+        cells = {}
+        for row, record in enumerate(records):
+            if kind != RECORD_DICT:
+                cells[str(row)] = record[pos]
+            elif fields[pos] in record:
+                cells[str(row)] = record[fields[pos]]
+        text[fields[pos]] = cells
+
+    header = {
+        'time': time.isoformat() if isinstance(time, datetime.datetime) else time,
+        'kind': kind,
+        'fields': fields,
+        'types': types,
+        'names': [_json_name(name) for name in names],
+        'text': text,
+    }
+    header = json.dumps(header, separators=(',', ':')).encode('utf-8')
+    data_offset = len(SNAPSHOT_MAGIC) + _HEADER_SIZE.size + len(header)
+    padding = -data_offset % 8
+
+    row = struct.Struct('<%dQ' % len(numeric))
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(SNAPSHOT_MAGIC)
+        f.write(_HEADER_SIZE.pack(len(header)))
+        f.write(header)
+        f.write(b'\0' * padding)
+        for record in records:
+            if kind == RECORD_DICT:
+                values = [_encode(record[fields[pos]]) if fields[pos] in record else ABSENT_VALUE
+                          for pos in numeric]
+            else:
+                values = [_encode(record[pos]) for pos in numeric]
+            f.write(row.pack(*values))
+    os.replace(tmp_path, path)
+
+
+class SnapshotReader(object):
+    """
+    Random access to the objects of a snapshot file
+    """
+
+    def __init__(self, path):
+        self.file = open(path, 'rb')
+        try:
+            self.mmap = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        except Exception:
+            self.file.close()
+            raise
+
+        try:
+            if self.mmap[:len(SNAPSHOT_MAGIC)] != SNAPSHOT_MAGIC:
+                raise ValueError("{} is not a counter snapshot".format(path))
+            offset = len(SNAPSHOT_MAGIC)
+            header_size, = _HEADER_SIZE.unpack_from(self.mmap, offset)
+            offset += _HEADER_SIZE.size
+            header = json.loads(self.mmap[offset:offset + header_size].decode('utf-8'))
+        except Exception:
+            self.close()
+            raise
+
+        offset += header_size
+        self.data_offset = offset + (-offset % 8)
+        self.kind = header['kind']
+        self.fields = header['fields']
+        self.types = header['types']
+        self.text = header['text']
+        self.names = [_py_name(name) for name in header['names']]
+        self.index = {name: row for row, name in enumerate(self.names)}
+        self.numeric = [pos for pos, field_type in enumerate(self.types) if field_type != FIELD_TEXT]
+        self.row = struct.Struct('<%dQ' % len(self.numeric))
+
+        time = header['time']
+        if isinstance(time, str):
+            try:
+                time = datetime.datetime.fromisoformat(time)
+            except ValueError:
+                pass
+        self.time = time
+
+    def close(self):
+        self.mmap.close()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __contains__(self, name):
+        return name in self.index
+
+    def _read_row(self, row):
+        values = [_ABSENT] * len(self.fields)
+        raw = self.row.unpack_from(self.mmap, self.data_offset + row * self.row.size)
+        for pos, value in zip(self.numeric, raw):
+            if value != ABSENT_VALUE:
+                values[pos] = _decode(value, self.types[pos])
+        for pos, field_type in enumerate(self.types):
+            if field_type == FIELD_TEXT:
+                values[pos] = self.text[self.fields[pos]].get(str(row), _ABSENT)
+        return values
+
+    def get(self, name, record_type=None):
+        """
+        Return the record of the object name, None if it is not in the snapshot
+        """
+        row = self.index.get(name)
+        if row is None:
+            return None
+        values = self._read_row(row)
+
+        if self.kind == RECORD_DICT:
+            return {field: value for field, value in zip(self.fields, values) if value is not _ABSENT}
+        if self.kind == RECORD_LIST:
+            return values
+        if record_type is None:
+            return tuple(values)
+        if list(record_type._fields) != self.fields:
+            # The record layout changed since the snapshot was taken
+            by_name = dict(zip(self.fields, values))
+            values = [by_name.get(field, STATUS_NA) for field in record_type._fields]
+        return record_type._make(values)
+
+    def read(self, names=None, record_type=None):
+        """
+        Return the snapshot as an OrderedDict, restricted to names when given
+        """
+        stats = OrderedDict()
+        stats[TIME_KEY] = self.time
+        for name in (self.names if names is None else names):
+            record = self.get(name, record_type)
+            if record is not None:
+                stats[name] = record
+        return stats
+
+
+def load(path, record_type=None, names=None):
+    """
+    Load the stats saved at path by dump().
+
+    Files written by older versions with pickle are still understood;
+    in that case the whole file is returned, whatever names is.
+    """
+    with open(path, 'rb') as f:
+        magic = f.read(len(SNAPSHOT_MAGIC))
+        if magic != SNAPSHOT_MAGIC:
+            f.seek(0)
+            return pickle.load(f)
+
+    with SnapshotReader(path) as reader:
+        return reader.read(names, record_type)
@@ -0,0 +1,203 @@
+# Streaming reader of the FDB entries programmed in ASIC_DB #
+
+import json
+import re
+from collections import Counter, namedtuple
+
+from sonic_py_common import port_util
+from utilities_common.bulk_fetch import BulkFetcher, SCAN_COUNT
+
+FDB_ENTRY_PATTERN = "ASIC_STATE:SAI_OBJECT_TYPE_FDB_ENTRY:*"
+MAC_ADDR_PATTERN = re.compile("^([0-9A-Fa-f]{2}[:]){5}([0-9A-Fa-f]{2})$")
+FDB_TYPES = ["Static", "Dynamic"]
+# Number of entries sorted at once by sorted_entries()
+SORT_BUFFER_SIZE = 10 * SCAN_COUNT
+
+FdbEntry = namedtuple("FdbEntry", "vlan, mac, port, type")
+
+
+class FdbEngine(object):
+    """
+    Read the FDB entries of ASIC_DB batch by batch: keys are SCANned
+    and the entries of each batch are read with one bulk HGETALL.
+
+    The vlan and mac filters are checked on the key, before reading the
+    entry, so that only the matching entries are ever fetched or kept.
+    The vlan of a bvid is looked up once and cached.
+
+    SCAN may return a key more than once if ASIC_DB is rehashed meanwhile.
+    Unless unique is False, the keys of the entries generated so far are
+    kept to drop those duplicates: memory then grows with the number of
+    matching entries, not with the size of the table.
+    """
+
+    def __init__(self, db, batch_size=SCAN_COUNT):
+        self.db = db
+        self.db.connect(self.db.ASIC_DB)
+        self.if_name_map, \
+        self.if_oid_map = port_util.get_interface_oid_map(self.db)
+        self.if_br_oid_map = port_util.get_bridge_port_map(self.db)
+        self.fetcher = BulkFetcher(self.db)
+        self.batch_size = batch_size
+        self.bvid_tlb = {}
+
+    def validate_params(self, vlan=None, port=None, address=None, entry_type=None):
+        """
+        Check the filters given by the user, printing the error if any.
+        """
+        if vlan is not None:
+            if not vlan.isnumeric():
+                print("Error: Invalid vlan id {0}".format(vlan))
+                return False
+
+            vlan_val = int(vlan)
+            if (vlan_val not in range(1,4096)):
+                print("Error: Invalid vlan id {0}".format(vlan))
+                return False
+
+        if port is not None and port not in self.if_name_map:
+            print("Error: Invalid port {0}".format(port))
+            return False
+
+        if address is not None:
+            if not MAC_ADDR_PATTERN.match(address):
+                print("Error: Invalid mac address {0}".format(address))
+                return False
+
+        if entry_type is not None and entry_type.capitalize() not in FDB_TYPES:
+            print("Error: Invalid type {0}". format(entry_type))
+            return False
+
+        return True
+
+    def get_port_name(self, br_port_id):
+        """
+        Return the name of the port behind a bridge port, None if unknown.
+        """
+        if br_port_id not in self.if_br_oid_map:
+            return None
+        port_id = self.if_br_oid_map[br_port_id]
+        return self.if_oid_map.get(port_id, port_id)
+
+    def get_vlan_id(self, fdb):
+        """
+        Return the vlan id of an FDB entry key, None if there is none.
+        """
+        if 'vlan' in fdb:
+            return fdb["vlan"]
+
+        if 'bvid' not in fdb:
+            # no possibility to find the Vlan id. skip the FDB entry
+            return None
+
+        bvid = fdb["bvid"]
+        if bvid in self.bvid_tlb:
+            return self.bvid_tlb[bvid]
+
+        try:
+            vlan_id = port_util.get_vlan_id_from_bvid(self.db, bvid)
+            # None if the system has FDB entries linked to the default
+            # Vlan (caused by untagged traffic)
+            self.bvid_tlb[bvid] = vlan_id
+        except Exception:
+            vlan_id = bvid
+            print("Failed to get Vlan id for bvid {}\n".format(bvid))
+        return vlan_id
+
+    def keys(self, vlans=None, address=None):
+        """
+        Generate the batches of (key, vlan id, fdb) of the FDB entries in
+        ASIC_DB order, filtered on the key only. vlans is a set of vlan ids,
+        None for all of them.
+        """
+        for keys in self.fetcher.scan(self.db.ASIC_DB, FDB_ENTRY_PATTERN, self.batch_size):
+            batch = []
+            for key in keys:
+                fdb = json.loads(key.split(":", 2)[-1])
+                if not fdb:
+                    continue
+                if address is not None and fdb.get("mac") != address:
+                    continue
+
+                vlan_id = self.get_vlan_id(fdb)
+                if vlan_id is None:
+                    continue
+                vlan_id = int(vlan_id)
+                if vlans is not None and vlan_id not in vlans:
+                    continue
+                batch.append((key, vlan_id, fdb))
+            yield batch
+
+    def entries(self, vlan=None, port=None, address=None, entry_type=None, unique=True):
+        """
+        Generate the FdbEntry matching all the given filters, in ASIC_DB order.
+        vlan is an int, address upper case and entry_type capitalized.
+        With unique False, nothing but the current batch is held in memory
+        and an entry is generated twice in the rare case SCAN returns its
+        key twice.
+        """
+        vlans = None if vlan is None else {vlan}
+        return self._entries(vlans, port, address, entry_type, unique)
+
+    def sorted_entries(self, vlan=None, port=None, address=None, entry_type=None, buffer_size=SORT_BUFFER_SIZE):
+        """
+        Same as entries() but sorted on vlan, the entries of a vlan in
+        ASIC_DB order.
+        The keys are SCANned first to count the entries of each vlan. The
+        vlans are then read in groups of at most buffer_size entries, one
+        SCAN per group, so that only one group is held in memory.
+        """
+        if not self.if_br_oid_map:
+            return
+
+        vlan_counts = Counter()
+        for batch in self.keys(None if vlan is None else {vlan}, address):
+            vlan_counts.update(vlan_id for _, vlan_id, _ in batch)
+
+        groups = []
+        group_size = 0
+        for vlan_id in sorted(vlan_counts):
+            if not groups or group_size + vlan_counts[vlan_id] > buffer_size:
+                groups.append([])
+                group_size = 0
+            groups[-1].append(vlan_id)
+            group_size += vlan_counts[vlan_id]
+
+        for group in groups:
+            buckets = {vlan_id: [] for vlan_id in group}
+            for entry in self._entries(set(group), port, address, entry_type, unique=True):
+                buckets[entry.vlan].append(entry)
+            for vlan_id in group:
+                yield from buckets[vlan_id]
+
+    def _entries(self, vlans, port, address, entry_type, unique):
+        if not self.if_br_oid_map:
+            return
+
+        oid_pfx = len("oid:0x")
+        seen = set()
+        for batch in self.keys(vlans, address):
+            batch = [(key, vlan_id, fdb) for key, vlan_id, fdb in batch if key not in seen]
+            ents = self.fetcher.get_all(self.db.ASIC_DB, [key for key, _, _ in batch])
+            for (key, vlan_id, fdb), ent in zip(batch, ents):
+                if not ent:
+                    continue
+
+                if_name = self.get_port_name(ent["SAI_FDB_ENTRY_ATTR_BRIDGE_PORT_ID"][oid_pfx:])
+                if if_name is None or (port is not None and if_name != port):
+                    continue
+
+                ent_type = ent["SAI_FDB_ENTRY_ATTR_TYPE"]
+                fdb_type = ['Dynamic','Static'][ent_type == "SAI_FDB_ENTRY_TYPE_STATIC"]
+                if entry_type is not None and fdb_type != entry_type:
+                    continue
+
+                if unique:
+                    seen.add(key)
+                yield FdbEntry(vlan_id, fdb["mac"], if_name, fdb_type)
+
+    def count(self, vlan=None, port=None):
+        """
+        Return the number of FDB entries learned on the vlan and/or port.
+        """
+        return sum(1 for _ in self.entries(vlan, port))
@@ -23,6 +23,8 @@ class MultiAsic(object):
         self.current_namespace = None
         self.is_multi_asic = multi_asic.is_multi_asic()
         self.db = db
+        self.db_clients = {}
+        self.cfgdb_clients = {}
 
     def get_display_option(self):
         return self.display_option
@@ -55,6 +57,28 @@ class MultiAsic(object):
             return False
         return self.is_object_internal(object_type, cli_object)
 
+    def get_db_client(self, namespace):
+        '''
+        Returns the connector to all the DBs of the namespace. The connector
+        is created on first use and then reused for the lifetime of this object.
+        '''
+        if self.db and self.db.db_clients.get(namespace):
+            return self.db.db_clients[namespace]
+        if namespace not in self.db_clients:
+            self.db_clients[namespace] = multi_asic.connect_to_all_dbs_for_ns(namespace)
+        return self.db_clients[namespace]
+
+    def get_config_db_client(self, namespace):
+        '''
+        Returns the CONFIG_DB connector of the namespace. The connector
+        is created on first use and then reused for the lifetime of this object.
+        '''
+        if self.db and self.db.cfgdb_clients.get(namespace):
+            return self.db.cfgdb_clients[namespace]
+        if namespace not in self.cfgdb_clients:
+            self.cfgdb_clients[namespace] = multi_asic.connect_config_db_for_ns(namespace)
+        return self.cfgdb_clients[namespace]
+
     def get_ns_list_based_on_options(self):
         ns_list = []
         if not self.is_multi_asic:
@@ -133,8 +157,9 @@ def run_on_multi_asic(func):
     This decorator is used on the CLI functions which needs to be
     run on all the namespaces in the multi ASIC platform
     The decorator loops through all the required namespaces,
-    for every iteration, it connects to all the DBs and provides an handle
-    to the wrapped function.
+    for every iteration, it provides an handle to all the DBs of the
+    namespace to the wrapped function. The connections are made once
+    per namespace and reused on later invocations.
 
     '''
     @functools.wraps(func)
@@ -142,16 +167,8 @@ def run_on_multi_asic(func):
         ns_list = self.multi_asic.get_ns_list_based_on_options()
         for ns in ns_list:
             self.multi_asic.current_namespace = ns
-            # if object instance already has db connections, use them
-            if self.multi_asic.db and self.multi_asic.db.cfgdb_clients.get(ns):
-                self.config_db = self.multi_asic.db.cfgdb_clients[ns]
-            else:
-                self.config_db = multi_asic.connect_config_db_for_ns(ns)
-
-            if self.multi_asic.db and self.multi_asic.db.db_clients.get(ns):
-                self.db = self.multi_asic.db.db_clients[ns]
-            else:
-                self.db = multi_asic.connect_to_all_dbs_for_ns(ns)
+            self.config_db = self.multi_asic.get_config_db_client(ns)
+            self.db = self.multi_asic.get_db_client(ns)
 
             func(self,  *args, **kwargs)
     return wrapped_run_on_all_asics